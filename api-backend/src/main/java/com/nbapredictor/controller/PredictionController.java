@@ -7,6 +7,9 @@ import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.http.ResponseEntity;
 import org.springframework.web.bind.annotation.*;
 
+import java.util.List;
+import java.util.Map;
+
 @RestController
 @RequestMapping("/api/predictions")
 @CrossOrigin(origins = "*")
@@ -25,6 +28,22 @@ public class PredictionController {
         return ResponseEntity.ok("Hello from NBA Predictor API!");
     }
 
+    @GetMapping("/cache/stats")
+    public ResponseEntity<Map<String, Object>> cacheStats() {
+        return ResponseEntity.ok(predictionService.getCacheStats());
+    }
+
+    @GetMapping(value = "/cache/metrics", produces = "text/plain; version=0.0.4; charset=utf-8")
+    public ResponseEntity<String> cacheMetrics() {
+        return ResponseEntity.ok(predictionService.getCacheMetrics());
+    }
+
+    @PostMapping("/cache/invalidate")
+    public ResponseEntity<Map<String, Object>> invalidateCache() {
+        predictionService.invalidateCache();
+        return ResponseEntity.ok(predictionService.getCacheStats());
+    }
+
     @PostMapping("/predict")
     public ResponseEntity<PredictionResponse> predictGame(@RequestBody GameRequest request) {
         try {
@@ -41,4 +60,22 @@ public class PredictionController {
             return ResponseEntity.badRequest().body(errorResponse);
         }
     }
+
+    @PostMapping("/predict/batch")
+    public ResponseEntity<List<PredictionResponse>> predictGames(@RequestBody List<GameRequest> requests) {
+        try {
+            return ResponseEntity.ok(predictionService.predictGames(requests));
+        } catch (Exception e) {
+            return ResponseEntity.badRequest().build();
+        }
+    }
+
+    @PostMapping("/simulate")
+    public ResponseEntity<Map<String, Object>> simulateSeason(@RequestBody Map<String, Object> request) {
+        try {
+            return ResponseEntity.ok(predictionService.simulateSeason(request));
+        } catch (Exception e) {
+            return ResponseEntity.badRequest().body(Map.of("error", "Failed to simulate season: " + e.getMessage()));
+        }
+    }
 }
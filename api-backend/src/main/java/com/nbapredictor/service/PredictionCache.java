@@ -0,0 +1,186 @@
+package com.nbapredictor.service;
+
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.nbapredictor.model.PredictionResponse;
+import org.springframework.beans.factory.ObjectProvider;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.data.redis.core.Cursor;
+import org.springframework.data.redis.core.RedisCallback;
+import org.springframework.data.redis.core.ScanOptions;
+import org.springframework.data.redis.core.StringRedisTemplate;
+import org.springframework.stereotype.Component;
+
+import java.nio.charset.StandardCharsets;
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.atomic.AtomicLong;
+
+@Component
+public class PredictionCache {
+
+    private static final String KEY_PREFIX = "prediction:";
+
+    private final StringRedisTemplate redisTemplate;
+    private final ObjectMapper objectMapper;
+    private final Duration ttl;
+    private final Map<String, CacheEntry> localCache;
+
+    private final AtomicLong hits = new AtomicLong();
+    private final AtomicLong misses = new AtomicLong();
+    private final AtomicLong errors = new AtomicLong();
+
+    @Autowired
+    public PredictionCache(
+            @Value("${prediction.cache.backend:memory}") String backend,
+            @Value("${prediction.cache.ttl-seconds:3600}") long ttlSeconds,
+            @Value("${prediction.cache.max-entries:10000}") int maxEntries,
+            ObjectProvider<StringRedisTemplate> redisTemplateProvider,
+            ObjectMapper objectMapper) {
+        this.redisTemplate = "redis".equalsIgnoreCase(backend) ? redisTemplateProvider.getIfAvailable() : null;
+        this.objectMapper = objectMapper;
+        this.ttl = Duration.ofSeconds(ttlSeconds);
+
+        // Access-ordered LinkedHashMap evicts the least recently used entry once full
+        this.localCache = Collections.synchronizedMap(new LinkedHashMap<String, CacheEntry>(16, 0.75f, true) {
+            @Override
+            protected boolean removeEldestEntry(Map.Entry<String, CacheEntry> eldest) {
+                return size() > maxEntries;
+            }
+        });
+    }
+
+    public static String key(String modelVersion, String homeTeam, String awayTeam, String gameDate) {
+        return String.join(":",
+            modelVersion == null ? "unknown" : modelVersion,
+            normalize(homeTeam),
+            normalize(awayTeam),
+            gameDate == null ? "any" : gameDate.trim());
+    }
+
+    private static String normalize(String team) {
+        return team == null ? "" : team.trim();
+    }
+
+    public PredictionResponse get(String key) {
+        PredictionResponse response = redisTemplate != null ? getFromRedis(key) : getFromMemory(key);
+        if (response != null) {
+            hits.incrementAndGet();
+        } else {
+            misses.incrementAndGet();
+        }
+        return response;
+    }
+
+    public void put(String key, PredictionResponse response) {
+        if (redisTemplate != null) {
+            try {
+                redisTemplate.opsForValue().set(KEY_PREFIX + key, objectMapper.writeValueAsString(response), ttl);
+            } catch (Exception e) {
+                errors.incrementAndGet();
+            }
+        } else {
+            localCache.put(key, new CacheEntry(response, System.currentTimeMillis() + ttl.toMillis()));
+        }
+    }
+
+    public void invalidateAll() {
+        if (redisTemplate != null) {
+            try {
+                List<byte[]> keys = redisTemplate.execute((RedisCallback<List<byte[]>>) connection -> {
+                    List<byte[]> found = new ArrayList<>();
+                    ScanOptions options = ScanOptions.scanOptions().match(KEY_PREFIX + "*").count(1000).build();
+                    try (Cursor<byte[]> cursor = connection.keyCommands().scan(options)) {
+                        cursor.forEachRemaining(found::add);
+                    }
+                    return found;
+                });
+                if (keys != null && !keys.isEmpty()) {
+                    List<String> names = new ArrayList<>();
+                    for (byte[] name : keys) {
+                        names.add(new String(name, StandardCharsets.UTF_8));
+                    }
+                    redisTemplate.delete(names);
+                }
+            } catch (Exception e) {
+                errors.incrementAndGet();
+            }
+        }
+        localCache.clear();
+    }
+
+    public Map<String, Object> getStats() {
+        long hitCount = hits.get();
+        long missCount = misses.get();
+        long total = hitCount + missCount;
+
+        Map<String, Object> stats = new LinkedHashMap<>();
+        stats.put("backend", redisTemplate != null ? "redis" : "memory");
+        stats.put("hits", hitCount);
+        stats.put("misses", missCount);
+        stats.put("errors", errors.get());
+        stats.put("hitRate", total == 0 ? 0.0 : (double) hitCount / total);
+        stats.put("ttlSeconds", ttl.getSeconds());
+        if (redisTemplate == null) {
+            stats.put("size", localCache.size());
+        }
+        return stats;
+    }
+
+    // Prometheus text exposition of the counters, so cache efficiency can be
+    // scraped next to the ML service's /metrics
+    public String getPrometheusMetrics() {
+        String backend = redisTemplate != null ? "redis" : "memory";
+        StringBuilder out = new StringBuilder();
+        out.append("# HELP nba_prediction_cache_requests_total Prediction cache lookups by result\n");
+        out.append("# TYPE nba_prediction_cache_requests_total counter\n");
+        out.append(String.format("nba_prediction_cache_requests_total{backend=\"%s\",result=\"hit\"} %d\n", backend, hits.get()));
+        out.append(String.format("nba_prediction_cache_requests_total{backend=\"%s\",result=\"miss\"} %d\n", backend, misses.get()));
+        out.append("# HELP nba_prediction_cache_errors_total Prediction cache backend errors\n");
+        out.append("# TYPE nba_prediction_cache_errors_total counter\n");
+        out.append(String.format("nba_prediction_cache_errors_total{backend=\"%s\"} %d\n", backend, errors.get()));
+        if (redisTemplate == null) {
+            out.append("# HELP nba_prediction_cache_entries Entries in the in-memory prediction cache\n");
+            out.append("# TYPE nba_prediction_cache_entries gauge\n");
+            out.append(String.format("nba_prediction_cache_entries{backend=\"%s\"} %d\n", backend, localCache.size()));
+        }
+        return out.toString();
+    }
+
+    private PredictionResponse getFromRedis(String key) {
+        try {
+            String value = redisTemplate.opsForValue().get(KEY_PREFIX + key);
+            return value == null ? null : objectMapper.readValue(value, PredictionResponse.class);
+        } catch (Exception e) {
+            // Redis being unavailable degrades to a cache miss
+            errors.incrementAndGet();
+            return null;
+        }
+    }
+
+    private PredictionResponse getFromMemory(String key) {
+        CacheEntry entry = localCache.get(key);
+        if (entry == null) {
+            return null;
+        }
+        if (entry.expiresAt < System.currentTimeMillis()) {
+            localCache.remove(key);
+            return null;
+        }
+        return entry.response;
+    }
+
+    private static class CacheEntry {
+        private final PredictionResponse response;
+        private final long expiresAt;
+
+        CacheEntry(PredictionResponse response, long expiresAt) {
+            this.response = response;
+            this.expiresAt = expiresAt;
+        }
+    }
+}
@@ -2,43 +2,65 @@ package com.nbapredictor.service;
 
 import com.nbapredictor.model.GameRequest;
 import com.nbapredictor.model.PredictionResponse;
+import org.springframework.core.ParameterizedTypeReference;
 import org.springframework.stereotype.Service;
 import org.springframework.web.reactive.function.client.WebClient;
 import reactor.core.publisher.Mono;
 import org.springframework.beans.factory.annotation.Autowired;
 
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
+
 @Service
 public class PredictionService {
 
     private final WebClient webClient;
+    private final PredictionCache predictionCache;
     private static final String ML_SERVICE_URL = "http://localhost:5001";
+    private static final long MODEL_VERSION_REFRESH_MS = 30_000;
+
+    private volatile String modelVersion;
+    private volatile long modelVersionCheckedAt;
 
     @Autowired
-    public PredictionService(WebClient.Builder webClientBuilder) {
+    public PredictionService(WebClient.Builder webClientBuilder, PredictionCache predictionCache) {
         this.webClient = webClientBuilder.build();
+        this.predictionCache = predictionCache;
     }
 
     public PredictionResponse predictGame(GameRequest request) {
         String homeTeam = request.getHomeTeam();
         String awayTeam = request.getAwayTeam();
 
+        String cacheKey = PredictionCache.key(currentModelVersion(), homeTeam, awayTeam, request.getGameDate());
+        PredictionResponse cached = predictionCache.get(cacheKey);
+        if (cached != null) {
+            return cached;
+        }
+
         try {
             // Call Python ML service
             MLPredictionResponse mlResponse = webClient.post()
                 .uri(ML_SERVICE_URL + "/predict")
-                .bodyValue(new MLGameRequest(homeTeam, awayTeam))
+                .bodyValue(new MLGameRequest(homeTeam, awayTeam, request.getGameDate()))
                 .retrieve()
                 .bodyToMono(MLPredictionResponse.class)
                 .block(); // For simplicity, using blocking call
 
             if (mlResponse != null && mlResponse.getError() == null) {
-                return new PredictionResponse(
+                PredictionResponse response = new PredictionResponse(
                     mlResponse.getPredictedWinner(),
                     mlResponse.getConfidence(),
                     mlResponse.getMessage(),
                     homeTeam,
                     awayTeam
                 );
+                observeModelVersion(mlResponse.getModelVersion());
+                predictionCache.put(
+                    PredictionCache.key(currentModelVersion(), homeTeam, awayTeam, request.getGameDate()), response);
+                return response;
             } else {
                 // Fallback to mock prediction if ML service fails
                 return createMockPrediction(homeTeam, awayTeam);
@@ -49,6 +71,122 @@ public class PredictionService {
         }
     }
 
+    public List<PredictionResponse> predictGames(List<GameRequest> requests) {
+        String version = currentModelVersion();
+        PredictionResponse[] predictions = new PredictionResponse[requests.size()];
+
+        // Serve what we can from the cache and send only the misses to the ML service
+        List<Integer> misses = new ArrayList<>();
+        List<MLGameRequest> games = new ArrayList<>();
+        for (int i = 0; i < requests.size(); i++) {
+            GameRequest request = requests.get(i);
+            predictions[i] = predictionCache.get(
+                PredictionCache.key(version, request.getHomeTeam(), request.getAwayTeam(), request.getGameDate()));
+            if (predictions[i] == null) {
+                misses.add(i);
+                games.add(new MLGameRequest(request.getHomeTeam(), request.getAwayTeam(), request.getGameDate()));
+            }
+        }
+        if (misses.isEmpty()) {
+            return List.of(predictions);
+        }
+
+        List<MLPredictionResponse> mlResponses = null;
+        try {
+            // One call to the Python ML service scores the whole slate
+            MLBatchResponse batchResponse = webClient.post()
+                .uri(ML_SERVICE_URL + "/predict/batch")
+                .bodyValue(new MLBatchRequest(games))
+                .retrieve()
+                .bodyToMono(MLBatchResponse.class)
+                .block();
+
+            if (batchResponse != null && batchResponse.getPredictions() != null
+                    && batchResponse.getPredictions().size() == games.size()) {
+                mlResponses = batchResponse.getPredictions();
+            }
+        } catch (Exception e) {
+            // Fall back to mock predictions below if ML service is unavailable
+        }
+
+        for (int j = 0; j < misses.size(); j++) {
+            int i = misses.get(j);
+            GameRequest request = requests.get(i);
+            String homeTeam = request.getHomeTeam();
+            String awayTeam = request.getAwayTeam();
+            MLPredictionResponse mlResponse = mlResponses != null ? mlResponses.get(j) : null;
+
+            if (mlResponse != null && mlResponse.getError() == null) {
+                predictions[i] = new PredictionResponse(
+                    mlResponse.getPredictedWinner(),
+                    mlResponse.getConfidence(),
+                    mlResponse.getMessage(),
+                    homeTeam,
+                    awayTeam
+                );
+                observeModelVersion(mlResponse.getModelVersion());
+                predictionCache.put(
+                    PredictionCache.key(currentModelVersion(), homeTeam, awayTeam, request.getGameDate()), predictions[i]);
+            } else {
+                predictions[i] = createMockPrediction(homeTeam, awayTeam);
+            }
+        }
+        return List.of(predictions);
+    }
+
+    public Map<String, Object> simulateSeason(Map<String, Object> request) {
+        // The ML service scores every matchup once and runs the Monte Carlo draws itself
+        return webClient.post()
+            .uri(ML_SERVICE_URL + "/simulate")
+            .bodyValue(request)
+            .retrieve()
+            .bodyToMono(new ParameterizedTypeReference<Map<String, Object>>() {})
+            .block(Duration.ofSeconds(60));
+    }
+
+    // Cache keys include the ML model version, so a new model or feature refresh
+    // on the Python side stops old entries from being served
+    private String currentModelVersion() {
+        long now = System.currentTimeMillis();
+        if (now - modelVersionCheckedAt > MODEL_VERSION_REFRESH_MS) {
+            modelVersionCheckedAt = now;
+            try {
+                MLHealthResponse health = webClient.get()
+                    .uri(ML_SERVICE_URL + "/health")
+                    .retrieve()
+                    .bodyToMono(MLHealthResponse.class)
+                    .block(Duration.ofSeconds(1));
+                if (health != null) {
+                    observeModelVersion(health.getModelVersion());
+                }
+            } catch (Exception e) {
+                // Keep the last known version if the ML service is unreachable
+            }
+        }
+        return modelVersion;
+    }
+
+    private void observeModelVersion(String version) {
+        if (version != null && !version.equals(modelVersion)) {
+            modelVersion = version;
+        }
+    }
+
+    public void invalidateCache() {
+        predictionCache.invalidateAll();
+        modelVersionCheckedAt = 0;
+    }
+
+    public Map<String, Object> getCacheStats() {
+        Map<String, Object> stats = predictionCache.getStats();
+        stats.put("modelVersion", modelVersion);
+        return stats;
+    }
+
+    public String getCacheMetrics() {
+        return predictionCache.getPrometheusMetrics();
+    }
+
     private PredictionResponse createMockPrediction(String homeTeam, String awayTeam) {
         double confidence = Math.random() * 0.4 + 0.6;
         String predictedWinner = confidence > 0.7 ? homeTeam : awayTeam;
@@ -67,16 +205,21 @@ public class PredictionService {
     public static class MLGameRequest {
         private String homeTeam;
         private String awayTeam;
+        // Part of the cache key, so the ML service must score for this date too
+        private String gameDate;
 
-        public MLGameRequest(String homeTeam, String awayTeam) {
+        public MLGameRequest(String homeTeam, String awayTeam, String gameDate) {
             this.homeTeam = homeTeam;
             this.awayTeam = awayTeam;
+            this.gameDate = gameDate;
         }
 
         public String getHomeTeam() { return homeTeam; }
         public void setHomeTeam(String homeTeam) { this.homeTeam = homeTeam; }
         public String getAwayTeam() { return awayTeam; }
         public void setAwayTeam(String awayTeam) { this.awayTeam = awayTeam; }
+        public String getGameDate() { return gameDate; }
+        public void setGameDate(String gameDate) { this.gameDate = gameDate; }
     }
 
     public static class MLPredictionResponse {
@@ -85,6 +228,7 @@ public class PredictionService {
         private String message;
         private String homeTeam;
         private String awayTeam;
+        private String modelVersion;
         private String error;
 
         // Getters and setters
@@ -98,10 +242,40 @@ public class PredictionService {
         public void setHomeTeam(String homeTeam) { this.homeTeam = homeTeam; }
         public String getAwayTeam() { return awayTeam; }
         public void setAwayTeam(String awayTeam) { this.awayTeam = awayTeam; }
+        public String getModelVersion() { return modelVersion; }
+        public void setModelVersion(String modelVersion) { this.modelVersion = modelVersion; }
         public String getError() { return error; }
         public void setError(String error) { this.error = error; }
     }
 
+    public static class MLHealthResponse {
+        private String status;
+        private String modelVersion;
+
+        public String getStatus() { return status; }
+        public void setStatus(String status) { this.status = status; }
+        public String getModelVersion() { return modelVersion; }
+        public void setModelVersion(String modelVersion) { this.modelVersion = modelVersion; }
+    }
+
+    public static class MLBatchRequest {
+        private List<MLGameRequest> games;
+
+        public MLBatchRequest(List<MLGameRequest> games) {
+            this.games = games;
+        }
+
+        public List<MLGameRequest> getGames() { return games; }
+        public void setGames(List<MLGameRequest> games) { this.games = games; }
+    }
+
+    public static class MLBatchResponse {
+        private List<MLPredictionResponse> predictions;
+
+        public List<MLPredictionResponse> getPredictions() { return predictions; }
+        public void setPredictions(List<MLPredictionResponse> predictions) { this.predictions = predictions; }
+    }
+
     public String getHealth() {
         return "NBA Predictor API is running!";
     }
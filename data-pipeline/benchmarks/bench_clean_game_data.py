@@ -0,0 +1,113 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from processors.clean_game_data import GameDataCleaner
+from processors.schema import CLEAN_GAMES_SCHEMA
+
+# The only intended difference from the legacy clean_games.csv: the id_x/id_y
+# copies of the team ids are no longer written. Every other column must match
+# byte for byte, including the team ids that legacy cast with astype(str).
+DROPPED_COLUMNS = CLEAN_GAMES_SCHEMA['drop']
+
+
+def legacy_check_rivalry(rivalries, home_team, away_team):
+    """Reference copy of the cleaner's former per-row rivalry lookup"""
+    return int((home_team, away_team) in rivalries or (away_team, home_team) in rivalries)
+
+
+def legacy_clean_game_data(cleaner, game_info, game_summary, teams, line_score=None):
+    """Reference copy of the pre-vectorization cleaner (row-wise rivalry apply, two team merges)."""
+    games = game_info.merge(game_summary, on='game_id', how='left', suffixes=('', '_summary'))
+    games['game_date'] = pd.to_datetime(games['game_date'])
+    games = games[games['game_date'].dt.year >= 2010]
+    games = games[games['game_date'].dt.year <= 2023]
+    games = games.drop_duplicates(subset=['game_id'])
+
+    games['attendance'] = games['attendance'].fillna(0)
+    games['game_time'] = games['game_time'].fillna('Unknown')
+
+    games = games.merge(teams, left_on='home_team_id', right_on='id', how='left')
+    games = games.rename(columns={'full_name': 'home_team_name', 'abbreviation': 'home_team_abbr'})
+    games = games.merge(teams, left_on='visitor_team_id', right_on='id', how='left')
+    games = games.rename(columns={'full_name': 'away_team_name', 'abbreviation': 'away_team_abbr'})
+
+    if line_score is not None:
+        home_scores = line_score[line_score['team_id_home'].notna()].copy()
+        away_scores = line_score[line_score['team_id_away'].notna()].copy()
+        games = games.merge(home_scores[['game_id', 'pts_home']], on='game_id', how='left')
+        games = games.merge(away_scores[['game_id', 'pts_away']], on='game_id', how='left')
+
+    games['season'] = games['game_date'].dt.year
+    games['month'] = games['game_date'].dt.month
+    games['day_of_week'] = games['game_date'].dt.dayofweek
+    games['is_weekend'] = games['day_of_week'].isin([5, 6]).astype(int)
+    games['is_playoff_month'] = games['month'].isin([4, 5, 6]).astype(int)
+
+    if 'pts_home' in games.columns and 'pts_away' in games.columns:
+        games['home_win'] = (games['pts_home'] > games['pts_away']).astype(int)
+        games['total_points'] = games['pts_home'] + games['pts_away']
+        games['point_difference'] = games['pts_home'] - games['pts_away']
+
+    games['home_team_id'] = games['home_team_id'].astype(str)
+    games['visitor_team_id'] = games['visitor_team_id'].astype(str)
+
+    games['is_rivalry'] = games.apply(
+        lambda x: legacy_check_rivalry(cleaner.RIVALRIES, x['home_team_abbr'], x['away_team_abbr']), axis=1
+    )
+    return games
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GameDataCleaner.clean_game_data against the legacy implementation")
+    parser.add_argument("--csv-dir", type=Path, default=None, help="Directory with game_info/game_summary/team/line_score CSVs")
+    parser.add_argument("--reference", type=Path, default=None, help="Existing clean_games.csv to compare against")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cleaner = GameDataCleaner()
+    if args.csv_dir is not None:
+        cleaner.csv_path = args.csv_dir
+    game_info, game_summary, teams, line_score = cleaner.load_game_data()
+
+    legacy_time, legacy = best_of(
+        lambda: legacy_clean_game_data(cleaner, game_info, game_summary, teams, line_score), args.repeat
+    )
+    new_time, games = best_of(
+        lambda: cleaner.clean_game_data(game_info, game_summary, teams, line_score), args.repeat
+    )
+
+    legacy_csv = legacy.drop(columns=DROPPED_COLUMNS).to_csv(index=False)
+    new_csv = games.to_csv(index=False)
+
+    print(f"Rows: {len(games)}")
+    print(f"Legacy clean_game_data: {legacy_time * 1000:.1f} ms")
+    print(f"Vectorized clean_game_data: {new_time * 1000:.1f} ms ({legacy_time / new_time:.1f}x)")
+    print(f"Identical to legacy output: {legacy_csv == new_csv}")
+
+    if args.reference is not None:
+        # Read as text so the stored values are compared exactly as written
+        reference = pd.read_csv(args.reference, dtype=str, keep_default_na=False)
+        reference_csv = reference.drop(columns=DROPPED_COLUMNS, errors='ignore').to_csv(index=False)
+        print(f"Identical to {args.reference}: {reference_csv == new_csv}")
+
+    if legacy_csv != new_csv:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import io
+import sys
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.bench_clean_game_data import legacy_clean_game_data
+from models.train_model import NBAPredictor
+from processors.clean_game_data import GameDataCleaner
+from processors.schema import memory_mb
+from processors.storage import ColumnarStore
+
+
+def traced(fn):
+    """Run fn under tracemalloc; returns (result, peak MB allocated while it ran)"""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 1024 ** 2
+
+
+def legacy_training_matrix(features_file):
+    games = pd.read_csv(features_file)
+    columns = [col for col in NBAPredictor.FEATURE_COLUMNS if col in games.columns]
+    X = games[columns].copy()
+    X = X[~(X.isnull().any(axis=1) | games['home_win'].isnull())]
+    return games, np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+
+
+def optimized_training_matrix(predictor):
+    # The trainer's own load: a projected read of the typed Parquet store
+    games = predictor.load_enhanced_data(columns=NBAPredictor.FEATURE_COLUMNS + ['home_win', 'season'])
+    X, y, _ = predictor.prepare_features(games)
+    return games, np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+
+
+def report(label, legacy, optimized):
+    print(f"{label:<34} {legacy:>10.2f} MB {optimized:>10.2f} MB   {legacy / optimized:>5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of the cleaned games frame and training matrix, before and after dtype optimization")
+    parser.add_argument("--csv-dir", type=Path, default=None, help="Directory with game_info/game_summary/team/line_score CSVs")
+    parser.add_argument("--features", type=Path, default=None, help="enhanced_features.csv (defaults to features/)")
+    args = parser.parse_args()
+
+    cleaner = GameDataCleaner()
+    if args.csv_dir is not None:
+        cleaner.csv_path = args.csv_dir
+    game_info, game_summary, teams, line_score = cleaner.load_game_data()
+
+    legacy, legacy_peak = traced(lambda: legacy_clean_game_data(cleaner, game_info, game_summary, teams, line_score))
+    games, peak = traced(lambda: cleaner.clean_game_data(game_info, game_summary, teams, line_score))
+    del legacy, games
+    legacy = legacy_clean_game_data(cleaner, game_info, game_summary, teams, line_score)
+    games = cleaner.clean_game_data(game_info, game_summary, teams, line_score)
+
+    print(f"{'':<34} {'legacy':>13} {'optimized':>13}")
+    report("clean_games frame", memory_mb(legacy), memory_mb(games))
+    report("clean_game_data peak (traced)", legacy_peak, peak)
+    print(f"  columns: {legacy.shape[1]} -> {games.shape[1]}")
+
+    features_file = args.features or Path(__file__).parent.parent / "features" / "enhanced_features.csv"
+    if features_file.exists():
+        (legacy_features, legacy_X), legacy_peak = traced(lambda: legacy_training_matrix(features_file))
+        with tempfile.TemporaryDirectory() as store_dir, redirect_stdout(io.StringIO()):
+            predictor = NBAPredictor()
+            predictor.features_path = features_file.parent
+            predictor.store = ColumnarStore(store_dir)
+            # Untimed: converts the CSV to the store once, as the first training run does
+            predictor.load_enhanced_data(columns=['season'])
+            (features, X), peak = traced(lambda: optimized_training_matrix(predictor))
+        report("enhanced_features frame", memory_mb(legacy_features), memory_mb(features))
+        report("X matrix passed to sklearn", legacy_X.nbytes / 1024 ** 2, X.nbytes / 1024 ** 2)
+        report("load + prepare peak (traced)", legacy_peak, peak)
+    else:
+        print(f"Skipping training matrix: {features_file} not found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, log_loss
+
+warnings.filterwarnings("ignore")
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.backends import BACKENDS
+from models.backtest import season_windows
+from models.train_model import NBAPredictor
+
+
+def time_single_row(model, X, repeat):
+    timings = []
+    for i in range(repeat):
+        row = X.iloc[[i % len(X)]]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 99) * 1000
+
+
+def bench_backend(key, X_train, y_train, X_test, y_test, repeat):
+    """Fit one backend and score it on the complete test rows every backend sees.
+
+    Backends that handle NaN also train on incomplete rows and get a
+    separate accuracy on the incomplete test rows.
+    """
+    backend = BACKENDS[key]
+    if not backend.handles_missing:
+        train_rows = X_train.notna().all(axis=1)
+        X_train, y_train = X_train[train_rows], y_train[train_rows]
+    complete = X_test.notna().all(axis=1)
+
+    # Every threaded backend gets all cores, so fit times compare like for like
+    model = backend.build(n_jobs=-1)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proba = model.predict_proba(X_test[complete])[:, 1]
+    batch_ms = (time.perf_counter() - start) * 1000
+    p50, p99 = time_single_row(model, X_test[complete], repeat)
+
+    missing_accuracy = np.nan
+    if backend.handles_missing and (~complete).any():
+        missing_proba = model.predict_proba(X_test[~complete])[:, 1]
+        missing_accuracy = accuracy_score(y_test[~complete], (missing_proba > 0.5).astype(int))
+
+    return {
+        'backend': backend.name,
+        'train_rows': len(X_train),
+        'test_rows': int(complete.sum()),
+        'fit_s': fit_seconds,
+        'batch_ms': batch_ms,
+        'row_p50_ms': p50,
+        'row_p99_ms': p99,
+        'accuracy': accuracy_score(y_test[complete], (proba > 0.5).astype(int)),
+        'log_loss': log_loss(y_test[complete], proba, labels=[0, 1]),
+        'nan_rows': int((~complete).sum()),
+        'nan_rows_accuracy': missing_accuracy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fit time, predict latency and accuracy of model backends")
+    parser.add_argument("--features", type=Path, default=None, help="enhanced_features.csv (defaults to features/)")
+    parser.add_argument("--backends", nargs="+", default=None, choices=list(BACKENDS),
+                        help="Backends to compare (default: every installed backend)")
+    parser.add_argument("--missing-rate", type=float, default=0.0,
+                        help="Blank out this fraction of feature cells to exercise NaN handling")
+    parser.add_argument("--repeat", type=int, default=200, help="Single-row predictions timed per backend")
+    args = parser.parse_args()
+
+    features = args.features or Path(__file__).parent.parent / "features" / "enhanced_features.csv"
+    games = pd.read_csv(features)
+    predictor = NBAPredictor()
+    X, y, feature_names = predictor.prepare_features(games, allow_missing=True)
+
+    if args.missing_rate:
+        rng = np.random.default_rng(42)
+        X = X.mask(rng.random(X.shape) < args.missing_rate)
+
+    # Latest season held out, as in train_models
+    _, train_idx, test_idx = season_windows(games.loc[X.index, 'season'])[-1]
+    X_train, y_train = X.iloc[train_idx], y.iloc[train_idx]
+    X_test, y_test = X.iloc[test_idx], y.iloc[test_idx]
+
+    keys = args.backends or [key for key, backend in BACKENDS.items() if backend.available()]
+    rows = []
+    for key in keys:
+        print(f"Benchmarking {BACKENDS[key].name}...")
+        rows.append(bench_backend(key, X_train, y_train, X_test, y_test, args.repeat))
+
+    results = pd.DataFrame(rows).set_index('backend')
+    # accuracy and log_loss share one test set; nan_rows_accuracy is only for backends that handle NaN
+    print(results.to_string(float_format=lambda v: f"{v:.3f}", na_rep="-"))
+
+
+if __name__ == "__main__":
+    main()
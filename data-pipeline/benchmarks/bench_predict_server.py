@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import itertools
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+TEAMS = ['BOS', 'LAL', 'GSW', 'MIA', 'DEN', 'MIL', 'PHI', 'NYK', 'CHI', 'DAL']
+
+
+async def wait_until_healthy(client, url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f"{url}/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Prediction server at {url} did not become healthy")
+
+
+async def run_load(url, requests, concurrency):
+    matchups = itertools.cycle([(h, a) for h in TEAMS for a in TEAMS if h != a])
+    latencies = []
+    errors = 0
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+        await wait_until_healthy(client, url)
+        queue = asyncio.Queue()
+        for _ in range(requests):
+            queue.put_nowait(next(matchups))
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                home, away = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.post(f"{url}/predict", json={'homeTeam': home, 'awayTeam': away})
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return np.array(latencies) * 1000, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the /predict endpoint of models/serve.py")
+    parser.add_argument("--url", default="http://localhost:5001")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--spawn", action="store_true", help="Start a local server on the --url port first")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        port = httpx.URL(args.url).port or 5001
+        serve = Path(__file__).parent.parent / "models" / "serve.py"
+        server = subprocess.Popen([sys.executable, str(serve), "--host", "127.0.0.1", "--port", str(port)])
+
+    try:
+        latencies, errors, elapsed = asyncio.run(run_load(args.url, args.requests, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"Requests: {len(latencies)} ({errors} errors) at concurrency {args.concurrency}")
+    print(f"Throughput: {len(latencies) / elapsed:.0f} req/s")
+    for q in (50, 95, 99):
+        print(f"p{q}: {np.percentile(latencies, q):.2f} ms")
+    print(f"max: {latencies.max():.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
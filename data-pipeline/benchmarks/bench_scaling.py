@@ -0,0 +1,107 @@
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def run_scale(scale, seed, backends, n_jobs, play_by_play):
+    # Runs in its own spawned process, so peak RSS belongs to this scale alone
+    from explore_dataset_fast import NBADatasetExplorer
+    from models.train_model import NBAPredictor
+    from processors.build_features import FeatureBuilder
+    from processors.clean_game_data import GameDataCleaner
+    from processors.metrics import STAGE_REPORT, stage_timer
+    from processors.synthetic_data import SyntheticNBAGenerator
+
+    with tempfile.TemporaryDirectory() as tmp, open('/dev/null', 'w') as devnull, redirect_stdout(devnull):
+        csv_path = Path(tmp) / "csv"
+        SyntheticNBAGenerator(scale=scale, seed=seed).write(csv_path, play_by_play=play_by_play)
+
+        cleaner = GameDataCleaner()
+        cleaner.csv_path = csv_path
+        game_info, game_summary, teams, line_score = cleaner.load_game_data()
+        games = cleaner.validate_data(cleaner.clean_game_data(game_info, game_summary, teams, line_score))
+        # Games that survive cleaning, which is what every later stage processes
+        n_games = len(games)
+
+        with stage_timer('features', 'build_features'):
+            enhanced, _ = FeatureBuilder().build_features(games)
+
+        predictor = NBAPredictor(n_jobs=n_jobs, backends=backends)
+        X, y, _ = predictor.prepare_features(enhanced)
+        predictor.train_models(X, y, enhanced.loc[X.index, 'season'])
+
+        NBADatasetExplorer(data_path=tmp).profile_all_csv_files()
+
+    return n_games, {f"{component}.{stage}": values for (component, stage), values in STAGE_REPORT.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every pipeline stage on synthetic data at several multiples of the current size")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100],
+                        help="Multiples of a full schedule per season over 2010-11 to 2022-23 (1x is ~17k games)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", nargs="+", default=["logistic_regression", "hist_gradient_boosting"])
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--play-by-play", action="store_true",
+                        help="Also generate play_by_play (~430 events per game) for the explorer to profile")
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="Fail when a stage's time per game at the largest scale exceeds this multiple of the smallest")
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier --output to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Fail when a stage is this many times slower than the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for scale in sorted(args.scales):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            n_games, stages = executor.submit(run_scale, scale, args.seed, args.backends, args.n_jobs,
+                                               args.play_by_play).result()
+        results[str(scale)] = {'games': n_games, 'stages': stages}
+        print(f"scale {scale:g}x: {n_games} games, "
+              f"{sum(stage['seconds'] for stage in stages.values()):.1f}s total")
+
+    scales = list(results)
+    names = list(results[scales[-1]]['stages'])
+    print(f"\n{'stage':<38}" + "".join(f"{s + 'x (s)':>12}" for s in scales) + f"{'growth':>9}{'peak MB':>10}")
+    failures = []
+    for name in names:
+        seconds = [results[s]['stages'][name]['seconds'] for s in scales]
+        # Time per game at the largest scale relative to the smallest; 1.0 is linear
+        per_game = [sec / results[s]['games'] for sec, s in zip(seconds, scales)]
+        growth = per_game[-1] / per_game[0] if per_game[0] > 0 else float('nan')
+        peak = results[scales[-1]]['stages'][name]['peak_rss_bytes'] / 1024 ** 2
+        print(f"{name:<38}" + "".join(f"{sec:>12.3f}" for sec in seconds) + f"{growth:>9.2f}{peak:>10.0f}")
+        # Sub-100ms stages are dominated by fixed overhead, not by scaling
+        if len(scales) > 1 and seconds[-1] > 0.1 and growth > args.max_growth:
+            failures.append(f"{name} grows {growth:.1f}x per game from {scales[0]}x to {scales[-1]}x")
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for scale, result in results.items():
+            for name, stage in result['stages'].items():
+                before = baseline.get(scale, {}).get('stages', {}).get(name)
+                if before and stage['seconds'] > 0.1 and stage['seconds'] > args.tolerance * before['seconds']:
+                    failures.append(f"{name} at {scale}x: {before['seconds']:.2f}s -> {stage['seconds']:.2f}s")
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import sqlite3
 import os
+import sys
 from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -9,13 +10,86 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(str(Path(__file__).parent))
+
+from processors.metrics import timed_stage, write_metrics
+
+
+class DistinctSampler:
+    """Bounded-memory distinct/duplicate counter over 64-bit hashes.
+
+    Counts are exact until more than `max_size` distinct hashes have been
+    seen. After that only hashes whose top `level` bits are zero are kept,
+    which is a consistent 1/2**level sample (all copies of a value share a
+    hash), and the counts are scaled back up.
+    """
+
+    def __init__(self, max_size=1_000_000):
+        self.max_size = max_size
+        self.level = 0
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def _sampled(self, hashes):
+        if self.level == 0:
+            return np.ones(len(hashes), dtype=bool)
+        return (hashes >> np.uint64(64 - self.level)) == 0
+
+    def add_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        hashes = hashes[self._sampled(hashes)]
+        if len(hashes) == 0:
+            return
+
+        chunk_hashes, chunk_counts = np.unique(hashes, return_counts=True)
+        merged, inverse = np.unique(np.concatenate([self.hashes, chunk_hashes]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, chunk_counts]),
+                                  minlength=len(merged)).astype(np.int64)
+        self.hashes = merged
+
+        while len(self.hashes) > self.max_size:
+            self.level += 1
+            keep = self._sampled(self.hashes)
+            self.hashes = self.hashes[keep]
+            self.counts = self.counts[keep]
+
+    def distinct(self):
+        return len(self.hashes) << self.level
+
+    def duplicates(self):
+        return int(np.sum(self.counts - 1)) << self.level
+
+
 class NBADatasetExplorer:
     def __init__(self, data_path="../data"):
         self.data_path = Path(data_path)
         self.csv_path = self.data_path / "csv"
         self.sqlite_path = self.data_path / "nba.sqlite"
         self.dataframes = {}
-
+        self.profiles = {}
+
+    # Small datasets the analyze_* methods read in full
+    ANALYSIS_DATASETS = [
+        'player', 'common_player_info', 'game_info', 'game_summary',
+        'draft_history', 'draft_combine_stats', 'team', 'team_details', 'team_history'
+    ]
+
+    # Indexes that turn the SQL-mode aggregations into index scans
+    SQLITE_INDEXES = [
+        ('game', ['game_date']),
+        ('game_info', ['game_date']),
+        ('common_player_info', ['position']),
+        ('draft_history', ['season']),
+        ('draft_history', ['round_number']),
+    ]
+
+    # Join keys checked for orphans in SQL mode
+    SQLITE_JOIN_KEYS = ['game_id', 'team_id', 'person_id', 'player_id']
+
+    # Missing-value counts need a full scan; larger tables are skipped
+    SQLITE_SCAN_LIMIT = 2_000_000
+
+    @timed_stage('explorer')
     def load_all_csv_files(self):
         """Load all CSV files from the archive/csv directory, skipping large files"""
         print("Loading CSV files...")
@@ -33,6 +107,90 @@ class NBADatasetExplorer:
             except Exception as e:
                 print(f"Error loading {csv_file}: {e}")
 
+    @timed_stage('explorer')
+    def load_analysis_files(self):
+        """Load only the small CSV files used by the analyze_* methods"""
+        print("Loading analysis CSV files...")
+        for name in self.ANALYSIS_DATASETS:
+            csv_file = self.csv_path / f"{name}.csv"
+            if not csv_file.exists():
+                continue
+            try:
+                df = pd.read_csv(csv_file)
+                self.dataframes[name] = df
+                print(f"Loaded {name}: {df.shape[0]} rows, {df.shape[1]} columns")
+            except Exception as e:
+                print(f"Error loading {csv_file}: {e}")
+
+    def profile_csv_file(self, csv_file, chunksize=200_000):
+        """Profile a CSV file in bounded-memory chunks"""
+        row_sketch = DistinctSampler(max_size=1_000_000)
+        column_sketches = {}
+        null_counts = None
+        rows = 0
+        memory_bytes = 0
+        peak_chunk_bytes = 0
+
+        for chunk in pd.read_csv(csv_file, chunksize=chunksize, low_memory=False):
+            rows += len(chunk)
+            chunk_bytes = chunk.memory_usage(deep=True).sum()
+            memory_bytes += chunk_bytes
+            peak_chunk_bytes = max(peak_chunk_bytes, chunk_bytes)
+
+            chunk_nulls = chunk.isnull().sum()
+            null_counts = chunk_nulls if null_counts is None else null_counts.add(chunk_nulls, fill_value=0)
+
+            row_sketch.add_hashes(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+            for col in chunk.columns:
+                sketch = column_sketches.setdefault(col, DistinctSampler(max_size=65_536))
+                sketch.add_hashes(pd.util.hash_pandas_object(chunk[col].dropna(), index=False).to_numpy())
+
+        columns = list(null_counts.index) if null_counts is not None else []
+        return {
+            'rows': rows,
+            'columns': columns,
+            'null_counts': null_counts.astype(int).to_dict() if null_counts is not None else {},
+            'approx_distinct': {col: min(sketch.distinct(), rows) for col, sketch in column_sketches.items()},
+            'approx_duplicate_rows': min(row_sketch.duplicates(), rows),
+            'memory_mb': memory_bytes / 1024 / 1024,
+            'peak_chunk_mb': peak_chunk_bytes / 1024 / 1024,
+            'file_mb': csv_file.stat().st_size / 1024 / 1024,
+        }
+
+    @timed_stage('explorer')
+    def profile_all_csv_files(self, chunksize=200_000):
+        """Profile every CSV file, play-by-play included, without loading any of them fully"""
+        print("Profiling CSV files in chunks...")
+        for csv_file in sorted(self.csv_path.glob("*.csv")):
+            try:
+                profile = self.profile_csv_file(csv_file, chunksize)
+                self.profiles[csv_file.stem] = profile
+                print(f"Profiled {csv_file.stem}: {profile['rows']} rows, {len(profile['columns'])} columns")
+            except Exception as e:
+                print(f"Error profiling {csv_file}: {e}")
+
+    def create_streaming_overview(self):
+        """Create the dataset overview from streamed profiles instead of loaded frames"""
+        print("\n=== DATASET OVERVIEW (STREAMING) ===")
+
+        overview_data = []
+        for name, profile in self.profiles.items():
+            overview_data.append({
+                'Dataset': name,
+                'Rows': profile['rows'],
+                'Columns': len(profile['columns']),
+                'Size (MB)': round(profile['memory_mb'], 2),
+                'File (MB)': round(profile['file_mb'], 2),
+                'Missing Values': sum(profile['null_counts'].values()),
+                'Duplicate Rows (approx)': profile['approx_duplicate_rows']
+            })
+
+        overview_df = pd.DataFrame(overview_data)
+        print(overview_df.to_string(index=False))
+
+        return overview_df
+
+    @timed_stage('explorer')
     def explore_sqlite_database(self):
         """Explore the SQLite database structure"""
         if not self.sqlite_path.exists():
@@ -59,6 +217,239 @@ class NBADatasetExplorer:
 
         conn.close()
 
+    def connect_sqlite(self):
+        conn = sqlite3.connect(self.sqlite_path)
+        conn.execute("PRAGMA mmap_size = 268435456")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def _sqlite_tables(self, conn):
+        tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name").fetchall()
+        return {
+            name: [row[1] for row in conn.execute(f'PRAGMA table_info("{name}")')]
+            for (name,) in tables
+        }
+
+    def _join_references(self, conn, tables):
+        """{join key: (reference table, every table with the key)}; the reference is the smallest such table"""
+        references = {}
+        for key in self.SQLITE_JOIN_KEYS:
+            datasets = [name for name, columns in tables.items() if key in columns]
+            if len(datasets) < 2:
+                continue
+            sizes = {name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] for name in datasets}
+            references[key] = (min(datasets, key=lambda name: (sizes[name], name)), datasets)
+        return references
+
+    def ensure_sqlite_indexes(self, conn, tables):
+        """Create the indexes SQL mode's queries use; existing ones are kept.
+
+        Only the GROUP BY columns and each join key's reference table, which
+        the orphan probes look up, are indexed. The indexes are written into
+        nba.sqlite and stay there.
+        """
+        wanted = list(self.SQLITE_INDEXES)
+        wanted += [(reference, [key]) for key, (reference, _) in self._join_references(conn, tables).items()]
+
+        for table, columns in wanted:
+            if table in tables and all(col in tables[table] for col in columns):
+                name = f"idx_{table}_{'_'.join(columns)}"
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({", ".join(columns)})')
+        conn.commit()
+
+    def create_sqlite_overview(self, conn, tables):
+        """Row, column and missing-value counts computed inside SQLite"""
+        print("\n=== DATASET OVERVIEW (SQLITE) ===")
+
+        overview_data = []
+        for name, columns in tables.items():
+            rows = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            missing = None
+            if rows <= self.SQLITE_SCAN_LIMIT and columns:
+                nulls = " + ".join(f'SUM("{col}" IS NULL)' for col in columns)
+                missing = conn.execute(f'SELECT {nulls} FROM "{name}"').fetchone()[0] or 0
+            overview_data.append({
+                'Dataset': name,
+                'Rows': rows,
+                'Columns': len(columns),
+                'Missing Values': missing,
+            })
+
+        overview_df = pd.DataFrame(overview_data)
+        print(overview_df.to_string(index=False))
+
+        return overview_df
+
+    def _sql_describe(self, conn, table, column):
+        count, mean, mean_sq, low, high = conn.execute(
+            f'SELECT COUNT("{column}"), AVG("{column}"), AVG("{column}" * "{column}"), '
+            f'MIN("{column}"), MAX("{column}") FROM "{table}"'
+        ).fetchone()
+        std = np.sqrt(max(mean_sq - mean ** 2, 0) * count / (count - 1)) if count and count > 1 else np.nan
+        return pd.Series({'count': count, 'mean': mean, 'std': std, 'min': low, 'max': high})
+
+    def _sql_counts(self, conn, sql, label):
+        return pd.read_sql_query(sql, conn).set_index(label)['count']
+
+    def analyze_player_data_sql(self, conn, tables):
+        print("\n=== PLAYER DATA ANALYSIS (SQLITE) ===")
+
+        if 'player' in tables:
+            rows = conn.execute('SELECT COUNT(*) FROM player').fetchone()[0]
+            print(f"Player dataset: ({rows}, {len(tables['player'])})")
+            if 'is_active' in tables['player']:
+                active, inactive = conn.execute(
+                    'SELECT SUM(is_active = 1), SUM(is_active = 0) FROM player').fetchone()
+                print(f"Active players: {active}")
+                print(f"Inactive players: {inactive}")
+
+        if 'common_player_info' in tables:
+            columns = tables['common_player_info']
+            rows = conn.execute('SELECT COUNT(*) FROM common_player_info').fetchone()[0]
+            print(f"\nDetailed player info: ({rows}, {len(columns)})")
+
+            if 'position' in columns:
+                print("\nPosition distribution:")
+                print(self._sql_counts(conn, (
+                    "SELECT position, COUNT(*) AS count FROM common_player_info "
+                    "WHERE position IS NOT NULL GROUP BY position ORDER BY count DESC"
+                ), 'position'))
+
+            if 'height' in columns:
+                count, unique = conn.execute(
+                    'SELECT COUNT(height), COUNT(DISTINCT height) FROM common_player_info').fetchone()
+                top = conn.execute(
+                    'SELECT height, COUNT(*) AS n FROM common_player_info WHERE height IS NOT NULL '
+                    'GROUP BY height ORDER BY n DESC LIMIT 1').fetchone()
+                print(f"\nHeight statistics:")
+                print(pd.Series({'count': count, 'unique': unique,
+                                 'top': top[0] if top else None, 'freq': top[1] if top else 0}))
+
+            if 'season_exp' in columns:
+                print(f"\nSeason experience statistics:")
+                print(self._sql_describe(conn, 'common_player_info', 'season_exp'))
+
+    def analyze_game_data_sql(self, conn, tables):
+        print("\n=== GAME DATA ANALYSIS (SQLITE) ===")
+
+        for table in ['game_info', 'game']:
+            if table in tables and 'game_date' in tables[table]:
+                total, first, last = conn.execute(
+                    f'SELECT COUNT(*), MIN(game_date), MAX(game_date) FROM "{table}"').fetchone()
+                print(f"Game info dataset ({table}): ({total}, {len(tables[table])})")
+                print(f"Date range: {first} to {last}")
+                print(f"Total games: {total}")
+
+                games_per_year = self._sql_counts(conn, (
+                    f"SELECT CAST(substr(game_date, 1, 4) AS INTEGER) AS year, COUNT(*) AS count "
+                    f'FROM "{table}" WHERE game_date IS NOT NULL GROUP BY year ORDER BY year'
+                ), 'year')
+                print(f"\nGames per year (last 10 years):")
+                print(games_per_year.tail(10))
+                break
+
+        if 'game_summary' in tables:
+            rows = conn.execute('SELECT COUNT(*) FROM game_summary').fetchone()[0]
+            print(f"\nGame summary dataset: ({rows}, {len(tables['game_summary'])})")
+            print(f"Columns: {tables['game_summary']}")
+
+    def analyze_draft_data_sql(self, conn, tables):
+        print("\n=== DRAFT DATA ANALYSIS (SQLITE) ===")
+
+        if 'draft_history' in tables:
+            columns = tables['draft_history']
+            rows = conn.execute('SELECT COUNT(*) FROM draft_history').fetchone()[0]
+            print(f"Draft history dataset: ({rows}, {len(columns)})")
+
+            if 'season' in columns:
+                print(f"\nDrafts per year (last 10 years):")
+                print(self._sql_counts(conn, (
+                    "SELECT season, COUNT(*) AS count FROM draft_history "
+                    "WHERE season IS NOT NULL GROUP BY season ORDER BY season"
+                ), 'season').tail(10))
+
+            if 'round_number' in columns:
+                print(f"\nPicks per round:")
+                print(self._sql_counts(conn, (
+                    "SELECT round_number, COUNT(*) AS count FROM draft_history "
+                    "WHERE round_number IS NOT NULL GROUP BY round_number ORDER BY round_number"
+                ), 'round_number'))
+
+        if 'draft_combine_stats' in tables:
+            rows = conn.execute('SELECT COUNT(*) FROM draft_combine_stats').fetchone()[0]
+            print(f"\nDraft combine stats: ({rows}, {len(tables['draft_combine_stats'])})")
+            print(f"Columns: {tables['draft_combine_stats']}")
+
+    def analyze_team_data_sql(self, conn, tables):
+        print("\n=== TEAM DATA ANALYSIS (SQLITE) ===")
+
+        for key in ['team', 'team_details', 'team_history']:
+            if key in tables:
+                rows = conn.execute(f'SELECT COUNT(*) FROM "{key}"').fetchone()[0]
+                print(f"\n{key} dataset: ({rows}, {len(tables[key])})")
+                print(f"Columns: {tables[key]}")
+
+    def find_relationships_sql(self, conn, tables):
+        """Shared ID columns, plus keys with no match in the smallest table that has them"""
+        print("\n=== DATASET RELATIONSHIPS (SQLITE) ===")
+
+        id_columns = {}
+        for name, columns in tables.items():
+            for col in columns:
+                if 'id' in col.lower() or 'person' in col.lower():
+                    id_columns.setdefault(col, []).append(name)
+
+        print("Common ID columns across datasets:")
+        for col, datasets in id_columns.items():
+            if len(datasets) > 1:
+                print(f"{col}: {datasets}")
+
+        # Orphan checks are NOT EXISTS probes against the reference table (indexed with --sqlite-indexes)
+        overlap = []
+        for key, (reference, datasets) in self._join_references(conn, tables).items():
+            for name in datasets:
+                if name == reference:
+                    continue
+                distinct, orphans = conn.execute(
+                    f'SELECT COUNT(*), SUM(NOT EXISTS (SELECT 1 FROM "{reference}" r WHERE r.{key} = t.{key})) '
+                    f'FROM (SELECT DISTINCT {key} FROM "{name}" WHERE {key} IS NOT NULL) t'
+                ).fetchone()
+                overlap.append({'Key': key, 'Dataset': name, 'Reference': reference,
+                                'Distinct Keys': distinct, 'Missing From Reference': orphans or 0})
+
+        if overlap:
+            print("\nJoin-key overlap:")
+            print(pd.DataFrame(overlap).to_string(index=False))
+
+    @timed_stage('explorer')
+    def generate_sqlite_report(self, create_indexes=False):
+        """Run the exploration as SQL aggregations on data/nba.sqlite.
+
+        The database is only read unless create_indexes is set, which adds
+        the indexes the queries use to the file permanently.
+        """
+        if not self.sqlite_path.exists():
+            print("SQLite database not found")
+            return None
+
+        conn = self.connect_sqlite()
+        try:
+            tables = self._sqlite_tables(conn)
+            print(f"Tables in database: {list(tables)}")
+            if create_indexes:
+                self.ensure_sqlite_indexes(conn, tables)
+
+            overview = self.create_sqlite_overview(conn, tables)
+            self.analyze_player_data_sql(conn, tables)
+            self.analyze_game_data_sql(conn, tables)
+            self.analyze_draft_data_sql(conn, tables)
+            self.analyze_team_data_sql(conn, tables)
+            self.find_relationships_sql(conn, tables)
+            return overview
+        finally:
+            conn.close()
+
+    @timed_stage('explorer')
     def analyze_player_data(self):
         """Analyze player-related datasets"""
         print("\n=== PLAYER DATA ANALYSIS ===")
@@ -90,6 +481,7 @@ class NBADatasetExplorer:
                 print(f"\nSeason experience statistics:")
                 print(df['season_exp'].describe())
 
+    @timed_stage('explorer')
     def analyze_game_data(self):
         """Analyze game-related datasets"""
         print("\n=== GAME DATA ANALYSIS ===")
@@ -115,6 +507,7 @@ class NBADatasetExplorer:
             print(f"\nGame summary dataset: {df.shape}")
             print(f"Columns: {list(df.columns)}")
 
+    @timed_stage('explorer')
     def analyze_draft_data(self):
         """Analyze draft-related datasets"""
         print("\n=== DRAFT DATA ANALYSIS ===")
@@ -140,6 +533,7 @@ class NBADatasetExplorer:
             print(f"\nDraft combine stats: {df.shape}")
             print(f"Columns: {list(df.columns)}")
 
+    @timed_stage('explorer')
     def analyze_team_data(self):
         """Analyze team-related datasets"""
         print("\n=== TEAM DATA ANALYSIS ===")
@@ -150,6 +544,7 @@ class NBADatasetExplorer:
                 print(f"\n{key} dataset: {df.shape}")
                 print(f"Columns: {list(df.columns)}")
 
+    @timed_stage('explorer')
     def create_data_overview(self):
         """Create a comprehensive overview of all datasets"""
         print("\n=== DATASET OVERVIEW ===")
@@ -170,14 +565,19 @@ class NBADatasetExplorer:
 
         return overview_df
 
+    @timed_stage('explorer')
     def find_relationships(self):
         """Find relationships between different datasets"""
         print("\n=== DATASET RELATIONSHIPS ===")
 
         # Check for common ID columns
+        dataset_columns = {name: list(df.columns) for name, df in self.dataframes.items()}
+        for name, profile in self.profiles.items():
+            dataset_columns.setdefault(name, profile['columns'])
+
         id_columns = {}
-        for name, df in self.dataframes.items():
-            for col in df.columns:
+        for name, columns in dataset_columns.items():
+            for col in columns:
                 if 'id' in col.lower() or 'person' in col.lower():
                     if col not in id_columns:
                         id_columns[col] = []
@@ -188,17 +588,34 @@ class NBADatasetExplorer:
             if len(datasets) > 1:
                 print(f"{col}: {datasets}")
 
-    def generate_summary_report(self):
+    def generate_summary_report(self, streaming=False, chunksize=200_000, sqlite=False, sqlite_indexes=False):
         """Generate a comprehensive summary report"""
         print("\n" + "="*50)
         print("NBA DATASET EXPLORATION SUMMARY (FAST VERSION)")
         print("="*50)
 
-        # Load all data
-        self.load_all_csv_files()
+        if sqlite:
+            # Every aggregation runs inside SQLite; no table is loaded into pandas
+            overview = self.generate_sqlite_report(create_indexes=sqlite_indexes)
+
+            print("\n" + "="*50)
+            print("EXPLORATION COMPLETE")
+            print("="*50)
+
+            write_metrics('explorer')
+            return overview
 
-        # Create overview
-        overview = self.create_data_overview()
+        if streaming:
+            # Profile every file in chunks, then load only the small analysis files
+            self.profile_all_csv_files(chunksize)
+            overview = self.create_streaming_overview()
+            self.load_analysis_files()
+        else:
+            # Load all data
+            self.load_all_csv_files()
+
+            # Create overview
+            overview = self.create_data_overview()
 
         # Analyze specific data types
         self.analyze_player_data()
@@ -216,8 +633,22 @@ class NBADatasetExplorer:
         print("EXPLORATION COMPLETE")
         print("="*50)
 
+        write_metrics('explorer')
         return overview
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Explore the NBA dataset")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Profile every CSV (play-by-play included) in bounded-memory chunks")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--sqlite", action="store_true",
+                        help="Run the analysis as SQL queries on data/nba.sqlite")
+    parser.add_argument("--sqlite-indexes", action="store_true",
+                        help="With --sqlite, add the indexes the queries use to nba.sqlite (kept in the file)")
+    args = parser.parse_args()
+
     explorer = NBADatasetExplorer()
-    overview = explorer.generate_summary_report()
+    overview = explorer.generate_summary_report(streaming=args.streaming, chunksize=args.chunksize,
+                                                sqlite=args.sqlite, sqlite_indexes=args.sqlite_indexes)
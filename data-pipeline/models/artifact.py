@@ -0,0 +1,276 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Serving-side model format: a manifest.json plus one .npy file per flat array.
+# Loading needs only numpy; arrays are memory-mapped on first use.
+
+MANIFEST_FILE = "manifest.json"
+# 2: per-node missing-value directions and a per-kind input dtype
+ARTIFACT_FORMAT = 2
+
+
+def _tree_depth(left, right):
+    depth, level, nodes = 0, 0, [0]
+    while nodes:
+        depth = level
+        nodes = [child for node in nodes if left[node] != -1 for child in (left[node], right[node])]
+        level += 1
+    return depth
+
+
+def _flatten_trees(trees):
+    """Concatenate trees into flat node arrays with per-tree root offsets.
+
+    Each tree is (left, right, feature, threshold, missing_left, value) with
+    -1 children at leaves. A row goes left when its feature is <= threshold,
+    or when the feature is NaN and missing_left is set.
+    """
+    offsets, left, right, feature, threshold, missing_left, value = [], [], [], [], [], [], []
+    base, max_depth = 0, 0
+    for tree_left, tree_right, tree_feature, tree_threshold, tree_missing, leaves in trees:
+        tree_left, tree_right = np.asarray(tree_left, dtype=np.int64), np.asarray(tree_right, dtype=np.int64)
+        is_leaf = tree_left == -1
+        offsets.append(base)
+        # Leaves point at themselves so a fixed number of descent steps is safe
+        node_ids = np.arange(len(tree_left)) + base
+        left.append(np.where(is_leaf, node_ids, tree_left + base))
+        right.append(np.where(is_leaf, node_ids, tree_right + base))
+        feature.append(np.where(is_leaf, 0, tree_feature))
+        threshold.append(tree_threshold)
+        missing_left.append(np.asarray(tree_missing, dtype=bool) & ~is_leaf)
+        value.append(leaves)
+        max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+        base += len(tree_left)
+
+    return {
+        'roots': np.asarray(offsets, dtype=np.int64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'missing_left': np.concatenate(missing_left),
+        'value': np.concatenate(value).astype(np.float64),
+    }, max_depth
+
+
+def _sklearn_tree(tree, leaves):
+    # missing_go_to_left also covers features without NaN in training, where
+    # sklearn sends NaN to the child that saw the most samples
+    return (tree.children_left, tree.children_right, tree.feature, tree.threshold,
+            tree.missing_go_to_left, leaves)
+
+
+def _hist_tree(nodes):
+    if nodes['is_categorical'].any():
+        raise ValueError("Cannot export categorical splits to a compact artifact")
+    is_leaf = nodes['is_leaf'].astype(bool)
+    return (np.where(is_leaf, -1, nodes['left'].astype(np.int64)),
+            np.where(is_leaf, -1, nodes['right'].astype(np.int64)),
+            nodes['feature_idx'], nodes['num_threshold'], nodes['missing_go_to_left'], nodes['value'])
+
+
+def _lightgbm_tree(root):
+    left, right, feature, threshold, missing_left, value = [], [], [], [], [], []
+    stack = [(root, None, None)]
+    while stack:
+        node, parent, side = stack.pop()
+        index = len(left)
+        if parent is not None:
+            (left if side == 'left' else right)[parent] = index
+        left.append(-1)
+        right.append(-1)
+        if 'leaf_value' in node:
+            feature.append(0)
+            threshold.append(0.0)
+            missing_left.append(False)
+            value.append(node['leaf_value'])
+            continue
+        if node['decision_type'] != '<=' or node['missing_type'] == 'Zero':
+            raise ValueError("Cannot export categorical or zero-as-missing splits to a compact artifact")
+        feature.append(node['split_feature'])
+        threshold.append(node['threshold'])
+        # Without a learned direction LightGBM predicts NaN as 0.0
+        missing_left.append(node['default_left'] if node['missing_type'] == 'NaN' else 0.0 <= node['threshold'])
+        value.append(0.0)
+        stack.append((node['right_child'], index, 'right'))
+        stack.append((node['left_child'], index, 'left'))
+    return left, right, feature, threshold, missing_left, value
+
+
+def _xgboost_trees(booster, feature_names):
+    frame = booster.trees_to_dataframe()
+    if frame['Category'].notna().any():
+        raise ValueError("Cannot export categorical splits to a compact artifact")
+    columns = {name: i for i, name in enumerate(feature_names)}
+    trees = []
+    for _, tree in frame.groupby('Tree', sort=True):
+        tree = tree.sort_values('Node')
+        node_index = {node_id: i for i, node_id in enumerate(tree['ID'])}
+        is_leaf = (tree['Feature'] == 'Leaf').to_numpy()
+        left, right, missing = (
+            np.array([-1 if leaf else node_index[child] for leaf, child in zip(is_leaf, tree[col])])
+            for col in ('Yes', 'No', 'Missing')
+        )
+        feature = [0 if leaf else columns[name] if name in columns else int(name[1:])
+                   for leaf, name in zip(is_leaf, tree['Feature'])]
+        # XGBoost goes left on x < split in float32; <= the next float32 below is the same test
+        split = tree['Split'].fillna(0).to_numpy(dtype=np.float32)
+        threshold = np.nextafter(split, np.float32(-np.inf))
+        value = np.where(is_leaf, tree['Gain'].to_numpy(), 0.0)
+        trees.append((left, right, feature, threshold, (missing == left) & ~is_leaf, value))
+    return trees
+
+
+def _descend(arrays, X, max_depth):
+    """Leaf value of every tree for every row of X"""
+    rows = np.arange(len(X))[:, None]
+    node = np.broadcast_to(arrays['roots'], (len(X), len(arrays['roots']))).copy()
+    for _ in range(max_depth):
+        x = X[rows, arrays['feature'][node]]
+        go_left = np.where(np.isnan(x), arrays['missing_left'][node], x <= arrays['threshold'][node])
+        node = np.where(go_left, arrays['left'][node], arrays['right'][node])
+    return arrays['value'][node]
+
+
+def export_artifact(model, feature_names, path, version=None, metrics=None):
+    """Export a fitted tree ensemble or LogisticRegression binary classifier.
+
+    Supports RandomForest, GradientBoosting, HistGradientBoosting, LightGBM
+    and XGBoost classifiers with numeric splits.
+    """
+    import pandas as pd
+    from sklearn.ensemble import (GradientBoostingClassifier, HistGradientBoostingClassifier,
+                                  RandomForestClassifier)
+    from sklearn.linear_model import LogisticRegression
+
+    path = Path(path)
+    feature_names = list(feature_names)
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'model_class': type(model).__name__,
+        'feature_names': feature_names,
+        'version': version,
+        'metrics': metrics or {},
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    # Boosters' constant initial log-odds, recovered through the public API
+    probe = pd.DataFrame(np.zeros((1, len(feature_names)), dtype=np.float32), columns=feature_names)
+    model_class = type(model).__name__
+
+    if isinstance(model, RandomForestClassifier):
+        trees = [est.tree_ for est in model.estimators_]
+        # Class-1 fraction at each leaf; predict_proba averages these over trees
+        arrays, max_depth = _flatten_trees(
+            [_sklearn_tree(t, t.value[:, 0, 1] / t.value[:, 0, :].sum(axis=1)) for t in trees])
+        manifest['kind'] = 'forest'
+        # sklearn trees compare float32 inputs against float64 thresholds
+        manifest['input_dtype'] = 'float32'
+    elif isinstance(model, GradientBoostingClassifier) and model.n_classes_ == 2:
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+        arrays, max_depth = _flatten_trees(
+            [_sklearn_tree(t, t.value[:, 0, 0] * model.learning_rate) for t in trees])
+        manifest['kind'] = 'boosting'
+        manifest['input_dtype'] = 'float32'
+        raw = model.decision_function(probe)[0]
+    elif isinstance(model, HistGradientBoostingClassifier) and model.n_trees_per_iteration_ == 1:
+        # Leaf values already include the learning rate
+        arrays, max_depth = _flatten_trees([_hist_tree(p[0].nodes) for p in model._predictors])
+        manifest['kind'] = 'boosting'
+        manifest['input_dtype'] = 'float64'
+        raw = model.decision_function(probe)[0]
+    elif model_class == 'LGBMClassifier' and len(model.classes_) == 2:
+        dump = model.booster_.dump_model()
+        arrays, max_depth = _flatten_trees([_lightgbm_tree(t['tree_structure']) for t in dump['tree_info']])
+        manifest['kind'] = 'boosting'
+        manifest['input_dtype'] = 'float64'
+        raw = model.predict(probe, raw_score=True)[0]
+    elif model_class == 'XGBClassifier' and len(model.classes_) == 2:
+        arrays, max_depth = _flatten_trees(_xgboost_trees(model.get_booster(), feature_names))
+        manifest['kind'] = 'boosting'
+        manifest['input_dtype'] = 'float32'
+        raw = model.predict(probe, output_margin=True)[0]
+    elif isinstance(model, LogisticRegression) and len(model.classes_) == 2:
+        arrays = {'coef': model.coef_[0].astype(np.float64)}
+        manifest['kind'] = 'linear'
+        manifest['intercept'] = float(model.intercept_[0])
+    else:
+        raise ValueError(f"Cannot export {type(model).__name__} to a compact artifact")
+
+    if manifest['kind'] != 'linear':
+        manifest['max_depth'] = int(max_depth)
+    if manifest['kind'] == 'boosting':
+        leaves = _descend(arrays, probe.to_numpy(dtype=manifest['input_dtype']), max_depth)
+        manifest['init'] = float(raw - leaves.sum(axis=1)[0])
+
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.npy"):
+        stale.unlink()
+    for name, array in arrays.items():
+        np.save(path / f"{name}.npy", np.ascontiguousarray(array))
+    with open(path / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+class CompactModel:
+    """Flat-array evaluator with the predict/predict_proba surface of the sklearn model"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_FILE) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"Artifact format {self.manifest.get('format')} is not {ARTIFACT_FORMAT}; re-export the model")
+        self.feature_names_in_ = np.asarray(self.manifest['feature_names'], dtype=object)
+        self.classes_ = np.array([0, 1])
+        self.version = self.manifest.get('version')
+        self._arrays = None
+
+    @property
+    def arrays(self):
+        if self._arrays is None:
+            self._arrays = {
+                npy.stem: np.load(npy, mmap_mode='r') for npy in self.path.glob("*.npy")
+            }
+        return self._arrays
+
+    def _matrix(self, X):
+        if hasattr(X, 'columns'):
+            X = X[list(self.manifest['feature_names'])].to_numpy(dtype=np.float64)
+        return np.asarray(X, dtype=np.float64)
+
+    def _leaf_values(self, X):
+        X = X.astype(self.manifest['input_dtype'])
+        return _descend(self.arrays, X, self.manifest['max_depth'])
+
+    def decision_function(self, X):
+        X = self._matrix(X)
+        kind = self.manifest['kind']
+        if kind == 'linear':
+            return X @ self.arrays['coef'] + self.manifest['intercept']
+        if kind == 'boosting':
+            return self.manifest['init'] + self._leaf_values(X).sum(axis=1)
+        raise AttributeError("decision_function is not available for forest artifacts")
+
+    def predict_proba(self, X):
+        if self.manifest['kind'] == 'forest':
+            p = self._leaf_values(self._matrix(X)).mean(axis=1)
+        else:
+            p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+
+
+def load_model(path):
+    """Load a compact artifact directory, or fall back to a joblib pickle"""
+    path = Path(path)
+    if (path / MANIFEST_FILE).exists():
+        return CompactModel(path)
+    import joblib
+    return joblib.load(path)
@@ -0,0 +1,80 @@
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+
+def _lightgbm(**params):
+    from lightgbm import LGBMClassifier
+    return LGBMClassifier(**params)
+
+
+def _xgboost(**params):
+    from xgboost import XGBClassifier
+    return XGBClassifier(**params)
+
+
+class ModelBackend:
+    """A named estimator factory with the defaults train_models uses.
+
+    `handles_missing` backends route NaN features natively, so rows with
+    missing values can be kept when every selected backend has it.
+    """
+
+    def __init__(self, name, factory, defaults=None, handles_missing=False, requires=None, n_jobs_param=None):
+        self.name = name
+        self.factory = factory
+        self.defaults = defaults or {}
+        self.handles_missing = handles_missing
+        self.requires = requires
+        self.n_jobs_param = n_jobs_param
+
+    def available(self):
+        if self.requires is None:
+            return True
+        try:
+            __import__(self.requires)
+            return True
+        except ImportError:
+            return False
+
+    def build(self, params=None, n_jobs=None):
+        params = dict(self.defaults, **(params or {}))
+        if n_jobs is not None and self.n_jobs_param:
+            params[self.n_jobs_param] = n_jobs
+        return self.factory(**params)
+
+
+BACKENDS = {
+    'random_forest': ModelBackend(
+        'Random Forest', RandomForestClassifier,
+        {'n_estimators': 100, 'random_state': 42}, n_jobs_param='n_jobs'),
+    'gradient_boosting': ModelBackend(
+        'Gradient Boosting', GradientBoostingClassifier,
+        {'n_estimators': 100, 'random_state': 42}),
+    'logistic_regression': ModelBackend(
+        'Logistic Regression', LogisticRegression,
+        {'random_state': 42, 'max_iter': 1000}),
+    # Histogram boosters: binned features, OpenMP threads, NaN sent down a learned branch
+    'hist_gradient_boosting': ModelBackend(
+        'Hist Gradient Boosting', HistGradientBoostingClassifier,
+        {'max_iter': 200, 'learning_rate': 0.1, 'early_stopping': False, 'random_state': 42},
+        handles_missing=True),
+    'lightgbm': ModelBackend(
+        'LightGBM', _lightgbm,
+        {'n_estimators': 200, 'learning_rate': 0.05, 'num_leaves': 31, 'random_state': 42, 'verbose': -1},
+        handles_missing=True, requires='lightgbm', n_jobs_param='n_jobs'),
+    'xgboost': ModelBackend(
+        'XGBoost', _xgboost,
+        {'n_estimators': 200, 'learning_rate': 0.05, 'max_depth': 6, 'tree_method': 'hist', 'random_state': 42},
+        handles_missing=True, requires='xgboost', n_jobs_param='n_jobs'),
+}
+
+DEFAULT_BACKENDS = ['random_forest', 'gradient_boosting', 'logistic_regression']
+
+
+def get_backend(key):
+    if key not in BACKENDS:
+        raise ValueError(f"Unknown model backend: {key} (choose from {', '.join(BACKENDS)})")
+    backend = BACKENDS[key]
+    if not backend.available():
+        raise ValueError(f"Model backend {key} needs the {backend.requires} package")
+    return backend
@@ -0,0 +1,158 @@
+import sys
+import time
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss
+
+from joblib import Parallel, delayed
+
+warnings.filterwarnings("ignore")
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Models whose warm start converges to the same solution as a cold fit (convex
+# objectives). Tree ensembles are refit per window: warm-starting them on a
+# grown training set would keep trees fitted on older, smaller data.
+WARM_START_MODELS = (LogisticRegression,)
+
+
+def season_windows(seasons, min_train_seasons=1):
+    """Walk-forward windows: train on every season before N+1, test on season N+1"""
+    seasons = np.asarray(seasons)
+    ordered = np.unique(seasons)
+    return [
+        (test_season, np.flatnonzero(seasons < test_season), np.flatnonzero(seasons == test_season))
+        for test_season in ordered[min_train_seasons:]
+    ]
+
+
+def _run_windows(model, X, y, feature_names, windows):
+    # Consecutive windows in one worker, so a warm-startable model carries its
+    # coefficients from season N into season N+1
+    warm = isinstance(model, WARM_START_MODELS)
+    model = clone(model)
+    if warm:
+        model.set_params(warm_start=True)
+
+    rows = []
+    for position, (test_season, train_idx, test_idx) in enumerate(windows):
+        fitted = model if warm else clone(model)
+        start = time.perf_counter()
+        fitted.fit(pd.DataFrame(X[train_idx], columns=feature_names), y[train_idx])
+        fit_seconds = time.perf_counter() - start
+
+        proba = fitted.predict_proba(pd.DataFrame(X[test_idx], columns=feature_names))[:, 1]
+        y_test = y[test_idx]
+        rows.append({
+            'test_season': test_season,
+            'train_games': len(train_idx),
+            'test_games': len(test_idx),
+            'accuracy': accuracy_score(y_test, (proba > 0.5).astype(int)),
+            'log_loss': log_loss(y_test, proba, labels=[0, 1]),
+            'brier': brier_score_loss(y_test, proba),
+            'fit_seconds': fit_seconds,
+            # The first window of a chain has no earlier solution to start from
+            'warm_start': warm and position > 0,
+        })
+    return rows
+
+
+class WalkForwardBacktester:
+    """Season-by-season walk-forward evaluation of a set of models.
+
+    Every window is an independent task on one process pool, except for
+    warm-startable models, whose windows are split into contiguous chains of
+    `chain_length` seasons so each fit after a chain's first starts from the
+    previous season's solution. The chain length is fixed rather than derived
+    from the core count: with one chain per core, a machine with as many
+    cores as seasons would get one-window chains and never warm start.
+    """
+
+    def __init__(self, models, n_jobs=-1, min_train_seasons=1, chain_length=4):
+        self.models = models
+        self.n_jobs = n_jobs
+        self.min_train_seasons = min_train_seasons
+        self.chain_length = chain_length
+
+    def tasks(self, X_values, y_values, feature_names, windows):
+        """(model name, delayed call) pairs; each call returns a list of window rows"""
+        tasks = []
+        for name, model in self.models.items():
+            if isinstance(model, WARM_START_MODELS):
+                groups = [windows[i:i + self.chain_length] for i in range(0, len(windows), self.chain_length)]
+            else:
+                groups = [[window] for window in windows]
+            for group in groups:
+                tasks.append((name, delayed(_run_windows)(model, X_values, y_values, feature_names, group)))
+        return tasks
+
+    def run(self, X, y, seasons):
+        X_values = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+        y_values = np.asarray(y)
+        feature_names = list(X.columns)
+        windows = season_windows(seasons, self.min_train_seasons)
+        if not windows:
+            raise ValueError("Walk-forward backtest needs at least two seasons")
+
+        tasks = self.tasks(X_values, y_values, feature_names, windows)
+        print(f"Backtesting {len(self.models)} models over {len(windows)} seasons "
+              f"({len(tasks)} tasks, n_jobs={self.n_jobs})...")
+        outputs = Parallel(n_jobs=self.n_jobs, backend='loky', max_nbytes='1M', mmap_mode='r')(
+            task for _, task in tasks
+        )
+
+        rows = [dict(row, model=name) for (name, _), out in zip(tasks, outputs) for row in out]
+        results = pd.DataFrame(rows)
+        return results[['model'] + [col for col in results.columns if col != 'model']] \
+            .sort_values(['model', 'test_season']).reset_index(drop=True)
+
+    @staticmethod
+    def summary(results):
+        """Per-model metrics over all test seasons, weighted by games"""
+        def aggregate(group):
+            weights = group['test_games']
+            return pd.Series({
+                'seasons': len(group),
+                'test_games': weights.sum(),
+                'accuracy': np.average(group['accuracy'], weights=weights),
+                'log_loss': np.average(group['log_loss'], weights=weights),
+                'brier': np.average(group['brier'], weights=weights),
+                'worst_season_accuracy': group['accuracy'].min(),
+                'fit_seconds': group['fit_seconds'].sum(),
+            })
+
+        return results.groupby('model').apply(aggregate).sort_values('accuracy', ascending=False)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from models.train_model import NBAPredictor
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest: train on seasons <= N, test on N+1")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Worker processes (-1 = all cores)")
+    parser.add_argument("--min-train-seasons", type=int, default=1,
+                        help="Seasons of history required before the first test season")
+    parser.add_argument("--chain-length", type=int, default=4,
+                        help="Consecutive seasons a warm-startable model fits in one task")
+    args = parser.parse_args()
+
+    predictor = NBAPredictor(n_jobs=args.n_jobs)
+    games = predictor.load_enhanced_data(columns=NBAPredictor.FEATURE_COLUMNS + ['home_win', 'season'])
+    X, y, feature_names = predictor.prepare_features(games)
+
+    # The season windows already fill the pool, so each fit stays on one thread
+    backtester = WalkForwardBacktester(predictor.build_models(n_jobs=1), n_jobs=args.n_jobs,
+                                       min_train_seasons=args.min_train_seasons, chain_length=args.chain_length)
+    results = backtester.run(X, y, games.loc[X.index, 'season'])
+    summary = backtester.summary(results)
+
+    results_file = predictor.models_path / "backtest_results.csv"
+    results.to_csv(results_file, index=False)
+    print(summary.to_string(float_format=lambda v: f"{v:.3f}"))
+    print(f"Saved per-season results to {results_file}")
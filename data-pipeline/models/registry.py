@@ -0,0 +1,161 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.artifact import export_artifact, load_model
+
+
+def _atomic_write(path, text):
+    """Write via a temp file and rename, so readers never see a partial file"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """Local, file-based registry of trained model versions.
+
+    Each version lives in `versions/<version>/` with a compact serving
+    artifact, the original pickle and a metadata.json (model name, feature
+    list, accuracy and CV metrics). `index.json` lists versions and the
+    promotion history; the `current` and `shadow` pointer files name the
+    versions serving processes should load and are replaced atomically.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else Path(__file__).parent / "registry"
+        self.versions_path = self.root / "versions"
+
+    def _read_index(self):
+        index_file = self.root / "index.json"
+        if not index_file.exists():
+            return {'versions': [], 'promotions': []}
+        with open(index_file) as f:
+            return json.load(f)
+
+    def _write_index(self, index):
+        self.root.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.root / "index.json", json.dumps(index, indent=2))
+
+    def _read_pointer(self, name):
+        pointer = self.root / name
+        if not pointer.exists():
+            return None
+        return pointer.read_text().strip() or None
+
+    def _write_pointer(self, name, version):
+        self.root.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.root / name, version or "")
+
+    def register(self, model, feature_names, model_name, metrics, config=None):
+        """Store a fitted model (and the configuration that produced it) and return its new version id"""
+        import joblib
+
+        version = f"{datetime.now():%Y%m%d%H%M%S%f}-{model_name.lower().replace(' ', '-')}"
+        version_path = self.versions_path / version
+        version_path.mkdir(parents=True)
+
+        joblib.dump(model, version_path / "model.pkl")
+        try:
+            export_artifact(model, feature_names, version_path / "artifact", version=version, metrics=metrics)
+        except ValueError:
+            shutil.rmtree(version_path / "artifact", ignore_errors=True)
+
+        metadata = {
+            'version': version,
+            'model_name': model_name,
+            'feature_names': list(feature_names),
+            'metrics': metrics,
+            'config': config,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        with open(version_path / "metadata.json", 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+        index = self._read_index()
+        index['versions'].append(metadata)
+        self._write_index(index)
+        return version
+
+    def list_versions(self):
+        return self._read_index()['versions']
+
+    def metadata(self, version):
+        with open(self.versions_path / version / "metadata.json") as f:
+            return json.load(f)
+
+    def model_path(self, version):
+        artifact = self.versions_path / version / "artifact"
+        return artifact if artifact.exists() else self.versions_path / version / "model.pkl"
+
+    def load(self, version):
+        return load_model(self.model_path(version))
+
+    def current_version(self):
+        return self._read_pointer("current")
+
+    def shadow_version(self):
+        return self._read_pointer("shadow")
+
+    def promote(self, version):
+        if not (self.versions_path / version).exists():
+            raise ValueError(f"Unknown model version: {version}")
+        index = self._read_index()
+        index['promotions'].append({'version': version, 'promoted_at': datetime.now().isoformat(timespec='seconds')})
+        self._write_index(index)
+        self._write_pointer("current", version)
+
+    def rollback(self):
+        """Re-promote the version that was current before the latest promotion"""
+        index = self._read_index()
+        promotions = index['promotions']
+        if len(promotions) < 2:
+            raise ValueError("No earlier promoted version to roll back to")
+        promotions.pop()
+        previous = promotions[-1]['version']
+        self._write_index(index)
+        self._write_pointer("current", previous)
+        return previous
+
+    def set_shadow(self, version):
+        if version is not None and not (self.versions_path / version).exists():
+            raise ValueError(f"Unknown model version: {version}")
+        self._write_pointer("shadow", version)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage registered NBA prediction models")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    commands.add_parser("rollback")
+    promote = commands.add_parser("promote")
+    promote.add_argument("version")
+    shadow = commands.add_parser("shadow")
+    shadow.add_argument("version", nargs="?", default=None, help="Omit to stop shadow scoring")
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    if args.command == "list":
+        current, shadow_version = registry.current_version(), registry.shadow_version()
+        for entry in registry.list_versions():
+            marker = "*" if entry['version'] == current else "s" if entry['version'] == shadow_version else " "
+            metrics = entry['metrics']
+            print(f"{marker} {entry['version']}  acc={metrics.get('accuracy', float('nan')):.3f}  "
+                  f"cv={metrics.get('cv_mean', float('nan')):.3f}")
+    elif args.command == "promote":
+        registry.promote(args.version)
+        print(f"Promoted {args.version}")
+    elif args.command == "rollback":
+        print(f"Rolled back to {registry.rollback()}")
+    elif args.command == "shadow":
+        registry.set_shadow(args.version)
+        print(f"Shadow model: {args.version or 'none'}")
@@ -0,0 +1,500 @@
+import asyncio
+import copy
+import hashlib
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi import BackgroundTasks, FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.artifact import MANIFEST_FILE, load_model
+from models.registry import ModelRegistry
+from models.simulate import SeasonSimulator
+from processors.feature_store import STATE_FEATURES, TeamFeatureStore
+from processors.metrics import MODEL_RELOADS, REQUEST_LATENCY, exposition
+from processors.storage import ColumnarStore
+
+MODELS_PATH = Path(__file__).parent
+FEATURES_PATH = Path(__file__).parent.parent / "features"
+PROCESSED_PATH = Path(__file__).parent.parent / "data" / "processed"
+MAX_SIMULATIONS = 100_000
+
+
+def default_model_path():
+    artifact = MODELS_PATH / "nba_predictor_model"
+    if (artifact / MANIFEST_FILE).exists():
+        return artifact
+    return MODELS_PATH / "nba_predictor_model.pkl"
+
+
+def load_team_features(columns):
+    store = ColumnarStore(FEATURES_PATH)
+    if store.exists("enhanced_features"):
+        stored = set(store.columns("enhanced_features"))
+        return store.read("enhanced_features", columns=[col for col in columns if col in stored])
+
+    # CSV fallback goes through the trainer, which converts it to Parquet once
+    from models.train_model import NBAPredictor
+    return NBAPredictor().load_enhanced_data(columns=columns)
+
+
+class MatchupRequest(BaseModel):
+    homeTeam: str
+    awayTeam: str
+    # ISO date; omitted means the day after the last game in the feature store
+    gameDate: str | None = None
+
+
+class BatchRequest(BaseModel):
+    games: list[MatchupRequest]
+
+
+class TeamRecord(BaseModel):
+    wins: int
+    losses: int
+
+
+class SimulationRequest(BaseModel):
+    # Remaining games; omitted means a full 82-game season from 0-0, with no standings
+    games: list[MatchupRequest] | None = None
+    standings: dict[str, TeamRecord] | None = None
+    iterations: int = 10_000
+    seed: int = 0
+
+
+class TeamFeatureIndex:
+    """Per-team feature profiles built from the most recent games in enhanced_features.
+
+    A team's home profile is the mean feature row of its last `window` home
+    games and its away profile the mean of its last `window` away games. Both
+    are in home-minus-away orientation, so a matchup vector is the average of
+    the home team's home profile and the away team's away profile.
+    """
+
+    def __init__(self, games, feature_names, window=41):
+        self.feature_names = list(feature_names)
+        games = games.sort_values('game_date')
+
+        home = games.groupby('home_team_abbr', observed=True).tail(window)
+        away = games.groupby('away_team_abbr', observed=True).tail(window)
+        home_profiles = home.groupby('home_team_abbr', observed=True)[self.feature_names].mean()
+        away_profiles = away.groupby('away_team_abbr', observed=True)[self.feature_names].mean()
+
+        self.teams = sorted(set(home_profiles.index) & set(away_profiles.index))
+        self.home_profiles = home_profiles.loc[self.teams].to_numpy(dtype=np.float64)
+        self.away_profiles = away_profiles.loc[self.teams].to_numpy(dtype=np.float64)
+
+        self.aliases = {}
+        for side in ('home', 'away'):
+            names = games[[f'{side}_team_abbr', f'{side}_team_name']].drop_duplicates()
+            for abbr, name in names.itertuples(index=False):
+                if abbr not in self.teams or pd.isna(name):
+                    continue
+                self.aliases[str(name).lower()] = abbr
+                self.aliases[str(name).split()[-1].lower()] = abbr
+        for abbr in self.teams:
+            self.aliases[abbr.lower()] = abbr
+
+    def resolve(self, team):
+        return self.aliases.get(team.strip().lower())
+
+    def matchup_features(self, home_idx, away_idx):
+        """Stacked feature rows for arrays of home and away team positions"""
+        return (self.home_profiles[home_idx] + self.away_profiles[away_idx]) / 2
+
+    def all_matchups(self):
+        n = len(self.teams)
+        return np.nonzero(~np.eye(n, dtype=bool))
+
+
+class PredictionServer:
+    """Scores matchups with one model over per-team profiles and, when present, the team feature store.
+
+    A store read from `feature_store_path` (the processed data directory by
+    default) is watched: `reload_feature_store` returns a re-scored copy once
+    a newer state has been saved there.
+    """
+
+    def __init__(self, model_path=None, features=None, window=41, feature_store=None, feature_store_path=None):
+        model_path = Path(model_path or default_model_path())
+        self.model = load_model(model_path)
+        with open(model_path / MANIFEST_FILE if model_path.is_dir() else model_path, 'rb') as f:
+            self.model_hash = hashlib.sha1(f.read()).hexdigest()[:12]
+
+        feature_names = getattr(self.model, 'feature_names_in_', None)
+        if feature_names is None:
+            from models.train_model import NBAPredictor
+            feature_names = NBAPredictor.FEATURE_COLUMNS
+        self.feature_names = list(feature_names)
+
+        if features is None:
+            features = load_team_features(self.feature_names + [
+                'game_date', 'home_team_abbr', 'away_team_abbr', 'home_team_name', 'away_team_name'
+            ])
+        self.index = TeamFeatureIndex(features, self.feature_names, window)
+        self.positions = {team: i for i, team in enumerate(self.index.teams)}
+
+        self.feature_store_source = None
+        self.feature_store_stamp = None
+        if feature_store is None:
+            source = ColumnarStore(feature_store_path or PROCESSED_PATH)
+            if TeamFeatureStore.exists(source):
+                self.feature_store_source = source
+                # Stamp before loading, so a save that lands in between is picked up next time
+                self.feature_store_stamp = TeamFeatureStore.saved_stamp(source)
+                feature_store = TeamFeatureStore.load(source)
+        self._use_feature_store(feature_store)
+
+    def _use_feature_store(self, feature_store):
+        self.feature_store = feature_store
+
+        # Changes whenever the model file or the feature store state changes; API caches key on it
+        self.version = self.model_hash
+        if feature_store is not None and feature_store.last_applied is not None:
+            self.version += (f"-{feature_store.last_applied[0]:%Y%m%d}-{feature_store.last_applied[1]}"
+                             f"-{feature_store.fingerprint()}")
+
+        # Date the pre-scored table below describes; requests for other dates are scored live
+        self.scored_date = feature_store.default_date() if feature_store is not None else None
+
+        # All ~870 ordered matchups are scored once in a single batch
+        home_idx, away_idx = self.index.all_matchups()
+        home_win = self.score(home_idx, away_idx)
+        self.home_win_proba = {
+            (self.index.teams[h], self.index.teams[a]): p
+            for h, a, p in zip(home_idx, away_idx, home_win.tolist())
+        }
+
+    def reload_feature_store(self):
+        """A copy scoring with the newly saved feature store, or None if it has not changed"""
+        if self.feature_store_source is None:
+            return None
+        stamp = TeamFeatureStore.saved_stamp(self.feature_store_source)
+        if stamp is None or stamp == self.feature_store_stamp:
+            return None
+        server = copy.copy(self)
+        server.feature_store_stamp = stamp
+        server._use_feature_store(TeamFeatureStore.load(self.feature_store_source))
+        return server
+
+    def score(self, home_idx, away_idx, game_dates=None):
+        """Home-win probabilities for many matchups from one predict_proba call.
+
+        `game_dates` gives each matchup's date for the feature store's rest and
+        calendar features; None entries use the day after its last game.
+        """
+        X = pd.DataFrame(self.index.matchup_features(home_idx, away_idx), columns=self.feature_names)
+
+        # Pre-game state (form, rest, head-to-head) comes from the feature store when available
+        if self.feature_store is not None:
+            overlay = [col for col in STATE_FEATURES if col in X.columns]
+            state = self.feature_store.matchup_frame(
+                [self.index.teams[h] for h in home_idx], [self.index.teams[a] for a in away_idx], game_dates
+            )[overlay]
+            X[overlay] = state.where(state.notna(), X[overlay])
+
+        return self.model.predict_proba(X)[:, 1]
+
+    def _resolve_matchup(self, home_team, away_team):
+        home = self.index.resolve(home_team)
+        away = self.index.resolve(away_team)
+        if home is None or away is None:
+            unknown = home_team if home is None else away_team
+            return None, None, f"Unknown team: {unknown}"
+        if home == away:
+            return None, None, "A team cannot play itself"
+        return home, away, None
+
+    def _resolve_date(self, game_date):
+        """(date, error) for a request's gameDate; None means the pre-scored default date"""
+        if game_date is None or self.feature_store is None:
+            # Without a feature store the date does not enter the features
+            return None, None
+        try:
+            parsed = pd.Timestamp(game_date)
+        except ValueError:
+            parsed = pd.NaT
+        if pd.isna(parsed):
+            return None, f"Invalid gameDate: {game_date}"
+        if parsed.tz is not None:
+            # Stored game dates are naive UTC calendar dates
+            parsed = parsed.tz_convert(None)
+        game_date = parsed.normalize()
+        if self.feature_store.last_applied is not None and game_date <= self.feature_store.last_applied[0]:
+            # The stored state already includes games from that date on
+            return None, (f"gameDate must be after {self.feature_store.last_applied[0]:%Y-%m-%d}, "
+                          "the last game in the feature store")
+        return (None if game_date == self.scored_date else game_date), None
+
+    def _response(self, home_team, away_team, p_home):
+        winner, confidence = (home_team, p_home) if p_home >= 0.5 else (away_team, 1 - p_home)
+        return {
+            'predictedWinner': winner,
+            'confidence': confidence,
+            'message': f"{winner} has {confidence * 100:.1f}% chance to win",
+            'homeTeam': home_team,
+            'awayTeam': away_team,
+            'modelVersion': self.version,
+            'error': None,
+        }
+
+    def predict(self, home_team, away_team, game_date=None):
+        home, away, error = self._resolve_matchup(home_team, away_team)
+        if error is None:
+            game_date, error = self._resolve_date(game_date)
+        if error is not None:
+            return {'homeTeam': home_team, 'awayTeam': away_team, 'error': error}
+        if game_date is None:
+            return self._response(home_team, away_team, self.home_win_proba[(home, away)])
+        p_home = self.score(np.array([self.positions[home]]), np.array([self.positions[away]]), [game_date])[0]
+        return self._response(home_team, away_team, float(p_home))
+
+    def predict_batch(self, matchups):
+        """Score a list of (home, away) or (home, away, game_date) matchups with one stacked predict_proba.
+
+        Results come back in request order; matchups with an unknown team or
+        an unusable date carry an error instead of failing the whole batch.
+        """
+        results = [None] * len(matchups)
+        rows, home_idx, away_idx, game_dates = [], [], [], []
+        for i, (home_team, away_team, *game_date) in enumerate(matchups):
+            home, away, error = self._resolve_matchup(home_team, away_team)
+            if error is None:
+                game_date, error = self._resolve_date(game_date[0] if game_date else None)
+            if error is not None:
+                results[i] = {'homeTeam': home_team, 'awayTeam': away_team, 'error': error}
+                continue
+            rows.append(i)
+            home_idx.append(self.positions[home])
+            away_idx.append(self.positions[away])
+            game_dates.append(game_date)
+
+        if rows:
+            home_win = self.score(np.array(home_idx), np.array(away_idx), game_dates)
+            for i, p_home in zip(rows, home_win.tolist()):
+                home_team, away_team = matchups[i][:2]
+                results[i] = self._response(home_team, away_team, p_home)
+
+        return results
+
+
+class ShadowStats:
+    """Running comparison of active and shadow predictions on the same requests"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.compared = 0
+        self.agreed = 0
+        self.abs_diff_sum = 0.0
+        self.max_abs_diff = 0.0
+
+    @staticmethod
+    def _home_win(result):
+        return result['confidence'] if result['predictedWinner'] == result['homeTeam'] else 1 - result['confidence']
+
+    def record(self, active_results, shadow_results):
+        with self.lock:
+            for active, shadow in zip(active_results, shadow_results):
+                if active.get('error') is not None or shadow.get('error') is not None:
+                    continue
+                diff = abs(self._home_win(active) - self._home_win(shadow))
+                self.compared += 1
+                self.agreed += active['predictedWinner'] == shadow['predictedWinner']
+                self.abs_diff_sum += diff
+                self.max_abs_diff = max(self.max_abs_diff, diff)
+
+    def summary(self):
+        with self.lock:
+            return {
+                'compared': self.compared,
+                'agreementRate': self.agreed / self.compared if self.compared else None,
+                'meanAbsDiff': self.abs_diff_sum / self.compared if self.compared else None,
+                'maxAbsDiff': self.max_abs_diff,
+            }
+
+
+class ServingModels:
+    """The active PredictionServer plus an optional shadow, kept in step with the registry.
+
+    A new version is fully loaded and pre-scored before `self.active` is
+    rebound, and a request reads `self.active` once, so in-flight requests
+    finish on the model they started with and nothing is dropped.
+    """
+
+    def __init__(self, registry=None, model_path=None, window=41, server=None):
+        self.registry = registry
+        self.model_path = model_path
+        self.window = window
+        self.active = server
+        self.active_version = None
+        self.shadow = None
+        self.shadow_version = None
+        self.shadow_stats = ShadowStats()
+        if server is None:
+            self.refresh(force=True)
+
+    def _load(self, version):
+        if version is not None:
+            return PredictionServer(model_path=self.registry.model_path(version), window=self.window)
+        return PredictionServer(model_path=self.model_path, window=self.window)
+
+    def refresh(self, force=False):
+        """Swap in the registry's current and shadow versions, or a newly saved feature store, if they changed"""
+        current = self.registry.current_version() if self.registry is not None else None
+        if force or current != self.active_version:
+            server = self._load(current)
+            self.active = server
+            self.active_version = current
+            MODEL_RELOADS.labels('active').inc()
+
+        shadow = self.registry.shadow_version() if self.registry is not None else None
+        if shadow != self.shadow_version:
+            self.shadow = self._load(shadow) if shadow is not None else None
+            self.shadow_version = shadow
+            self.shadow_stats = ShadowStats()
+            if shadow is not None:
+                MODEL_RELOADS.labels('shadow').inc()
+
+        # The incremental clean saves new team state without touching the registry
+        for slot in ('active', 'shadow'):
+            server = getattr(self, slot)
+            updated = server.reload_feature_store() if server is not None else None
+            if updated is not None:
+                setattr(self, slot, updated)
+                MODEL_RELOADS.labels(slot).inc()
+
+    def compare_shadow(self, matchups, results):
+        shadow = self.shadow
+        if shadow is None:
+            return
+        self.shadow_stats.record(results, shadow.predict_batch(matchups))
+
+
+def create_app(server=None, model_path=None, reload_interval=10.0, simulation_jobs=1):
+    async def watch_registry(models):
+        while True:
+            await asyncio.sleep(reload_interval)
+            try:
+                await asyncio.to_thread(models.refresh)
+            except Exception as e:
+                print(f"Model reload failed, keeping {models.active.version}: {e}")
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Model and team profiles are loaded once, before the first request
+        watcher = None
+        if app.state.models is None:
+            registry = ModelRegistry() if model_path is None else None
+            app.state.models = ServingModels(registry=registry, model_path=model_path)
+        if reload_interval:
+            watcher = asyncio.create_task(watch_registry(app.state.models))
+        yield
+        if watcher is not None:
+            watcher.cancel()
+
+    app = FastAPI(title="NBA Predictor ML Service", lifespan=lifespan)
+    app.state.models = ServingModels(server=server) if server is not None else None
+
+    @app.middleware("http")
+    async def record_latency(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        # Labelled by route template so unknown paths cannot grow the label set
+        route = request.scope.get('route')
+        if route is not None:
+            REQUEST_LATENCY.labels(route.path).observe(time.perf_counter() - start)
+        return response
+
+    @app.get("/metrics")
+    async def metrics():
+        body, content_type = exposition()
+        return Response(body, media_type=content_type)
+
+    @app.get("/health")
+    async def health():
+        models = app.state.models
+        return {
+            'status': 'ok',
+            'teams': len(models.active.index.teams),
+            'modelVersion': models.active.version,
+            'shadowVersion': models.shadow.version if models.shadow is not None else None,
+        }
+
+    @app.get("/shadow")
+    async def shadow():
+        models = app.state.models
+        return {
+            'activeVersion': models.active.version,
+            'shadowVersion': models.shadow.version if models.shadow is not None else None,
+            **models.shadow_stats.summary(),
+        }
+
+    @app.post("/predict")
+    async def predict(request: MatchupRequest, background_tasks: BackgroundTasks):
+        models = app.state.models
+        result = models.active.predict(request.homeTeam, request.awayTeam, request.gameDate)
+        if models.shadow is not None:
+            # Runs after the response is sent, off the latency path
+            background_tasks.add_task(models.compare_shadow, [(request.homeTeam, request.awayTeam, request.gameDate)],
+                                      [result])
+        if result['error'] is not None:
+            return JSONResponse(result, status_code=400, background=background_tasks)
+        return result
+
+    @app.post("/predict/batch")
+    async def predict_batch(request: BatchRequest, background_tasks: BackgroundTasks):
+        models = app.state.models
+        matchups = [(game.homeTeam, game.awayTeam, game.gameDate) for game in request.games]
+        results = models.active.predict_batch(matchups)
+        if models.shadow is not None:
+            background_tasks.add_task(models.compare_shadow, matchups, results)
+        return {'predictions': results}
+
+    @app.post("/simulate")
+    async def simulate(request: SimulationRequest):
+        if not 0 < request.iterations <= MAX_SIMULATIONS:
+            return JSONResponse({'error': f"iterations must be between 1 and {MAX_SIMULATIONS}"}, status_code=400)
+        server = app.state.models.active
+        matchups = [(game.homeTeam, game.awayTeam) for game in request.games] if request.games is not None else None
+        standings = {team: (record.wins, record.losses) for team, record in (request.standings or {}).items()}
+        try:
+            # A fixed worker count per request, so concurrent simulations cannot each claim every core
+            simulator = SeasonSimulator.from_server(server, n_jobs=simulation_jobs, seed=request.seed)
+            projections = await asyncio.to_thread(simulator.simulate, matchups, request.iterations, standings)
+        except ValueError as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+        return {
+            'modelVersion': server.version,
+            'iterations': request.iterations,
+            'projections': projections.to_dict(orient='records'),
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve NBA game predictions for the Spring API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--model", type=Path, default=None,
+                        help="Serve this artifact directory or pickle instead of the registry's current version")
+    parser.add_argument("--reload-interval", type=float, default=10.0,
+                        help="Seconds between checks for a new current or shadow version or a newly saved feature store")
+    parser.add_argument("--simulation-jobs", type=int, default=1,
+                        help="Worker processes each /simulate request may use")
+    args = parser.parse_args()
+
+    app = create_app(model_path=args.model, reload_interval=args.reload_interval, simulation_jobs=args.simulation_jobs)
+    uvicorn.run(app, host=args.host, port=args.port, access_log=False)
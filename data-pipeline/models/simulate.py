@@ -0,0 +1,297 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from joblib import Parallel, delayed
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+CONFERENCES = {
+    'East': ['ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DET', 'IND', 'MIA', 'MIL', 'NYK', 'ORL', 'PHI', 'TOR', 'WAS'],
+    'West': ['DAL', 'DEN', 'GSW', 'HOU', 'LAC', 'LAL', 'MEM', 'MIN', 'NOP', 'OKC', 'PHX', 'POR', 'SAC', 'SAS', 'UTA'],
+}
+
+# Home games of the higher seed in a best-of-7 (2-2-1-1-1)
+SERIES_HOME_PATTERN = np.array([True, True, False, False, True, False, True])
+
+# First-round pairings by seed position, listed so adjacent winners meet in round two
+FIRST_ROUND = [(0, 7), (3, 4), (1, 6), (2, 5)]
+
+ROUNDS = ['playoffs', 'second_round', 'conference_finals', 'finals', 'champion']
+
+
+def conference_index(teams):
+    """0/1 conference per team from CONFERENCES.
+
+    A league with none of the CONFERENCES teams is split alphabetically;
+    one with only some of them raises ValueError rather than guessing.
+    """
+    east, west = set(CONFERENCES['East']), set(CONFERENCES['West'])
+    unknown = [team for team in teams if team not in east | west]
+    if not unknown:
+        return np.array([0 if team in east else 1 for team in teams])
+    if len(unknown) < len(teams):
+        raise ValueError(f"Teams outside the conference table: {', '.join(map(str, unknown))}")
+    ranks = np.argsort(np.argsort(teams))
+    return (ranks >= len(teams) // 2).astype(np.int64)
+
+
+def full_season_schedule(conference):
+    """(home, away) team positions for an 82-game season with two 15-team conferences.
+
+    Every team plays the other conference home and away (30 games), ten
+    conference opponents four times and the other four three times (52),
+    with 41 home games each.
+    """
+    home, away = [], []
+    for a in range(len(conference)):
+        for b in range(len(conference)):
+            if a != b and conference[a] != conference[b]:
+                home.append(a)
+                away.append(b)
+
+    for c in np.unique(conference):
+        members = np.flatnonzero(conference == c)
+        n = len(members)
+        for i in range(n):
+            for offset in range(1, n // 2 + 1):
+                first, second = members[i], members[(i + offset) % n]
+                # Offsets 1-5 play four games (two each way), 6-7 three (first hosts two)
+                games = [(first, second), (second, first), (first, second)]
+                if offset <= 5:
+                    games.append((second, first))
+                for h, a in games:
+                    home.append(h)
+                    away.append(a)
+    return np.array(home), np.array(away)
+
+
+def _single_game(rng, P, home, away):
+    home_won = rng.random(home.shape, dtype=np.float32) < P[home, away]
+    return np.where(home_won, home, away), np.where(home_won, away, home)
+
+
+def _series(rng, P, strength, a, b):
+    """Best-of-7 between teams a and b (same-shape arrays); home court to the stronger record"""
+    a_high = np.take_along_axis(strength, a, axis=1) >= np.take_along_axis(strength, b, axis=1)
+    high, low = np.where(a_high, a, b), np.where(a_high, b, a)
+    p_high = np.where(SERIES_HOME_PATTERN, P[high, low][..., None], 1 - P[low, high][..., None])
+    # Playing all seven games gives the same winner as stopping at four wins
+    high_won = (rng.random(p_high.shape, dtype=np.float32) < p_high).sum(axis=-1) >= 4
+    return np.where(high_won, high, low)
+
+
+def _play_in(rng, P, seeds):
+    """Seeds 7-10 decide the last two places; returns the eight playoff seeds"""
+    seventh, loser = _single_game(rng, P, seeds[:, 6], seeds[:, 7])
+    survivor, _ = _single_game(rng, P, seeds[:, 8], seeds[:, 9])
+    eighth, _ = _single_game(rng, P, loser, survivor)
+    return np.column_stack([seeds[:, :6], seventh, eighth])
+
+
+def _simulate_chunk(P, home, away, base_wins, conference, iterations, seed, play_in):
+    # One worker's share of iterations; returns counts, not per-iteration draws
+    rng = np.random.default_rng(seed)
+    n_teams = P.shape[0]
+
+    home_won = (rng.random((iterations, len(home)), dtype=np.float32) < P[home, away]).astype(np.float32)
+    home_games = np.zeros((len(home), n_teams), dtype=np.float32)
+    home_games[np.arange(len(home)), home] = 1
+    away_games = np.zeros((len(away), n_teams), dtype=np.float32)
+    away_games[np.arange(len(away)), away] = 1
+    # Wins per team for every iteration as two matrix products
+    wins = np.rint(home_won @ home_games + (1 - home_won) @ away_games).astype(np.int64) + base_wins
+
+    # Random fractional tiebreaker so equal records are seeded in random order
+    strength = wins + rng.random(wins.shape)
+    counts = {name: np.zeros(n_teams, dtype=np.int64) for name in ROUNDS}
+    champions = []
+    for c in np.unique(conference):
+        members = np.flatnonzero(conference == c)
+        n_seeds = 10 if play_in else 8
+        seeds = members[np.argsort(-strength[:, members], axis=1)[:, :n_seeds]]
+        if play_in:
+            seeds = _play_in(rng, P, seeds)
+        counts['playoffs'] += np.bincount(seeds.ravel(), minlength=n_teams)
+
+        alive = seeds[:, [seed_position for pair in FIRST_ROUND for seed_position in pair]]
+        for name in ['second_round', 'conference_finals', 'finals']:
+            alive = _series(rng, P, strength, alive[:, 0::2], alive[:, 1::2])
+            counts[name] += np.bincount(alive.ravel(), minlength=n_teams)
+        champions.append(alive[:, 0])
+
+    if len(champions) == 2:
+        champion = _series(rng, P, strength, champions[0][:, None], champions[1][:, None])
+        counts['champion'] += np.bincount(champion.ravel(), minlength=n_teams)
+
+    max_wins = int(base_wins.max()) + len(home) + 1
+    histogram = np.bincount((np.arange(n_teams) * max_wins + wins).ravel(),
+                            minlength=n_teams * max_wins).reshape(n_teams, max_wins)
+    return histogram, counts
+
+
+class SeasonSimulator:
+    """Monte Carlo projections of final records and playoff odds.
+
+    Every ordered matchup is scored once up front (PredictionServer already
+    keeps that table), so an iteration is just uniform draws compared against
+    a probability per game. Iterations run in fixed-size chunks across a loky
+    process pool, each chunk seeded from one SeedSequence, so results depend
+    on the seed but not on n_jobs.
+    """
+
+    def __init__(self, teams, probabilities, n_jobs=-1, chunk_size=5_000, seed=0, play_in=True):
+        self.teams = list(teams)
+        self.positions = {team: i for i, team in enumerate(self.teams)}
+        self.P = np.asarray(probabilities, dtype=np.float32)
+        self.conference = conference_index(self.teams)
+        n_seeds = 10 if play_in else 8
+        sizes = np.bincount(self.conference, minlength=2)
+        if sizes.min() < n_seeds:
+            raise ValueError(f"Each conference needs at least {n_seeds} teams to seed the playoffs, "
+                             f"got {sizes[0]} East and {sizes[1]} West")
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.play_in = play_in
+        self.resolve = lambda team: team if team in self.positions else None
+
+    @classmethod
+    def from_server(cls, server, **kwargs):
+        """Simulator over a PredictionServer's pre-scored home-win probabilities"""
+        teams = server.index.teams
+        P = np.full((len(teams), len(teams)), 0.5)
+        for (home, away), p in server.home_win_proba.items():
+            P[server.positions[home], server.positions[away]] = p
+        simulator = cls(teams, P, **kwargs)
+        simulator.resolve = server.index.resolve
+        return simulator
+
+    def schedule_positions(self, matchups):
+        """Team positions for (home, away) names or abbreviations; raises ValueError on an unknown team"""
+        home, away = [], []
+        for home_team, away_team in matchups:
+            for team in (home_team, away_team):
+                if self.resolve(team) is None:
+                    raise ValueError(f"Unknown team: {team}")
+            home.append(self.positions[self.resolve(home_team)])
+            away.append(self.positions[self.resolve(away_team)])
+        return np.array(home, dtype=np.int64), np.array(away, dtype=np.int64)
+
+    def simulate(self, matchups=None, iterations=50_000, standings=None):
+        """Project the season from `standings` ({team: (wins, losses)}) over the remaining `matchups`.
+
+        With no matchups, a full 82-game schedule is simulated from 0-0;
+        standings without the remaining games raise ValueError, since they
+        would be added on top of a whole season.
+        """
+        if matchups is None and standings:
+            raise ValueError("Standings need the remaining games to go with them")
+        if matchups is None:
+            home, away = full_season_schedule(self.conference)
+        else:
+            home, away = self.schedule_positions(matchups)
+
+        base_wins = np.zeros(len(self.teams), dtype=np.int64)
+        base_losses = np.zeros(len(self.teams), dtype=np.int64)
+        for team, (wins, losses) in (standings or {}).items():
+            if self.resolve(team) is None:
+                raise ValueError(f"Unknown team: {team}")
+            position = self.positions[self.resolve(team)]
+            base_wins[position], base_losses[position] = wins, losses
+
+        n_chunks = -(-iterations // self.chunk_size)
+        sizes = [self.chunk_size] * (n_chunks - 1) + [iterations - self.chunk_size * (n_chunks - 1)]
+        seeds = np.random.SeedSequence(self.seed).spawn(n_chunks)
+        outputs = Parallel(n_jobs=self.n_jobs, backend='loky')(
+            delayed(_simulate_chunk)(self.P, home, away, base_wins, self.conference, size, chunk_seed, self.play_in)
+            for size, chunk_seed in zip(sizes, seeds)
+        )
+
+        histogram = sum(out[0] for out in outputs)
+        counts = {name: sum(out[1][name] for out in outputs) for name in ROUNDS}
+        return self.summarize(histogram, counts, iterations, base_wins, base_losses, home, away)
+
+    def summarize(self, histogram, counts, iterations, base_wins, base_losses, home, away):
+        win_values = np.arange(histogram.shape[1])
+        mean = histogram @ win_values / iterations
+        std = np.sqrt(np.maximum(histogram @ win_values ** 2 / iterations - mean ** 2, 0))
+        cumulative = np.cumsum(histogram, axis=1) / iterations
+        games = base_wins + base_losses + np.bincount(home, minlength=len(self.teams)) + \
+            np.bincount(away, minlength=len(self.teams))
+
+        projections = pd.DataFrame({
+            'team': self.teams,
+            'conference': np.where(self.conference == 0, 'East', 'West'),
+            'current_wins': base_wins,
+            'current_losses': base_losses,
+            'projected_wins': mean,
+            'projected_losses': games - mean,
+            'wins_std': std,
+            'wins_p10': (cumulative < 0.1).sum(axis=1),
+            'wins_p90': (cumulative < 0.9).sum(axis=1),
+        })
+        for name in ROUNDS:
+            projections[f'{name}_odds'] = counts[name] / iterations
+        return projections.sort_values(['conference', 'projected_wins'], ascending=[True, False]) \
+            .reset_index(drop=True)
+
+
+def current_standings(season):
+    """{team abbreviation: (wins, losses)} from the season's games in clean_games"""
+    from processors.storage import ColumnarStore
+
+    processed = Path(__file__).parent.parent / "data" / "processed"
+    columns = ['season', 'home_team_abbr', 'away_team_abbr', 'home_win']
+    store = ColumnarStore(processed)
+    if store.exists("clean_games"):
+        games = store.read("clean_games", columns=columns, filters=[("season", "=", season)])
+    else:
+        games = pd.read_csv(processed / "clean_games.csv", usecols=columns)
+        games = games[games['season'] == season]
+
+    home_win = games['home_win'].astype(bool)
+    winners = pd.concat([games.loc[home_win, 'home_team_abbr'], games.loc[~home_win, 'away_team_abbr']])
+    losers = pd.concat([games.loc[~home_win, 'home_team_abbr'], games.loc[home_win, 'away_team_abbr']])
+    wins, losses = winners.astype(str).value_counts(), losers.astype(str).value_counts()
+    return {team: (int(wins.get(team, 0)), int(losses.get(team, 0))) for team in wins.index.union(losses.index)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from models.serve import PredictionServer
+
+    parser = argparse.ArgumentParser(description="Project season records and playoff odds by Monte Carlo simulation")
+    parser.add_argument("--model", type=Path, default=None, help="Artifact directory or pickle (defaults to the saved model)")
+    parser.add_argument("--schedule", type=Path, default=None,
+                        help="CSV of remaining games with home_team and away_team columns (default: a full 82-game season)")
+    parser.add_argument("--season", type=int, default=None,
+                        help="Start from this season's records in clean_games")
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Worker processes (-1 = all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-play-in", action="store_true", help="Seed the top eight directly, without a play-in")
+    parser.add_argument("--output", type=Path, default=None, help="Write the projections to this CSV")
+    args = parser.parse_args()
+    if args.season is not None and args.schedule is None:
+        parser.error("--season needs --schedule with the season's remaining games")
+
+    simulator = SeasonSimulator.from_server(PredictionServer(model_path=args.model), n_jobs=args.n_jobs,
+                                            seed=args.seed, play_in=not args.no_play_in)
+    matchups = None
+    if args.schedule is not None:
+        schedule = pd.read_csv(args.schedule)
+        matchups = list(zip(schedule['home_team'].astype(str), schedule['away_team'].astype(str)))
+    standings = current_standings(args.season) if args.season is not None else None
+
+    start = time.perf_counter()
+    projections = simulator.simulate(matchups, iterations=args.iterations, standings=standings)
+    print(projections.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"\n{args.iterations} simulations in {time.perf_counter() - start:.2f}s")
+    if args.output is not None:
+        projections.to_csv(args.output, index=False)
+        print(f"Saved projections to {args.output}")
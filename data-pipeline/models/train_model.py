@@ -1,95 +1,182 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from datetime import datetime
+import shutil
+import sys
 import warnings
 
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.preprocessing import StandardScaler
 
 import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
+from joblib import Parallel, delayed, effective_n_jobs
 
 warnings.filterwarnings("ignore")
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from processors.schema import FEATURE_SCHEMA, optimize_dtypes
+from processors.storage import ColumnarStore
+from processors.metrics import stage_timer, timed_stage, write_metrics
+from models.artifact import export_artifact
+from models.registry import ModelRegistry
+from models.backends import BACKENDS, DEFAULT_BACKENDS, get_backend
+from models.backtest import WalkForwardBacktester, season_windows
+
+
+def _fit_and_score(model, X, y, feature_names, train_idx, test_idx, keep_model=False):
+    # Runs in a worker; X and y arrive as read-only memmaps shared between workers
+    model = clone(model)
+    model.fit(pd.DataFrame(X[train_idx], columns=feature_names), y[train_idx])
+
+    X_test = pd.DataFrame(X[test_idx], columns=feature_names)
+    y_pred = model.predict(X_test)
+    result = {'accuracy': accuracy_score(y[test_idx], y_pred)}
+
+    if keep_model:
+        result['model'] = model
+        result['y_pred'] = y_pred
+        result['y_pred_proba'] = model.predict_proba(X_test)[:, 1]
+    return result
+
+
 class NBAPredictor:
-    def __init__(self, data_path="../data"):
+    FEATURE_COLUMNS = [
+        'total_points', 'fg_pct_diff', 'fg3_pct_diff',
+        'reb_diff', 'ast_diff', 'tov_diff', 'stl_diff', 'blk_diff',
+        'q1_diff', 'q2_diff', 'q3_diff', 'q4_diff', 'paint_diff', 'fb_diff',
+        'active_players_diff', 'avg_exp_diff', 'guards_diff',
+        'rolling_ppg', 'rolling_win_rate', 'h2h_win_rate', 'h2h_games_played',
+        'home_days_rest', 'away_days_rest', 'home_efficiency', 'away_efficiency',
+        'efficiency_diff', 'game_pace', 'season_win_rate_diff', 'season_ppg_diff',
+        'month', 'day_of_week', 'is_weekend', 'is_playoff_month'
+    ]
+
+    def __init__(self, data_path="../data", n_jobs=-1, cv_folds=5, backends=None):
         self.data_path = Path(__file__).parent.parent.parent / "data"
         self.features_path = Path(__file__).parent.parent / "features"
         self.models_path = Path(__file__).parent
         self.models_path.mkdir(exist_ok=True)
+        self.store = ColumnarStore(self.features_path)
+        self.n_jobs = n_jobs
+        self.cv_folds = cv_folds
+        self.backends = {key: get_backend(key) for key in (backends or DEFAULT_BACKENDS)}
 
-    def load_enhanced_data(self):
+    @timed_stage('trainer')
+    def load_enhanced_data(self, columns=None):
         print("Loading enhanced features...")
-        games = pd.read_csv(self.features_path / "enhanced_features.csv")
-        games["game_date"] = pd.to_datetime(games["game_date"])
-        return games
-
-    def prepare_features(self, games):
+        # A CSV regenerated after the store was written replaces it
+        if self.store.stale("enhanced_features", self.features_path / "enhanced_features.csv"):
+            games = pd.read_csv(self.features_path / "enhanced_features.csv")
+            games["game_date"] = pd.to_datetime(games["game_date"])
+            partition_cols = ["season"] if "season" in games.columns else None
+            self.store.write("enhanced_features", optimize_dtypes(games, FEATURE_SCHEMA), partition_cols=partition_cols)
+            del games
+
+        # Only the requested columns are read, already in their stored types
+        if columns:
+            stored = set(self.store.columns("enhanced_features"))
+            columns = [col for col in columns if col in stored]
+        return optimize_dtypes(self.store.read("enhanced_features", columns=columns), FEATURE_SCHEMA,
+                               auto_category_ratio=0.5)
+
+    @timed_stage('trainer')
+    def prepare_features(self, games, allow_missing=None):
         print("Preparing features for ML...")
 
-        feature_columns = [
-            'total_points', 'fg_pct_diff', 'fg3_pct_diff',
-            'reb_diff', 'ast_diff', 'tov_diff', 'stl_diff', 'blk_diff',
-            'q1_diff', 'q2_diff', 'q3_diff', 'q4_diff', 'paint_diff', 'fb_diff',
-            'active_players_diff', 'avg_exp_diff', 'guards_diff',
-            'rolling_ppg', 'rolling_win_rate', 'h2h_win_rate', 'h2h_games_played',
-            'home_days_rest', 'away_days_rest', 'home_efficiency', 'away_efficiency',
-            'efficiency_diff', 'game_pace', 'season_win_rate_diff', 'season_ppg_diff',
-            'month', 'day_of_week', 'is_weekend', 'is_playoff_month'
-        ]
-
-        available_features = [col for col in feature_columns if col in games.columns]
+        available_features = [col for col in self.FEATURE_COLUMNS if col in games.columns]
         print(f"Using {len(available_features)} features: {available_features}")
 
-        X = games[available_features].copy()
+        # float32 halves the matrix handed to sklearn; tree models split on float32 anyway
+        X = games[available_features].astype(np.float32)
         y = games["home_win"]
 
-        missing_mask = X.isnull().any(axis=1) | y.isnull()
+        # Rows with missing features are kept when every backend handles NaN natively
+        if allow_missing is None:
+            allow_missing = all(backend.handles_missing for backend in self.backends.values())
+        missing_mask = y.isnull()
+        if not allow_missing:
+            missing_mask |= X.isnull().any(axis=1)
         X = X[~missing_mask]
         y = y[~missing_mask]
+        if allow_missing:
+            print(f"Keeping {int(X.isnull().any(axis=1).sum())} rows with missing features")
 
         print(f"Dataset shape: {X.shape}")
         print(f"Target distribution: {y.value_counts().to_dict()}")
 
         return X, y, available_features
 
-    def train_models(self, X, y):
+    def build_models(self, n_jobs=None):
+        """Unfitted models; `n_jobs` threads (default: the predictor's) go to those that take one"""
+        n_jobs = self.n_jobs if n_jobs is None else n_jobs
+        return {backend.name: backend.build(n_jobs=n_jobs) for backend in self.backends.values()}
+
+    @timed_stage('trainer')
+    def train_models(self, X, y, seasons=None):
         print("Training models...")
 
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
+        X_values = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+        y_values = y.to_numpy()
+        feature_names = list(X.columns)
+
+        if seasons is not None and pd.Series(seasons).nunique() > 2:
+            # Hold out the latest season and cross-validate walk-forward over the
+            # seasons before it, so no fold ever trains on games after its test games
+            windows = season_windows(seasons)
+            holdout_season, train_idx, test_idx = windows[-1]
+            cv_windows = windows[:-1][-self.cv_folds:]
+            print(f"Holding out season {holdout_season}; CV on seasons "
+                  f"{', '.join(str(season) for season, _, _ in cv_windows)}")
+        else:
+            train_idx, test_idx = train_test_split(
+                np.arange(len(y_values)), test_size=0.2, random_state=42, stratify=y_values
+            )
+            cv_windows = [
+                (fold, fold_train, fold_test)
+                for fold, (fold_train, fold_test) in enumerate(
+                    StratifiedKFold(n_splits=self.cv_folds).split(X_values, y_values))
+            ]
+        X_test, y_test = X.iloc[test_idx], y.iloc[test_idx]
+
+        # Each model fits inside a pool task, so threaded estimators only get the
+        # cores left over once every holdout fit and CV window has a worker
+        max_tasks = len(self.backends) * (1 + len(cv_windows))
+        models = self.build_models(n_jobs=max(1, effective_n_jobs(self.n_jobs) // max_tasks))
+
+        # Holdout fits and CV windows are all scheduled on one process pool
+        tasks = []
+        for name, model in models.items():
+            tasks.append((name, 'holdout', delayed(_fit_and_score)(
+                model, X_values, y_values, feature_names, train_idx, test_idx, keep_model=True)))
+        backtester = WalkForwardBacktester(models, n_jobs=self.n_jobs)
+        for name, task in backtester.tasks(X_values, y_values, feature_names, cv_windows):
+            tasks.append((name, 'cv', task))
+
+        print(f"Running {len(tasks)} tasks on n_jobs={self.n_jobs}...")
+        outputs = Parallel(n_jobs=self.n_jobs, backend='loky', max_nbytes='1M', mmap_mode='r')(
+            task for _, _, task in tasks
         )
 
-        models = {
-            'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42),
-            'Gradient Boosting': GradientBoostingClassifier(n_estimators=100, random_state=42),
-            'Logistic Regression': LogisticRegression(random_state=42, max_iter=1000)
-        }
-
         results = {}
 
-        for name, model in models.items():
-            print(f"Training {name}...")
-
-            model.fit(X_train, y_train)
-
-            y_pred = model.predict(X_test)
-            y_pred_proba = model.predict_proba(X_test)[:, 1]
-
-            accuracy = accuracy_score(y_test, y_pred)
-            cv_scores = cross_val_score(model, X, y, cv=5, scoring='accuracy')
+        for name in models:
+            runs = [(kind, out) for (task_name, kind, _), out in zip(tasks, outputs) if task_name == name]
+            holdout = next(out for kind, out in runs if kind == 'holdout')
+            cv_scores = np.array([row['accuracy'] for kind, out in runs if kind == 'cv' for row in out])
+            model = holdout['model']
+            accuracy = holdout['accuracy']
 
             results[name] = {
                 'model': model,
                 'accuracy': accuracy,
                 'cv_mean': cv_scores.mean(),
                 'cv_std': cv_scores.std(),
-                'y_pred': y_pred,
-                'y_pred_proba': y_pred_proba,
+                'y_pred': holdout['y_pred'],
+                'y_pred_proba': holdout['y_pred_proba'],
                 'feature_importance': self.get_feature_importance(model, X.columns) if hasattr(model, 'feature_importances_') else None
             }
 
@@ -103,6 +190,7 @@ class NBAPredictor:
             return dict(zip(feature_names, importance))
         return None
 
+    @timed_stage('trainer')
     def save_best_model(self, results):
         best_model_name = max(results.keys(), key=lambda k: results[k]['accuracy'])
         best_model = results[best_model_name]['model']
@@ -111,8 +199,60 @@ class NBAPredictor:
         joblib.dump(best_model, model_file)
 
         print(f"Saved best model ({best_model_name}) to {model_file}")
+
+        # Compact serving artifact: flat tree arrays plus a manifest, loadable with numpy alone
+        artifact_dir = self.models_path / "nba_predictor_model"
+        try:
+            export_artifact(
+                best_model, best_model.feature_names_in_, artifact_dir,
+                version=datetime.now().strftime("%Y%m%d%H%M%S"),
+                metrics={
+                    'model_name': best_model_name,
+                    'accuracy': results[best_model_name]['accuracy'],
+                    'cv_mean': results[best_model_name]['cv_mean'],
+                    'cv_std': results[best_model_name]['cv_std'],
+                }
+            )
+            print(f"Exported serving artifact to {artifact_dir}")
+        except ValueError as e:
+            # Never leave an artifact from an older model next to the new pickle
+            shutil.rmtree(artifact_dir, ignore_errors=True)
+            print(f"Skipping serving artifact: {e}")
         return best_model_name
 
+    @timed_stage('trainer')
+    def register_models(self, results, feature_names, best_model_name):
+        registry = ModelRegistry(self.models_path / "registry")
+
+        versions = {}
+        for name, result in results.items():
+            versions[name] = registry.register(result['model'], feature_names, name, {
+                'accuracy': result['accuracy'],
+                'cv_mean': result['cv_mean'],
+                'cv_std': result['cv_std'],
+            })
+
+        registry.promote(versions[best_model_name])
+        print(f"Registered {len(versions)} models; promoted {versions[best_model_name]}")
+        return versions
+
+    def tune(self, families=None, n_trials=40, timeout=600, promote=False):
+        """Search hyperparameters per model family and register the best configuration"""
+        from models.tune import HyperparameterTuner, available_families
+
+        games = self.load_enhanced_data(columns=self.FEATURE_COLUMNS + ['home_win', 'season'])
+        families = families or available_families()
+        X, y, feature_names = self.prepare_features(
+            games, allow_missing=all(BACKENDS[family].handles_missing for family in families))
+
+        tuner = HyperparameterTuner(families=families, n_trials=n_trials, timeout=timeout, n_jobs=self.n_jobs,
+                                    cv_folds=self.cv_folds, registry=ModelRegistry(self.models_path / "registry"))
+        with stage_timer('trainer', 'tune'):
+            result = tuner.run(X, y, games.loc[X.index, 'season'], promote=promote)
+        write_metrics('trainer')
+        return result
+
+    @timed_stage('trainer')
     def create_model_report(self, results, X_test, y_test):
         print("Creating model report...")
 
@@ -137,6 +277,7 @@ class NBAPredictor:
                         f.write(f"    {feature}: {importance:.4f}\n")
                 f.write("\n" + "="*50 + "\n\n")
 
+    @timed_stage('trainer')
     def create_feature_importance_plot(self, results):
         print("Creating feature importance plot...")
 
@@ -144,6 +285,10 @@ class NBAPredictor:
         best_result = results[best_model_name]
 
         if best_result['feature_importance']:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+
             sorted_features = sorted(best_result['feature_importance'].items(),
                                   key=lambda x: x[1], reverse=True)[:15]
 
@@ -165,13 +310,15 @@ class NBAPredictor:
 
     def run(self):
         try:
-            games = self.load_enhanced_data()
+            games = self.load_enhanced_data(columns=self.FEATURE_COLUMNS + ['home_win', 'season'])
 
             X, y, feature_names = self.prepare_features(games)
+            seasons = games.loc[X.index, 'season'] if 'season' in games.columns else None
 
-            results, X_test, y_test = self.train_models(X, y)
+            results, X_test, y_test = self.train_models(X, y, seasons)
 
             best_model_name = self.save_best_model(results)
+            self.register_models(results, feature_names, best_model_name)
 
             self.create_model_report(results, X_test, y_test)
             self.create_feature_importance_plot(results)
@@ -180,6 +327,7 @@ class NBAPredictor:
             print(f"Best model: {best_model_name}")
             print(f"Best accuracy: {results[best_model_name]['accuracy']:.3f}")
 
+            write_metrics('trainer')
             return results, best_model_name
 
         except Exception as e:
@@ -189,5 +337,24 @@ class NBAPredictor:
 
 
 if __name__ == "__main__":
-    predictor = NBAPredictor()
-    results, best_model = predictor.run()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train NBA game prediction models")
+    parser.add_argument("--n-jobs", type=int, default=-1,
+                        help="Worker processes for model fits and CV folds (-1 = all cores)")
+    parser.add_argument("--backends", nargs="+", default=None, choices=list(BACKENDS),
+                        help=f"Model backends to train (default: {' '.join(DEFAULT_BACKENDS)})")
+    parser.add_argument("--tune", action="store_true",
+                        help="Search hyperparameters and register the best configuration instead of training")
+    parser.add_argument("--families", nargs="+", default=None,
+                        help="Model families to tune (default: every installed family)")
+    parser.add_argument("--n-trials", type=int, default=40, help="Trials per model family")
+    parser.add_argument("--timeout", type=float, default=600, help="Total tuning budget in seconds")
+    parser.add_argument("--promote", action="store_true", help="Promote the tuned model to current")
+    args = parser.parse_args()
+
+    predictor = NBAPredictor(n_jobs=args.n_jobs, backends=args.backends)
+    if args.tune:
+        predictor.tune(families=args.families, n_trials=args.n_trials, timeout=args.timeout, promote=args.promote)
+    else:
+        results, best_model = predictor.run()
@@ -0,0 +1,279 @@
+import sys
+import time
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from joblib import effective_n_jobs
+from threadpoolctl import threadpool_limits
+
+warnings.filterwarnings("ignore")
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.backends import BACKENDS
+from models.backtest import season_windows
+from models.registry import ModelRegistry
+
+# Boosters hold back the chronological tail of each training fold for early
+# stopping, so the test season is never used to pick the number of rounds
+EARLY_STOPPING_ROUNDS = 30
+EARLY_STOPPING_FRACTION = 0.1
+
+
+def _suggest_random_forest(trial):
+    return {
+        'n_estimators': trial.suggest_int('n_estimators', 100, 500, step=50),
+        'max_depth': trial.suggest_int('max_depth', 4, 20),
+        'min_samples_leaf': trial.suggest_int('min_samples_leaf', 1, 20),
+        'max_features': trial.suggest_float('max_features', 0.2, 1.0),
+    }
+
+
+def _suggest_gradient_boosting(trial):
+    return {
+        'n_estimators': 1000,
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+        'max_depth': trial.suggest_int('max_depth', 2, 6),
+        'subsample': trial.suggest_float('subsample', 0.5, 1.0),
+        'min_samples_leaf': trial.suggest_int('min_samples_leaf', 1, 50),
+    }
+
+
+def _suggest_hist_gradient_boosting(trial):
+    return {
+        'max_iter': 1000,
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+        'max_leaf_nodes': trial.suggest_int('max_leaf_nodes', 7, 127),
+        'min_samples_leaf': trial.suggest_int('min_samples_leaf', 5, 100),
+        'l2_regularization': trial.suggest_float('l2_regularization', 1e-3, 10.0, log=True),
+    }
+
+
+def _suggest_logistic_regression(trial):
+    return {
+        'C': trial.suggest_float('C', 1e-3, 1e2, log=True),
+    }
+
+
+def _suggest_lightgbm(trial):
+    return {
+        'n_estimators': 2000,
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+        'num_leaves': trial.suggest_int('num_leaves', 7, 127),
+        'min_child_samples': trial.suggest_int('min_child_samples', 5, 100),
+        'subsample': trial.suggest_float('subsample', 0.5, 1.0),
+        'subsample_freq': 1,
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.4, 1.0),
+        'reg_lambda': trial.suggest_float('reg_lambda', 1e-3, 10.0, log=True),
+    }
+
+
+def _suggest_xgboost(trial):
+    return {
+        'n_estimators': 2000,
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+        'max_depth': trial.suggest_int('max_depth', 2, 8),
+        'min_child_weight': trial.suggest_float('min_child_weight', 1.0, 20.0, log=True),
+        'subsample': trial.suggest_float('subsample', 0.5, 1.0),
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.4, 1.0),
+        'reg_lambda': trial.suggest_float('reg_lambda', 1e-3, 10.0, log=True),
+    }
+
+
+SEARCH_SPACES = {
+    'random_forest': _suggest_random_forest,
+    'gradient_boosting': _suggest_gradient_boosting,
+    'hist_gradient_boosting': _suggest_hist_gradient_boosting,
+    'logistic_regression': _suggest_logistic_regression,
+    'lightgbm': _suggest_lightgbm,
+    'xgboost': _suggest_xgboost,
+}
+
+
+def available_families():
+    return [family for family in SEARCH_SPACES if BACKENDS[family].available()]
+
+
+def build_estimator(family, params, n_jobs=1):
+    """Unfitted estimator for a family and a sampled (or tuned) parameter set"""
+    backend = BACKENDS[family]
+    if family in ('gradient_boosting', 'hist_gradient_boosting'):
+        # sklearn's own early stopping on an internal validation split
+        stopping = {'n_iter_no_change': 10, 'validation_fraction': EARLY_STOPPING_FRACTION}
+        if family == 'hist_gradient_boosting':
+            stopping['early_stopping'] = True
+        return backend.build(dict(params, **stopping), n_jobs=n_jobs)
+    if family == 'logistic_regression':
+        return make_pipeline(StandardScaler(), backend.build(params))
+    return backend.build(params, n_jobs=n_jobs)
+
+
+def fit_estimator(family, params, X, y, n_jobs=1):
+    """Fit with early stopping where the family supports it; returns (model, rounds used)"""
+    if family not in ('lightgbm', 'xgboost'):
+        model = build_estimator(family, params, n_jobs).fit(X, y)
+        return model, getattr(model, 'n_estimators_', None)
+
+    cut = int(len(X) * (1 - EARLY_STOPPING_FRACTION))
+    eval_set = [(X[cut:], y[cut:])]
+    if family == 'lightgbm':
+        from lightgbm import early_stopping
+        model = build_estimator(family, params, n_jobs)
+        model.fit(X[:cut], y[:cut], eval_set=eval_set,
+                  callbacks=[early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)])
+        return model, model.best_iteration_
+
+    model = build_estimator(family, dict(params, early_stopping_rounds=EARLY_STOPPING_ROUNDS), n_jobs)
+    model.fit(X[:cut], y[:cut], eval_set=eval_set, verbose=False)
+    return model, model.best_iteration + 1
+
+
+class FoldCache:
+    """Walk-forward CV folds sliced once and shared by every trial"""
+
+    def __init__(self, X, y, windows):
+        self.folds = [
+            (season, np.ascontiguousarray(X[train_idx]), y[train_idx],
+             np.ascontiguousarray(X[test_idx]), y[test_idx])
+            for season, train_idx, test_idx in windows
+        ]
+
+    def __len__(self):
+        return len(self.folds)
+
+    def __getitem__(self, i):
+        return self.folds[i]
+
+
+class HyperparameterTuner:
+    """Per-family Optuna searches scored on walk-forward season folds.
+
+    Folds are sliced once into a FoldCache. Trials report the running mean
+    accuracy after each fold, so the median pruner drops weak configurations
+    after one or two seasons instead of finishing all of them. Trials of a
+    study run on a thread pool, one per core, and each trial's estimator
+    fits on a single thread so the trials do not oversubscribe the CPU.
+    """
+
+    def __init__(self, families=None, n_trials=40, timeout=600, n_jobs=-1, cv_folds=5, registry=None):
+        self.families = families or available_families()
+        self.n_trials = n_trials
+        self.timeout = timeout
+        self.n_jobs = effective_n_jobs(n_jobs)
+        self.cv_folds = cv_folds
+        self.registry = registry or ModelRegistry()
+
+    def prepare(self, X, y, seasons):
+        self.feature_names = list(X.columns)
+        self.X = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+        self.y = np.asarray(y).astype(int)
+
+        windows = season_windows(seasons)
+        if len(windows) < 2:
+            raise ValueError("Tuning needs at least three seasons: CV folds plus a holdout season")
+        self.holdout_season, self.train_idx, self.test_idx = windows[-1]
+        self.folds = FoldCache(self.X, self.y, windows[:-1][-self.cv_folds:])
+
+    def objective(self, family):
+        import optuna
+
+        suggest = SEARCH_SPACES[family]
+
+        def objective(trial):
+            params = suggest(trial)
+            scores, rounds = [], []
+            for step in range(len(self.folds)):
+                _, X_train, y_train, X_test, y_test = self.folds[step]
+                model, used = fit_estimator(family, params, X_train, y_train, n_jobs=1)
+                scores.append(accuracy_score(y_test, model.predict(X_test)))
+                if used is not None:
+                    rounds.append(used)
+
+                trial.report(float(np.mean(scores)), step)
+                if trial.should_prune():
+                    raise optuna.TrialPruned()
+
+            if rounds:
+                trial.set_user_attr('rounds', int(np.median(rounds)))
+            return float(np.mean(scores))
+
+        return objective
+
+    def tune_family(self, family):
+        import optuna
+
+        study = optuna.create_study(
+            study_name=family,
+            direction='maximize',
+            sampler=optuna.samplers.TPESampler(seed=42),
+            pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1),
+        )
+        start = time.perf_counter()
+        # The limit is process-wide, so it is set once around the study rather
+        # than per trial; it caps the OpenMP and BLAS pools n_jobs does not reach
+        with threadpool_limits(limits=1):
+            study.optimize(self.objective(family), n_trials=self.n_trials,
+                           timeout=self.timeout / len(self.families), n_jobs=self.n_jobs)
+
+        states = pd.Series([t.state.name for t in study.trials]).value_counts().to_dict()
+        best = study.best_trial
+        params = SEARCH_SPACES[family](optuna.trial.FixedTrial(best.params))
+        # Boosters are refit with the number of rounds early stopping settled on
+        if 'rounds' in best.user_attrs and family in ('lightgbm', 'xgboost'):
+            params['n_estimators'] = best.user_attrs['rounds']
+
+        return {
+            'family': family,
+            'params': params,
+            'cv_accuracy': best.value,
+            'trials': len(study.trials),
+            'pruned': states.get('PRUNED', 0),
+            'seconds': time.perf_counter() - start,
+        }
+
+    def fit_final(self, result):
+        """Refit a tuned configuration on every season before the holdout and score the holdout"""
+        family = result['family']
+        model = build_estimator(family, result['params'], n_jobs=self.n_jobs)
+        X_train = pd.DataFrame(self.X[self.train_idx], columns=self.feature_names)
+        X_test = pd.DataFrame(self.X[self.test_idx], columns=self.feature_names)
+        model.fit(X_train, self.y[self.train_idx])
+        return model, accuracy_score(self.y[self.test_idx], model.predict(X_test))
+
+    def run(self, X, y, seasons, promote=False):
+        import optuna
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+        self.prepare(X, y, seasons)
+        print(f"Tuning {', '.join(self.families)} on {len(self.folds)} walk-forward folds "
+              f"(holdout season {self.holdout_season}, {self.n_jobs} parallel trials)...")
+
+        results = []
+        for family in self.families:
+            result = self.tune_family(family)
+            print(f"{BACKENDS[family].name} - CV: {result['cv_accuracy']:.3f} "
+                  f"({result['trials']} trials, {result['pruned']} pruned, {result['seconds']:.0f}s)")
+            results.append(result)
+
+        best = max(results, key=lambda r: r['cv_accuracy'])
+        model, holdout_accuracy = self.fit_final(best)
+        version = self.registry.register(
+            model, self.feature_names, BACKENDS[best['family']].name,
+            {'accuracy': holdout_accuracy, 'cv_mean': best['cv_accuracy']},
+            config={'family': best['family'], 'params': best['params'],
+                    'holdout_season': int(self.holdout_season),
+                    'search': [{k: v for k, v in r.items() if k != 'params'} for r in results]},
+        )
+        print(f"Best: {BACKENDS[best['family']].name} {best['params']}")
+        print(f"Holdout accuracy: {holdout_accuracy:.3f}; registered as {version}")
+        if promote:
+            self.registry.promote(version)
+            print(f"Promoted {version}")
+
+        return results, version
@@ -0,0 +1,343 @@
+import ast
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+PIPELINE_ROOT = Path(__file__).parent
+DATA_PATH = PIPELINE_ROOT.parent / "data"
+CSV_PATH = DATA_PATH / "csv"
+PROCESSED_PATH = PIPELINE_ROOT / "data" / "processed"
+FEATURES_PATH = PIPELINE_ROOT / "features"
+MODELS_PATH = PIPELINE_ROOT / "models"
+LOGS_PATH = PIPELINE_ROOT / "logs" / "pipeline"
+STATE_FILE = PIPELINE_ROOT / ".pipeline_state.json"
+
+sys.path.append(str(PIPELINE_ROOT))
+
+
+# Stage bodies run in a fresh spawned process each, so imports stay inside them
+
+def run_clean():
+    from processors.clean_game_data import GameDataCleaner
+    GameDataCleaner().run()
+
+
+def run_features():
+    from processors.build_features import FeatureBuilder
+    FeatureBuilder().run()
+
+
+def run_train():
+    from models.train_model import NBAPredictor
+    NBAPredictor().run()
+
+
+def run_explore():
+    from explore_dataset_fast import NBADatasetExplorer
+    overview = NBADatasetExplorer(data_path=DATA_PATH).generate_summary_report(streaming=True)
+    PROCESSED_PATH.mkdir(parents=True, exist_ok=True)
+    overview.to_csv(PROCESSED_PATH / "dataset_overview.csv", index=False)
+
+
+def _module_file(name):
+    path = PIPELINE_ROOT.joinpath(*name.split("."))
+    for candidate in (path.with_suffix(".py"), path / "__init__.py"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def local_sources(entry_points):
+    """Pipeline source files reachable from entry_points through imports, including function-level ones"""
+    seen = set()
+    queue = [PIPELINE_ROOT / p for p in entry_points]
+    while queue:
+        path = queue.pop()
+        if path in seen or not path.is_file():
+            continue
+        seen.add(path)
+        for node in ast.walk(ast.parse(path.read_text(), filename=str(path))):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # `from models import x` may name a submodule as well as an attribute
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            queue.extend(module for module in map(_module_file, names) if module is not None)
+    return sorted(seen)
+
+
+class Stage:
+    """One pipeline step: the files it reads, the files it writes and the code that produces them.
+
+    `code` names the stage's entry modules; every pipeline module they import,
+    directly or not, is part of the stage's cache key.
+    """
+
+    def __init__(self, name, func, inputs, outputs, code):
+        self.name = name
+        self.func = func
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.entry_points = list(code)
+
+    @property
+    def code(self):
+        return local_sources(self.entry_points)
+
+    def depends_on(self, other):
+        return any(
+            path == output or output in path.parents
+            for path in self.inputs for output in other.outputs
+        )
+
+
+STAGES = [
+    # Stages read the Parquet store their upstream writes next to the CSV
+    Stage("clean", run_clean,
+          inputs=[CSV_PATH / f"{name}.csv" for name in ["game_info", "game_summary", "team", "line_score"]],
+          outputs=[PROCESSED_PATH / "clean_games.csv", PROCESSED_PATH / "clean_games"],
+          code=["processors/clean_game_data.py"]),
+    Stage("features", run_features,
+          inputs=[PROCESSED_PATH / "clean_games"],
+          outputs=[FEATURES_PATH / "enhanced_features.csv", FEATURES_PATH / "enhanced_features"],
+          code=["processors/build_features.py"]),
+    Stage("train", run_train,
+          inputs=[FEATURES_PATH / "enhanced_features"],
+          outputs=[MODELS_PATH / "nba_predictor_model.pkl", MODELS_PATH / "model_report.txt"],
+          code=["models/train_model.py"]),
+    Stage("explore", run_explore,
+          inputs=[CSV_PATH],
+          outputs=[PROCESSED_PATH / "dataset_overview.csv"],
+          code=["explore_dataset_fast.py"]),
+]
+
+
+def _descendant_rss(pid):
+    """Combined resident memory in bytes of every process below pid, read from /proc"""
+    children = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # Fields after the parenthesised command name: state, ppid, ...
+            ppid = int(stat.read_text().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(stat.parent.name))
+
+    total, queue = 0, list(children.get(pid, []))
+    while queue:
+        child = queue.pop()
+        queue.extend(children.get(child, []))
+        try:
+            total += int(Path(f"/proc/{child}/statm").read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def run_sampling_workers(func, interval=0.2):
+    """Run func, polling the combined RSS of the processes it starts; returns the peak in bytes.
+
+    getrusage(RUSAGE_CHILDREN) only counts children that have been waited
+    on, and loky workers outlive the stage, so they have to be sampled
+    while they run. None where there is no /proc.
+    """
+    if not Path("/proc/self/stat").exists():
+        func()
+        return None
+
+    peak, done = [0], threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], _descendant_rss(os.getpid()))
+            done.wait(interval)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        func()
+    finally:
+        done.set()
+        sampler.join()
+    return peak[0]
+
+
+def _execute_stage(name, log_file):
+    # Runs in the stage's own process; RUSAGE_SELF's ru_maxrss is that process's peak
+    import resource
+
+    stage = next(stage for stage in STAGES if stage.name == name)
+    start = time.perf_counter()
+    with open(log_file, 'w') as log, redirect_stdout(log), redirect_stderr(log):
+        workers_peak = run_sampling_workers(stage.func)
+    wall = time.perf_counter() - start
+
+    return {
+        'wall_seconds': wall,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'workers_peak_rss_mb': workers_peak / 1024 ** 2 if workers_peak is not None else None,
+    }
+
+
+class PipelineRunner:
+    """Runs STAGES as a DAG, skipping stages whose inputs and code hash the same as last time.
+
+    A stage's cache key is the SHA-256 of its input files' contents plus its
+    source files. File hashes are memoized by (size, mtime), so unchanged
+    multi-GB inputs are not re-read. Stages with no pending upstream run
+    concurrently, each in a fresh process so its peak memory is its own;
+    worker processes a stage starts are sampled while it runs and reported
+    as their combined peak.
+    """
+
+    def __init__(self, stages=None, max_workers=2, force=False, state_file=STATE_FILE):
+        self.stages = stages or STAGES
+        self.max_workers = max_workers
+        self.force = force
+        self.state_file = Path(state_file)
+        self.state = self.load_state()
+
+    def load_state(self):
+        if not self.state_file.exists():
+            return {'files': {}, 'stages': {}}
+        with open(self.state_file) as f:
+            return json.load(f)
+
+    def save_state(self):
+        tmp = self.state_file.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        tmp.replace(self.state_file)
+
+    def hash_file(self, path):
+        stat = path.stat()
+        cached = self.state['files'].get(str(path))
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.state['files'][str(path)] = {
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()
+        }
+        return digest.hexdigest()
+
+    def hash_path(self, path):
+        if path.is_dir():
+            files = sorted(p for p in path.rglob("*") if p.is_file() and not p.name.startswith("."))
+            return hashlib.sha256("".join(
+                f"{p.relative_to(path)}:{self.hash_file(p)}\n" for p in files
+            ).encode()).hexdigest()
+        if path.exists():
+            return self.hash_file(path)
+        return "missing"
+
+    def stage_key(self, stage):
+        digest = hashlib.sha256()
+        for path in stage.inputs + stage.code:
+            digest.update(f"{path}:{self.hash_path(path)}\n".encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, stage, key):
+        previous = self.state['stages'].get(stage.name, {})
+        return (not self.force and previous.get('key') == key
+                and all(output.exists() for output in stage.outputs))
+
+    def run(self, only=None):
+        selected = [stage for stage in self.stages if only is None or stage.name in only]
+        pending = {stage.name: stage for stage in selected}
+        upstream = {
+            stage.name: {other.name for other in selected if other is not stage and stage.depends_on(other)}
+            for stage in selected
+        }
+        LOGS_PATH.mkdir(parents=True, exist_ok=True)
+        context = multiprocessing.get_context("spawn")
+
+        running, failed, report = {}, set(), []
+        while pending or running:
+            for name in list(pending):
+                if len(running) >= self.max_workers:
+                    break
+                waiting = upstream[name] & (set(pending) | {stage.name for stage, _, _ in running.values()})
+                if upstream[name] & failed:
+                    pending.pop(name)
+                    failed.add(name)
+                    report.append((name, 'blocked', None))
+                    print(f"[{name}] skipped: upstream stage failed")
+                    continue
+                if waiting:
+                    continue
+
+                stage = pending.pop(name)
+                key = self.stage_key(stage)
+                if self.is_fresh(stage, key):
+                    report.append((name, 'cached', self.state['stages'][name]))
+                    print(f"[{name}] up to date, skipping")
+                    continue
+
+                executor = ProcessPoolExecutor(max_workers=1, mp_context=context)
+                future = executor.submit(_execute_stage, name, str(LOGS_PATH / f"{name}.log"))
+                running[future] = (stage, key, executor)
+                print(f"[{name}] started (log: {LOGS_PATH / f'{name}.log'})")
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key, executor = running.pop(future)
+                executor.shutdown()
+                try:
+                    metrics = future.result()
+                except Exception as e:
+                    failed.add(stage.name)
+                    report.append((stage.name, 'failed', None))
+                    print(f"[{stage.name}] failed: {e}")
+                    continue
+
+                self.state['stages'][stage.name] = dict(
+                    metrics, key=key, finished_at=datetime.now().isoformat(timespec='seconds'))
+                self.save_state()
+                report.append((stage.name, 'ran', metrics))
+                workers = metrics['workers_peak_rss_mb']
+                print(f"[{stage.name}] finished in {metrics['wall_seconds']:.1f}s, "
+                      f"peak memory {metrics['peak_rss_mb']:.0f} MB"
+                      + (f" (+{workers:.0f} MB in worker processes)" if workers else ""))
+
+        self.save_state()
+        return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the NBA data pipeline, skipping stages whose inputs are unchanged")
+    parser.add_argument("--only", nargs="+", choices=[stage.name for stage in STAGES], default=None,
+                        help="Run just these stages")
+    parser.add_argument("--force", action="store_true", help="Ignore cached hashes and rerun every stage")
+    parser.add_argument("--jobs", type=int, default=2, help="Stages allowed to run at the same time")
+    args = parser.parse_args()
+
+    report = PipelineRunner(max_workers=args.jobs, force=args.force).run(only=args.only)
+
+    # Peak is the stage process itself; Workers is the sampled peak of its child processes combined
+    print("\nStage      Status   Wall (s)   Peak (MB)   Workers (MB)")
+    for name, status, metrics in report:
+        wall = f"{metrics['wall_seconds']:.1f}" if metrics else "-"
+        peak = f"{metrics['peak_rss_mb']:.0f}" if metrics else "-"
+        workers = metrics.get('workers_peak_rss_mb') if metrics else None
+        workers = f"{workers:.0f}" if workers is not None else "-"
+        print(f"{name:<10} {status:<8} {wall:>8}   {peak:>9}   {workers:>12}")
+    sys.exit(1 if any(status in ('failed', 'blocked') for _, status, _ in report) else 0)
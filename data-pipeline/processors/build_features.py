@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings('ignore')
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from processors.feature_store import STATE_FEATURES, TeamFeatureStore
+from processors.schema import FEATURE_SCHEMA, optimize_dtypes
+from processors.storage import ColumnarStore
+from processors.database import GameDatabase
+
+
+class FeatureBuilder:
+    """Builds enhanced_features from clean_games in one date-ordered pass.
+
+    Every game reads its rolling, head-to-head, rest and season features from
+    a TeamFeatureStore *before* the game is folded into it, so each row only
+    sees earlier games. Work per game is O(1), so the whole table is built in
+    time linear in the number of games.
+    """
+
+    def __init__(self, window=10, rest_cap=10):
+        self.processed_path = Path(__file__).parent.parent / "data" / "processed"
+        self.features_path = Path(__file__).parent.parent / "features"
+        self.processed_store = ColumnarStore(self.processed_path)
+        self.features_store = ColumnarStore(self.features_path)
+        self.database = GameDatabase.from_env()
+        self.window = window
+        self.rest_cap = rest_cap
+
+    def load_clean_games(self):
+        if not self.processed_store.stale("clean_games", self.processed_path / "clean_games.csv"):
+            return self.processed_store.read("clean_games")
+        games = pd.read_csv(self.processed_path / "clean_games.csv")
+        games['game_date'] = pd.to_datetime(games['game_date'])
+        return games
+
+    def build_features(self, games):
+        games = games.sort_values(['game_date', 'game_id'], kind='stable').reset_index(drop=True)
+        store = TeamFeatureStore(window=self.window, rest_cap=self.rest_cap)
+
+        columns = {name: np.empty(len(games), dtype=np.float64) for name in STATE_FEATURES}
+        rows = games[['game_date', 'game_id', 'season', 'home_team_abbr', 'away_team_abbr',
+                      'pts_home', 'pts_away']].itertuples(index=False)
+
+        for i, (game_date, game_id, season, home, away, pts_home, pts_away) in enumerate(rows):
+            features = store.matchup_features(home, away, game_date, season)
+            for name in STATE_FEATURES:
+                columns[name][i] = features[name]
+            store.update(game_date, game_id, season, home, away, pts_home, pts_away)
+
+        for name in STATE_FEATURES:
+            games[name] = columns[name]
+        for name in ['h2h_games_played', 'home_days_rest', 'away_days_rest',
+                     'month', 'day_of_week', 'is_weekend', 'is_playoff_month']:
+            games[name] = games[name].astype(int)
+
+        return games, store
+
+    def save_features(self, games):
+        self.features_path.mkdir(exist_ok=True, parents=True)
+        games.to_csv(self.features_path / "enhanced_features.csv", index=False)
+        # Stored typed, so a projected read comes back as float32 without a float64 copy
+        self.features_store.write("enhanced_features", optimize_dtypes(games, FEATURE_SCHEMA), partition_cols=["season"])
+        if self.database is not None:
+            self.database.upsert("game_features", games)
+
+    def run(self):
+        try:
+            games = self.load_clean_games()
+            enhanced, store = self.build_features(games)
+            self.save_features(enhanced)
+            return enhanced
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise
+
+
+if __name__ == "__main__":
+    builder = FeatureBuilder()
+    enhanced = builder.run()
@@ -1,16 +1,53 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import io
+import json
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from processors.storage import ColumnarStore
+from processors.feature_store import TeamFeatureStore
+from processors.database import GameDatabase
+from processors.metrics import timed_stage, write_metrics
+from processors.schema import CLEAN_GAMES_SCHEMA, TEAM_SCHEMA, optimize_dtypes
+
+RIVALRIES = [
+    ('LAL', 'BOS'), ('LAL', 'LAC'), ('BOS', 'PHI'),
+    ('NYK', 'BOS'), ('CHI', 'DET'), ('GSW', 'LAC')
+]
+
+# Columns the team-state feature store is built from
+FEATURE_STORE_COLUMNS = ['game_id', 'game_date', 'season', 'home_team_abbr', 'away_team_abbr', 'pts_home', 'pts_away']
+
+
+def _rivalry_matrix(rivalries):
+    teams = sorted({team for pair in rivalries for team in pair})
+    position = {team: i for i, team in enumerate(teams)}
+    matrix = np.zeros((len(teams), len(teams)), dtype=np.int64)
+    for home, away in rivalries:
+        matrix[position[home], position[away]] = 1
+        matrix[position[away], position[home]] = 1
+    return teams, matrix
+
+
 class GameDataCleaner:
+    RIVALRIES = RIVALRIES
+    RIVALRY_TEAMS, RIVALRY_MATRIX = _rivalry_matrix(RIVALRIES)
+    WATERMARK_FILE = "clean_games_watermark.json"
+
     def __init__(self, data_path="../data"):
         self.data_path = Path(__file__).parent.parent.parent / "data"
         self.csv_path = self.data_path / "csv"
         self.output_path = Path(__file__).parent.parent / "data" / "processed"
         self.output_path.mkdir(exist_ok=True, parents=True)
+        self.store = ColumnarStore(self.output_path)
+        self.database = GameDatabase.from_env()
 
+    @timed_stage('cleaner')
     def load_game_data(self):
         game_info = pd.read_csv(self.csv_path / "game_info.csv")
         game_summary = pd.read_csv(self.csv_path / "game_summary.csv")
@@ -23,13 +60,87 @@ class GameDataCleaner:
 
         return game_info, game_summary, teams, line_score
 
-    def clean_game_data(self, game_info, game_summary, teams, line_score=None):
+    @timed_stage('cleaner')
+    def load_game_data_since(self, since=None, offsets=None):
+        """Load the source rows for games played on or after `since`.
+
+        The source CSVs are append-only, so `offsets` (from the watermark)
+        gives, per file, the byte offset of its first row that can still
+        matter; parsing starts there instead of at the top of the file. Also
+        returns each file's row offsets keyed by game_id and its size, from
+        which the next watermark's offsets are taken.
+        """
+        offsets = offsets or {}
+        positions = {}
+
+        game_info, positions['game_info'] = self._read_csv_from(
+            self.csv_path / "game_info.csv", offsets.get('game_info'))
+        if since is not None:
+            game_info = game_info[pd.to_datetime(game_info['game_date']) >= since]
+        game_ids = game_info['game_id'].unique()
+
+        game_summary, positions['game_summary'] = self._read_csv_from(
+            self.csv_path / "game_summary.csv", offsets.get('game_summary'))
+        game_summary = game_summary[game_summary['game_id'].isin(game_ids)]
+        teams = pd.read_csv(self.csv_path / "team.csv")
+
+        try:
+            line_score, positions['line_score'] = self._read_csv_from(
+                self.csv_path / "line_score.csv", offsets.get('line_score'))
+            line_score = line_score[line_score['game_id'].isin(game_ids)]
+        except FileNotFoundError:
+            line_score = None
+
+        return game_info, game_summary, teams, line_score, positions
+
+    def _read_csv_from(self, path, offset=None):
+        """Rows of a CSV from a stored {'offset', 'size'} position on.
+
+        Returns the rows and a position record: the byte offset of every row,
+        keyed by game_id, and the file size. A file smaller than when the
+        offset was taken has been replaced, so it is read from the top.
+        """
+        with open(path, 'rb') as f:
+            header = f.readline()
+            size = f.seek(0, 2)
+            start = f.seek(len(header))
+            if offset is not None and len(header) <= offset['offset'] and offset['size'] <= size:
+                start = f.seek(offset['offset'])
+            body = f.read()
+
+        rows = pd.read_csv(io.BytesIO(header + body))
+        newlines = np.flatnonzero(np.frombuffer(body, dtype=np.uint8) == ord('\n'))
+        line_starts = np.concatenate([[0], newlines + 1])
+        line_starts = start + line_starts[line_starts < len(body)]
+        if len(line_starts) != len(rows):
+            # Blank lines or quoted newlines: fall back to re-reading from here next time
+            line_starts = np.full(len(rows), start)
+
+        return rows, {'rows': pd.Series(line_starts, index=rows['game_id'].to_numpy()), 'size': size}
+
+    def next_offsets(self, positions, game_info, rewrite_from):
+        """Per source file, the offset of the first row of a game on or after `rewrite_from`"""
+        dates = pd.to_datetime(game_info['game_date'])
+        window = game_info.loc[dates >= rewrite_from, 'game_id'].unique()
+        offsets = {}
+        for name, position in positions.items():
+            rows = position['rows']
+            in_window = rows[rows.index.isin(window)]
+            offsets[name] = {
+                'offset': int(in_window.min()) if len(in_window) else position['size'],
+                'size': position['size'],
+            }
+        return offsets
+
+    @timed_stage('cleaner')
+    def clean_game_data(self, game_info, game_summary, teams, line_score=None, last_year=2023):
         games = game_info.merge(game_summary, on='game_id', how='left', suffixes=('', '_summary'))
 
         games['game_date'] = pd.to_datetime(games['game_date'])
 
         games = games[games['game_date'].dt.year >= 2010]
-        games = games[games['game_date'].dt.year <= 2023]
+        if last_year is not None:
+            games = games[games['game_date'].dt.year <= last_year]
 
         initial_count = len(games)
         games = games.drop_duplicates(subset=['game_id'])
@@ -37,11 +148,7 @@ class GameDataCleaner:
         games['attendance'] = games['attendance'].fillna(0)
         games['game_time'] = games['game_time'].fillna('Unknown')
 
-        games = games.merge(teams, left_on='home_team_id', right_on='id', how='left')
-        games = games.rename(columns={'full_name': 'home_team_name', 'abbreviation': 'home_team_abbr'})
-
-        games = games.merge(teams, left_on='visitor_team_id', right_on='id', how='left')
-        games = games.rename(columns={'full_name': 'away_team_name', 'abbreviation': 'away_team_abbr'})
+        games = self._join_teams(games, optimize_dtypes(teams, TEAM_SCHEMA))
 
         if line_score is not None:
             home_scores = line_score[line_score['team_id_home'].notna()].copy()
@@ -62,22 +169,44 @@ class GameDataCleaner:
             games['total_points'] = games['pts_home'] + games['pts_away']
             games['point_difference'] = games['pts_home'] - games['pts_away']
 
-        games['home_team_id'] = games['home_team_id'].astype(str)
-        games['visitor_team_id'] = games['visitor_team_id'].astype(str)
+        games['is_rivalry'] = self._flag_rivalries(games['home_team_abbr'], games['away_team_abbr'])
 
-        games['is_rivalry'] = games.apply(
-            lambda x: self._check_rivalry(x['home_team_abbr'], x['away_team_abbr']), axis=1
-        )
+        # Team ids and names become categoricals, flags int8, floats float32
+        return optimize_dtypes(games, CLEAN_GAMES_SCHEMA)
 
-        return games
+    def _join_teams(self, games, teams):
+        # Single lookup for home and away ids; column names match the old
+        # pair of merges (full_name/abbreviation renamed, the rest _x/_y),
+        # minus the id_x/id_y copies of the team ids.
+        lookup = teams.set_index('id')
+        n = len(games)
+        keys = np.concatenate([games['home_team_id'].to_numpy(), games['visitor_team_id'].to_numpy()])
+        matched = lookup.reindex(keys).reset_index(drop=True)
+
+        sides = []
+        for side, suffix, rows in (('home', '_x', slice(0, n)), ('away', '_y', slice(n, 2 * n))):
+            part = matched.iloc[rows].reset_index(drop=True)
+            part.columns = [
+                f"{side}_team_name" if col == 'full_name'
+                else f"{side}_team_abbr" if col == 'abbreviation'
+                else f"{col}{suffix}"
+                for col in part.columns
+            ]
+            sides.append(part)
+
+        return pd.concat([games.reset_index(drop=True)] + sides, axis=1)
 
-    def _check_rivalry(self, home_team, away_team):
-        rivalries = [
-            ('LAL', 'BOS'), ('LAL', 'LAC'), ('BOS', 'PHI'),
-            ('NYK', 'BOS'), ('CHI', 'DET'), ('GSW', 'LAC')
-        ]
-        return int((home_team, away_team) in rivalries or (away_team, home_team) in rivalries)
+    def _flag_rivalries(self, home_abbr, away_abbr):
+        # -1 for teams outside RIVALRY_TEAMS and for missing abbreviations
+        teams = pd.Index(self.RIVALRY_TEAMS)
+        home_codes = teams.get_indexer(home_abbr.astype(object))
+        away_codes = teams.get_indexer(away_abbr.astype(object))
+        known = (home_codes >= 0) & (away_codes >= 0)
+        flags = np.zeros(len(home_codes), dtype=np.int64)
+        flags[known] = self.RIVALRY_MATRIX[home_codes[known], away_codes[known]]
+        return pd.Series(flags, index=home_abbr.index)
 
+    @timed_stage('cleaner')
     def validate_data(self, games):
         missing_dates = games['game_date'].isnull().sum()
         missing_teams = games['home_team_id'].isnull().sum()
@@ -91,6 +220,7 @@ class GameDataCleaner:
 
         return games
 
+    @timed_stage('cleaner')
     def create_summary_stats(self, games):
         summary = {
             'total_games': len(games),
@@ -108,9 +238,14 @@ class GameDataCleaner:
 
         return summary
 
+    @timed_stage('cleaner')
     def save_clean_data(self, games):
         output_file = self.output_path / "clean_games.csv"
         games.to_csv(output_file, index=False)
+        (self.output_path / self.WATERMARK_FILE).unlink(missing_ok=True)
+        self.store.write("clean_games", games, partition_cols=["season"])
+        if self.database is not None:
+            self.database.upsert("clean_games", games)
 
         summary_file = self.output_path / "data_summary.txt"
         with open(summary_file, 'w') as f:
@@ -121,6 +256,162 @@ class GameDataCleaner:
             f.write(f"Seasons: {games['season'].nunique()}\n")
             f.write(f"Teams: {games['home_team_abbr'].nunique()}\n")
 
+    @timed_stage('cleaner')
+    def update_feature_store(self, games, rebuild=False, stored=None):
+        """Fold cleaned games into the team-state feature store used at serving time.
+
+        `stored` holds the previously stored rows of the same games (see
+        stored_scores). Teams whose already-applied games changed are
+        replayed from clean_games, so corrections inside the lookback window
+        reach the feature store too.
+        """
+        if 'pts_home' not in games.columns:
+            return None
+        if rebuild or not TeamFeatureStore.exists(self.store):
+            feature_store = TeamFeatureStore.build(games)
+        else:
+            feature_store = TeamFeatureStore.load(self.store)
+            corrected = self._corrected_teams(games, stored, feature_store.last_applied)
+            if corrected:
+                history = self.store.read("clean_games", columns=FEATURE_STORE_COLUMNS, filters=[
+                    [('home_team_abbr', 'in', corrected)], [('away_team_abbr', 'in', corrected)],
+                ])
+                feature_store.rebuild_teams(corrected, history)
+            feature_store.update_many(games)
+        feature_store.save(self.store)
+        return feature_store
+
+    def stored_scores(self, games):
+        """Rows of `games` as currently stored in clean_games, read before an upsert overwrites them"""
+        if not self.store.exists("clean_games") or not set(FEATURE_STORE_COLUMNS) <= set(self.store.columns("clean_games")):
+            return None
+        seasons = sorted({int(season) for season in games['season'].unique()})
+        stored = self.store.read("clean_games", columns=FEATURE_STORE_COLUMNS, filters=[("season", "in", seasons)])
+        return stored[stored['game_id'].isin(games['game_id'])]
+
+    def _corrected_teams(self, games, stored, last_applied):
+        """Teams of already-applied games that are new or differ from their stored rows"""
+        if stored is None or last_applied is None:
+            return []
+        last_date, last_id = last_applied
+        applied = games[(games['game_date'] < last_date) |
+                        ((games['game_date'] == last_date) & (games['game_id'] <= last_id))]
+        merged = applied[FEATURE_STORE_COLUMNS].merge(stored, on='game_id', how='left',
+                                                      suffixes=('', '_stored'), indicator=True)
+
+        changed = merged['_merge'] == 'left_only'
+        for col in FEATURE_STORE_COLUMNS:
+            if col in ('game_id', 'season'):
+                continue
+            new, old = merged[col].astype(object), merged[f"{col}_stored"].astype(object)
+            changed |= ~((new == old) | (new.isna() & old.isna()))
+
+        changed = merged[changed]
+        teams = set()
+        for col in ['home_team_abbr', 'away_team_abbr', 'home_team_abbr_stored', 'away_team_abbr_stored']:
+            teams.update(str(team) for team in changed[col].dropna())
+        return sorted(teams)
+
+    def load_watermark(self):
+        watermark_file = self.output_path / self.WATERMARK_FILE
+        if not watermark_file.exists() or not (self.output_path / "clean_games.csv").exists():
+            return None
+        with open(watermark_file) as f:
+            return json.load(f)
+
+    @timed_stage('cleaner')
+    def save_incremental_data(self, games, watermark=None, lookback_days=3, positions=None, game_info=None):
+        """Upsert cleaned games into clean_games.csv and advance the watermark.
+
+        Rows are kept in (game_date, game_id) order so that everything from the
+        previous watermark's lookback date onwards sits at the end of the file,
+        starting at a recorded byte offset. An incremental save truncates the
+        file there and rewrites only that tail, so games in the lookback window
+        are upserted and newer games are appended.
+
+        With the source `positions` and raw `game_info` from
+        load_game_data_since, the watermark also records where the next run
+        starts reading each source CSV.
+        """
+        output_file = self.output_path / "clean_games.csv"
+        games = games.sort_values(['game_date', 'game_id'], kind='stable')
+
+        latest = games.iloc[-1] if len(games) else None
+        if latest is None:
+            return watermark
+
+        rewrite_from = latest['game_date'] - pd.Timedelta(days=lookback_days)
+        stable = games[games['game_date'] < rewrite_from]
+        recent = games[games['game_date'] >= rewrite_from]
+
+        if watermark is None:
+            with open(output_file, 'w', newline='') as f:
+                stable.to_csv(f, index=False)
+                rewrite_offset = f.tell()
+                recent.to_csv(f, index=False, header=stable.empty)
+        else:
+            with open(output_file, 'r+', newline='') as f:
+                f.truncate(watermark['rewrite_offset'])
+                f.seek(watermark['rewrite_offset'])
+                stable.to_csv(f, index=False, header=False)
+                rewrite_offset = f.tell()
+                recent.to_csv(f, index=False, header=False)
+
+        self.store.upsert("clean_games", games, key="game_id", partition_cols=["season"])
+        if self.database is not None:
+            self.database.upsert("clean_games", games)
+
+        watermark = {
+            'game_date': latest['game_date'].strftime('%Y-%m-%d'),
+            'game_id': int(latest['game_id']),
+            'rewrite_from': rewrite_from.strftime('%Y-%m-%d'),
+            'rewrite_offset': rewrite_offset,
+        }
+        if positions is not None:
+            watermark['source_offsets'] = self.next_offsets(positions, game_info, rewrite_from)
+        with open(self.output_path / self.WATERMARK_FILE, 'w') as f:
+            json.dump(watermark, f, indent=2)
+
+        return watermark
+
+    def run_incremental(self, lookback_days=3):
+        """Clean only games at or after the stored watermark's lookback date.
+
+        The first run (no watermark yet) cleans the full history. Later runs
+        start parsing each source CSV at the byte offset recorded in the
+        watermark, which is the first row of a game in the lookback window,
+        and upsert those games. Reading and cleaning therefore grow with the
+        new games (plus the lookback window), not with the whole history,
+        as long as the source files are only appended to. A watermark from
+        before offsets were recorded falls back to parsing whole files once.
+
+        There is no upper season bound here, so newly arriving seasons are
+        kept.
+        """
+        try:
+            watermark = self.load_watermark()
+            since = pd.Timestamp(watermark['rewrite_from']) if watermark is not None else None
+            offsets = watermark.get('source_offsets') if watermark is not None else None
+            game_info, game_summary, teams, line_score, positions = self.load_game_data_since(since, offsets)
+
+            clean_games = self.clean_game_data(game_info, game_summary, teams, line_score, last_year=None)
+            clean_games = self.validate_data(clean_games)
+            stored = self.stored_scores(clean_games) if watermark is not None else None
+            new_watermark = self.save_incremental_data(clean_games, watermark, lookback_days, positions, game_info)
+            self.update_feature_store(clean_games, rebuild=watermark is None, stored=stored)
+
+            summary = {
+                'games_processed': len(clean_games),
+                'full_rebuild': watermark is None,
+                'watermark': new_watermark,
+            }
+            write_metrics('cleaner')
+            return clean_games, summary
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise
+
     def run(self):
         try:
             game_info, game_summary, teams, line_score = self.load_game_data()
@@ -128,6 +419,8 @@ class GameDataCleaner:
             clean_games = self.validate_data(clean_games)
             summary = self.create_summary_stats(clean_games)
             self.save_clean_data(clean_games)
+            self.update_feature_store(clean_games, rebuild=True)
+            write_metrics('cleaner')
             return clean_games, summary
         except Exception as e:
             import traceback
@@ -135,5 +428,17 @@ class GameDataCleaner:
             raise
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Clean NBA game data")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only clean games newer than the stored watermark")
+    parser.add_argument("--lookback-days", type=int, default=3,
+                        help="Days before the watermark to re-clean for late corrections")
+    args = parser.parse_args()
+
     cleaner = GameDataCleaner()
-    clean_games, summary = cleaner.run()
+    if args.incremental:
+        clean_games, summary = cleaner.run_incremental(lookback_days=args.lookback_days)
+    else:
+        clean_games, summary = cleaner.run()
@@ -0,0 +1,214 @@
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from pandas.api import types
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from processors.schema import FEATURE_SCHEMA, optimize_dtypes
+
+# Secondary indexes for the range, matchup and season queries; created only
+# for the columns a table actually has
+INDEXES = {
+    'game_date': ['game_date'],
+    'matchup': ['home_team_id', 'visitor_team_id'],
+    'season': ['season'],
+}
+
+
+def _sql_type(dtype):
+    if types.is_bool_dtype(dtype):
+        return "BOOLEAN"
+    if types.is_integer_dtype(dtype):
+        return "BIGINT"
+    if types.is_float_dtype(dtype):
+        return "DOUBLE PRECISION"
+    if types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _copy_series(series, sql_type):
+    # Cast to what the stored column parses: a float column that picked up
+    # NaN would otherwise write 112.0 into BIGINT, and a categorical writes
+    # whatever its categories' dtype prints as
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(series.cat.categories.dtype)
+    sql_type = sql_type.lower()
+    if sql_type in ('bigint', 'integer', 'smallint'):
+        # Raises on fractional values rather than letting COPY reject the batch
+        return pd.to_numeric(series).astype('Int64')
+    if sql_type == 'boolean':
+        return series.astype('boolean')
+    if sql_type in ('double precision', 'real', 'numeric'):
+        return pd.to_numeric(series).astype('float64')
+    return series
+
+
+def copy_buffer(df, column_types):
+    """CSV text for COPY FROM STDIN, each column cast to its type in column_types"""
+    df = df.assign(**{col: _copy_series(df[col], column_types[col]) for col in df.columns if col in column_types})
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    return buffer
+
+
+class GameDatabase:
+    """SQL sink for clean_games and enhanced features, keyed on game_id.
+
+    Loads go through a temporary staging table -- COPY FROM STDIN on
+    PostgreSQL, executemany on SQLite -- and then one
+    INSERT ... ON CONFLICT (game_id) DO UPDATE, so reloading the same games
+    is idempotent and late corrections overwrite the stored row.
+    """
+
+    def __init__(self, url):
+        from sqlalchemy import create_engine
+
+        self.url = url
+        self.engine = create_engine(url)
+        self.dialect = self.engine.dialect.name
+
+    @classmethod
+    def from_env(cls):
+        """Database named by DATABASE_URL, or None when the variable is unset"""
+        url = os.environ.get("DATABASE_URL")
+        return cls(url) if url else None
+
+    def _column_types(self, cursor, table):
+        """{column: SQL type} of a stored table, in column order; empty if it does not exist"""
+        if self.dialect == 'sqlite':
+            cursor.execute(f"PRAGMA table_info({_quote(table)})")
+            return {row[1]: row[2] for row in cursor.fetchall()}
+        cursor.execute(
+            "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = %s "
+            "ORDER BY ordinal_position",
+            (table,)
+        )
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def _columns(self, cursor, table):
+        return list(self._column_types(cursor, table))
+
+    def ensure_table(self, cursor, table, df, key='game_id'):
+        existing = self._columns(cursor, table)
+        if not existing:
+            columns = ", ".join(f"{_quote(col)} {_sql_type(df[col].dtype)}" for col in df.columns)
+            cursor.execute(f"CREATE TABLE {_quote(table)} ({columns}, PRIMARY KEY ({_quote(key)}))")
+        else:
+            # New feature columns are added in place; older rows read NULL for them
+            for col in df.columns:
+                if col not in existing:
+                    cursor.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)} {_sql_type(df[col].dtype)}")
+
+        for name, index_columns in INDEXES.items():
+            if all(col in df.columns or col in existing for col in index_columns):
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{table}_{name}')} "
+                    f"ON {_quote(table)} ({', '.join(_quote(col) for col in index_columns)})"
+                )
+
+    def _copy_into(self, cursor, table, staging, df):
+        columns = ", ".join(_quote(col) for col in df.columns)
+        if self.dialect == 'postgresql':
+            buffer = copy_buffer(df, self._column_types(cursor, table))
+            cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            return
+
+        rows = df.astype(object).where(df.notna(), None)
+        placeholders = ", ".join("?" for _ in df.columns)
+        cursor.executemany(f"INSERT INTO {staging} ({columns}) VALUES ({placeholders})",
+                           rows.itertuples(index=False, name=None))
+
+    def upsert(self, table, df, key='game_id'):
+        """Bulk-load df into table, replacing rows whose key is already stored"""
+        df = df.drop_duplicates(subset=[key], keep='last')
+        # Timestamps go in as ISO text, which both COPY and SQLite accept
+        for col in df.columns:
+            if types.is_datetime64_any_dtype(df[col].dtype):
+                df = df.assign(**{col: df[col].dt.strftime('%Y-%m-%d %H:%M:%S')})
+
+        columns = ", ".join(_quote(col) for col in df.columns)
+        updates = ", ".join(f"{_quote(col)} = excluded.{_quote(col)}" for col in df.columns if col != key)
+        staging = _quote(f"staging_{table}")
+
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            self.ensure_table(cursor, table, df, key)
+            if self.dialect == 'postgresql':
+                cursor.execute(f"CREATE TEMP TABLE {staging} (LIKE {_quote(table)}) ON COMMIT DROP")
+            else:
+                cursor.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+                cursor.execute(f"CREATE TEMP TABLE {staging} AS SELECT * FROM {_quote(table)} WHERE 0")
+
+            self._copy_into(cursor, table, staging, df)
+            # WHERE true keeps SQLite from parsing ON CONFLICT as a join clause
+            cursor.execute(
+                f"INSERT INTO {_quote(table)} ({columns}) SELECT {columns} FROM {staging} WHERE true "
+                f"ON CONFLICT ({_quote(key)}) DO UPDATE SET {updates}"
+            )
+            if self.dialect == 'sqlite':
+                cursor.execute(f"DROP TABLE temp.{staging}")
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        return len(df)
+
+    def query(self, sql, params=None):
+        from sqlalchemy import text
+
+        with self.engine.connect() as connection:
+            return pd.read_sql(text(sql), connection, params=params)
+
+    def games_between(self, start, end, table='clean_games'):
+        return self.query(
+            f"SELECT * FROM {_quote(table)} WHERE game_date >= :start AND game_date < :end ORDER BY game_date",
+            {'start': str(pd.Timestamp(start)), 'end': str(pd.Timestamp(end))}
+        )
+
+    def matchup(self, home_team_id, visitor_team_id, table='clean_games'):
+        return self.query(
+            f"SELECT * FROM {_quote(table)} WHERE home_team_id = :home AND visitor_team_id = :visitor "
+            f"ORDER BY game_date",
+            {'home': str(home_team_id), 'visitor': str(visitor_team_id)}
+        )
+
+    def season(self, season, table='clean_games'):
+        return self.query(f"SELECT * FROM {_quote(table)} WHERE season = :season ORDER BY game_date",
+                          {'season': int(season)})
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load clean games and features into the database")
+    parser.add_argument("--url", default=os.environ.get("DATABASE_URL"),
+                        help="SQLAlchemy URL (defaults to $DATABASE_URL), e.g. sqlite:///nba.db")
+    args = parser.parse_args()
+    if not args.url:
+        parser.error("Set DATABASE_URL or pass --url")
+
+    database = GameDatabase(args.url)
+    pipeline_root = Path(__file__).parent.parent
+    for table, csv_file in [('clean_games', pipeline_root / "data" / "processed" / "clean_games.csv"),
+                            ('game_features', pipeline_root / "features" / "enhanced_features.csv")]:
+        if not csv_file.exists():
+            print(f"Skipping {table}: {csv_file} not found")
+            continue
+        games = optimize_dtypes(pd.read_csv(csv_file, parse_dates=['game_date']), FEATURE_SCHEMA)
+        start = time.perf_counter()
+        loaded = database.upsert(table, games)
+        print(f"Upserted {loaded} rows into {table} in {time.perf_counter() - start:.2f}s")
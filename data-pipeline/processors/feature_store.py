@@ -0,0 +1,282 @@
+import hashlib
+import sys
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from processors.storage import ColumnarStore
+
+# Pre-game features the store can answer for any matchup, played or not
+STATE_FEATURES = [
+    'rolling_ppg', 'rolling_win_rate', 'h2h_win_rate', 'h2h_games_played',
+    'home_days_rest', 'away_days_rest', 'season_win_rate_diff', 'season_ppg_diff',
+    'month', 'day_of_week', 'is_weekend', 'is_playoff_month'
+]
+
+
+class TeamState:
+    """Running state for one team: a ring buffer of recent games and season-to-date sums"""
+
+    def __init__(self, window):
+        self.recent_points = deque(maxlen=window)
+        self.recent_wins = deque(maxlen=window)
+        self.recent_points_sum = 0.0
+        self.recent_wins_sum = 0
+        self.last_game_date = None
+        self.season = None
+        self.season_games = 0
+        self.season_wins = 0
+        self.season_points = 0.0
+
+    def add_game(self, game_date, season, points, won):
+        if len(self.recent_points) == self.recent_points.maxlen:
+            self.recent_points_sum -= self.recent_points[0]
+            self.recent_wins_sum -= self.recent_wins[0]
+        self.recent_points.append(points)
+        self.recent_wins.append(won)
+        self.recent_points_sum += points
+        self.recent_wins_sum += won
+
+        if season != self.season:
+            self.season = season
+            self.season_games = 0
+            self.season_wins = 0
+            self.season_points = 0.0
+        self.season_games += 1
+        self.season_wins += won
+        self.season_points += points
+        self.last_game_date = game_date
+
+    def rolling_ppg(self):
+        return self.recent_points_sum / len(self.recent_points) if self.recent_points else np.nan
+
+    def rolling_win_rate(self):
+        return self.recent_wins_sum / len(self.recent_wins) if self.recent_wins else 0.5
+
+    def season_ppg(self, season):
+        if self.season != season or self.season_games == 0:
+            return np.nan
+        return self.season_points / self.season_games
+
+    def season_win_rate(self, season):
+        if self.season != season or self.season_games == 0:
+            return 0.5
+        return self.season_wins / self.season_games
+
+    def days_rest(self, game_date, cap):
+        if self.last_game_date is None:
+            return cap
+        return min((game_date - self.last_game_date).days, cap)
+
+
+class TeamFeatureStore:
+    """Per-team state and a head-to-head index, kept current one game at a time.
+
+    `matchup_features` answers the pre-game state features for any
+    (home, away, date) in O(1) from the stored state, and `update` folds in
+    a finished game. Games at or before the last applied (game_date,
+    game_id) are ignored, so replaying an overlapping batch is safe;
+    corrections to such games go through `rebuild_teams`.
+
+    Rolling and season features are home-minus-away differentials;
+    h2h_win_rate is the home team's win rate in earlier meetings.
+    """
+
+    def __init__(self, window=10, rest_cap=10):
+        self.window = window
+        self.rest_cap = rest_cap
+        self.teams = {}
+        self.head_to_head = {}
+        self.last_applied = None
+
+    def _team(self, team):
+        if team not in self.teams:
+            self.teams[team] = TeamState(self.window)
+        return self.teams[team]
+
+    def matchup_features(self, home, away, game_date, season=None):
+        game_date = pd.Timestamp(game_date)
+        season = game_date.year if season is None else season
+        home_state = self.teams.get(home) or TeamState(self.window)
+        away_state = self.teams.get(away) or TeamState(self.window)
+
+        pair_games, pair_home_wins = self._h2h(home, away)
+
+        return {
+            'rolling_ppg': home_state.rolling_ppg() - away_state.rolling_ppg(),
+            'rolling_win_rate': home_state.rolling_win_rate() - away_state.rolling_win_rate(),
+            'h2h_win_rate': pair_home_wins / pair_games if pair_games else 0.5,
+            'h2h_games_played': pair_games,
+            'home_days_rest': home_state.days_rest(game_date, self.rest_cap),
+            'away_days_rest': away_state.days_rest(game_date, self.rest_cap),
+            'season_win_rate_diff': home_state.season_win_rate(season) - away_state.season_win_rate(season),
+            'season_ppg_diff': home_state.season_ppg(season) - away_state.season_ppg(season),
+            'month': game_date.month,
+            'day_of_week': game_date.dayofweek,
+            'is_weekend': int(game_date.dayofweek in (5, 6)),
+            'is_playoff_month': int(game_date.month in (4, 5, 6)),
+        }
+
+    def default_date(self):
+        """The day after the last applied game, the first date the state fully describes"""
+        return self.last_applied[0] + pd.Timedelta(days=1) if self.last_applied else pd.Timestamp.now().normalize()
+
+    def matchup_frame(self, homes, aways, game_date=None):
+        """State features for many matchups on one date, or on one date per matchup.
+
+        Missing dates default to default_date(). The state includes every
+        applied game, so it only describes dates after the last one.
+        """
+        dates = game_date if pd.api.types.is_list_like(game_date) else [game_date] * len(homes)
+        default = self.default_date()
+        rows = [self.matchup_features(home, away, default if date is None else date)
+                for home, away, date in zip(homes, aways, dates)]
+        return pd.DataFrame(rows, columns=STATE_FEATURES)
+
+    def _h2h(self, home, away):
+        key = (home, away) if home < away else (away, home)
+        games, first_wins = self.head_to_head.get(key, (0, 0))
+        home_wins = first_wins if key[0] == home else games - first_wins
+        return games, home_wins
+
+    def update(self, game_date, game_id, season, home, away, pts_home, pts_away):
+        game_date = pd.Timestamp(game_date)
+        if self.last_applied is not None and (game_date, game_id) <= self.last_applied:
+            return False
+        if pd.isna(pts_home) or pd.isna(pts_away):
+            return False
+
+        home_won = int(pts_home > pts_away)
+        self._team(home).add_game(game_date, season, pts_home, home_won)
+        self._team(away).add_game(game_date, season, pts_away, 1 - home_won)
+
+        key = (home, away) if home < away else (away, home)
+        games, first_wins = self.head_to_head.get(key, (0, 0))
+        first_won = home_won if key[0] == home else 1 - home_won
+        self.head_to_head[key] = (games + 1, first_wins + first_won)
+
+        self.last_applied = (game_date, game_id)
+        return True
+
+    def update_many(self, games):
+        """Apply finished games from a clean_games frame in (game_date, game_id) order"""
+        games = games.sort_values(['game_date', 'game_id'], kind='stable')
+        applied = 0
+        for row in games[['game_date', 'game_id', 'season', 'home_team_abbr', 'away_team_abbr',
+                          'pts_home', 'pts_away']].itertuples(index=False):
+            applied += self.update(*row)
+        return applied
+
+    def rebuild_teams(self, teams, history):
+        """Recompute the state of `teams` and their head-to-head records from `history`.
+
+        Used when games at or before last_applied are corrected: `update`
+        skips those, and a ring buffer cannot take a game back out. `history`
+        must hold every game the teams played; later games are left to
+        `update`.
+        """
+        teams = set(teams)
+        if self.last_applied is not None:
+            last_date, last_id = self.last_applied
+            history = history[(history['game_date'] < last_date) |
+                              ((history['game_date'] == last_date) & (history['game_id'] <= last_id))]
+        replayed = TeamFeatureStore.build(history, window=self.window, rest_cap=self.rest_cap)
+
+        for team in teams:
+            if team in replayed.teams:
+                self.teams[team] = replayed.teams[team]
+            else:
+                self.teams.pop(team, None)
+        for key in [key for key in self.head_to_head if key[0] in teams or key[1] in teams]:
+            del self.head_to_head[key]
+        for key, record in replayed.head_to_head.items():
+            if key[0] in teams or key[1] in teams:
+                self.head_to_head[key] = record
+
+    def fingerprint(self):
+        """Short digest of the whole state; corrections change it even when last_applied does not"""
+        digest = hashlib.sha1(repr(self.last_applied).encode())
+        for team in sorted(self.teams):
+            state = self.teams[team]
+            digest.update(repr((
+                str(team), [float(p) for p in state.recent_points], [int(w) for w in state.recent_wins],
+                str(state.last_game_date), str(state.season), state.season_games, state.season_wins,
+                float(state.season_points),
+            )).encode())
+        for key in sorted(self.head_to_head):
+            games, wins = self.head_to_head[key]
+            digest.update(repr((str(key[0]), str(key[1]), int(games), int(wins))).encode())
+        return digest.hexdigest()[:8]
+
+    @classmethod
+    def build(cls, games, window=10, rest_cap=10):
+        store = cls(window=window, rest_cap=rest_cap)
+        store.update_many(games)
+        return store
+
+    def save(self, columnar_store, name="team_features"):
+        teams = pd.DataFrame([
+            {
+                'team': team,
+                'recent_points': list(state.recent_points),
+                'recent_wins': list(state.recent_wins),
+                'last_game_date': state.last_game_date,
+                'season': state.season,
+                'season_games': state.season_games,
+                'season_wins': state.season_wins,
+                'season_points': state.season_points,
+            }
+            for team, state in self.teams.items()
+        ])
+        head_to_head = pd.DataFrame(
+            [(a, b, games, wins) for (a, b), (games, wins) in self.head_to_head.items()],
+            columns=['team_a', 'team_b', 'games', 'team_a_wins']
+        )
+        meta = pd.DataFrame([{
+            'window': self.window,
+            'rest_cap': self.rest_cap,
+            'last_game_date': self.last_applied[0] if self.last_applied else pd.NaT,
+            'last_game_id': self.last_applied[1] if self.last_applied else -1,
+        }])
+
+        columnar_store.write(f"{name}_teams", teams)
+        columnar_store.write(f"{name}_h2h", head_to_head)
+        columnar_store.write(f"{name}_meta", meta)
+
+    @classmethod
+    def load(cls, columnar_store, name="team_features"):
+        meta = columnar_store.read(f"{name}_meta").iloc[0]
+        store = cls(window=int(meta['window']), rest_cap=int(meta['rest_cap']))
+        if meta['last_game_id'] != -1:
+            store.last_applied = (pd.Timestamp(meta['last_game_date']), meta['last_game_id'])
+
+        for row in columnar_store.read(f"{name}_teams").itertuples(index=False):
+            state = store._team(row.team)
+            state.recent_points.extend(row.recent_points)
+            state.recent_wins.extend(int(w) for w in row.recent_wins)
+            state.recent_points_sum = float(sum(state.recent_points))
+            state.recent_wins_sum = int(sum(state.recent_wins))
+            state.last_game_date = pd.Timestamp(row.last_game_date) if pd.notna(row.last_game_date) else None
+            state.season = row.season
+            state.season_games = int(row.season_games)
+            state.season_wins = int(row.season_wins)
+            state.season_points = float(row.season_points)
+
+        for row in columnar_store.read(f"{name}_h2h").itertuples(index=False):
+            store.head_to_head[(row.team_a, row.team_b)] = (int(row.games), int(row.team_a_wins))
+
+        return store
+
+    @classmethod
+    def exists(cls, columnar_store, name="team_features"):
+        return columnar_store.exists(f"{name}_meta")
+
+    @classmethod
+    def saved_stamp(cls, columnar_store, name="team_features"):
+        """Modification time of the saved meta table, which `save` writes last; None if nothing is saved"""
+        files = list(columnar_store.path(f"{name}_meta").rglob("*.parquet"))
+        return max(path.stat().st_mtime_ns for path in files) if files else None
@@ -0,0 +1,110 @@
+import functools
+import os
+import resource
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+# Latency buckets for the prediction path: cached lookups sit well under a
+# millisecond, live predict_proba batches in the tens of milliseconds
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _NullMetric:
+    """Stand-in used when prometheus_client is not installed"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def _metric(kind, name, documentation, labels, **kwargs):
+    if prometheus_client is None:
+        return _NullMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labels, **kwargs)
+
+
+STAGE_SECONDS = _metric('Gauge', 'nba_stage_duration_seconds',
+                        'Wall time of the last run of a pipeline stage', ['component', 'stage'])
+STAGE_RUNS = _metric('Counter', 'nba_stage_runs', 'Pipeline stage runs', ['component', 'stage'])
+STAGE_RSS = _metric('Gauge', 'nba_stage_rss_bytes',
+                    'Resident memory when the stage finished', ['component', 'stage'])
+STAGE_PEAK_RSS = _metric('Gauge', 'nba_stage_peak_rss_bytes',
+                         'Peak resident memory of the process up to the end of the stage', ['component', 'stage'])
+
+REQUEST_LATENCY = _metric('Histogram', 'nba_request_latency_seconds',
+                          'Prediction API request latency', ['endpoint'], buckets=REQUEST_BUCKETS)
+MODEL_RELOADS = _metric('Counter', 'nba_model_reloads', 'Model versions loaded by the server', ['slot'])
+
+# Plain copy of the stage measurements, readable without prometheus_client
+STAGE_REPORT = {}
+
+
+def current_rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@contextmanager
+def stage_timer(component, stage):
+    """Record wall time and memory of the enclosed block as `stage` of `component`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        rss = current_rss_bytes()
+        # ru_maxrss is only refreshed by the kernel now and then; never report it below the current RSS
+        peak = max(peak_rss_bytes(), rss)
+        STAGE_SECONDS.labels(component, stage).set(seconds)
+        STAGE_RUNS.labels(component, stage).inc()
+        STAGE_RSS.labels(component, stage).set(rss)
+        STAGE_PEAK_RSS.labels(component, stage).set(peak)
+        STAGE_REPORT[(component, stage)] = {'seconds': seconds, 'rss_bytes': rss, 'peak_rss_bytes': peak}
+
+
+def timed_stage(component):
+    """Method decorator: each call is a stage named after the method"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(component, func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def exposition():
+    """(body, content type) of every metric in Prometheus text format"""
+    if prometheus_client is None:
+        return b"# prometheus_client is not installed\n", "text/plain; charset=utf-8"
+    return prometheus_client.generate_latest(), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def write_metrics(component):
+    """Write the metrics to $METRICS_DIR/<component>.prom for the node_exporter textfile collector.
+
+    Batch jobs exit before anything could scrape them, so this is how their
+    stage timings reach Prometheus. Does nothing when METRICS_DIR is unset.
+    """
+    directory = os.environ.get("METRICS_DIR")
+    if not directory or prometheus_client is None:
+        return None
+    path = Path(directory) / f"{component}.prom"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    prometheus_client.write_to_textfile(str(path), prometheus_client.REGISTRY)
+    return path
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Column roles for the frames the pipeline keeps in memory. optimize_dtypes
+# applies them: `drop` removes redundant join columns, `category` stores
+# repeated labels once, `flag` packs 0/1 columns into int8, `integer` maps
+# columns to a fixed integer type, and `float32` halves float columns (True
+# means every float column). Columns missing from a frame are skipped. Types
+# never depend on the batch's values, so a small incremental batch gets the
+# same Parquet schema as a full rebuild.
+
+TEAM_SCHEMA = {
+    'category': ['full_name', 'abbreviation', 'nickname', 'city', 'state'],
+    'integer': {'year_founded': 'int16'},
+}
+
+CLEAN_GAMES_SCHEMA = {
+    # Copies of home_team_id / visitor_team_id left by joining the team table
+    'drop': ['id_x', 'id_y'],
+    'category': [
+        'home_team_id', 'visitor_team_id',
+        'home_team_name', 'home_team_abbr', 'away_team_name', 'away_team_abbr',
+        'nickname_x', 'nickname_y', 'city_x', 'city_y', 'state_x', 'state_y',
+        'game_time', 'game_status_text', 'natl_tv_broadcaster_abbreviation',
+        'live_pc_time', 'live_period_time_bcast', 'wh_status',
+    ],
+    'flag': ['is_weekend', 'is_playoff_month', 'is_rivalry', 'home_win'],
+    'integer': {
+        'season': 'int16', 'month': 'int8', 'day_of_week': 'int8', 'game_sequence': 'int16',
+        'game_status_id': 'int8', 'live_period': 'int8', 'year_founded_x': 'int16', 'year_founded_y': 'int16',
+    },
+    'float32': True,
+}
+
+FEATURE_SCHEMA = dict(CLEAN_GAMES_SCHEMA, integer=dict(
+    CLEAN_GAMES_SCHEMA['integer'], h2h_games_played='int16', home_days_rest='int16', away_days_rest='int16',
+))
+
+
+def _as_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        # Numeric ids become string labels without materializing a string per row
+        categorical = series.astype('category')
+        return categorical.cat.rename_categories([str(value) for value in categorical.cat.categories])
+    return series.astype('category')
+
+
+def optimize_dtypes(df, schema, auto_category_ratio=None):
+    """Return df with the schema's dtypes applied.
+
+    With auto_category_ratio, string columns the schema does not mention become
+    categoricals too when they repeat enough (distinct values at most that
+    share of rows). That choice depends on the rows at hand, so only use it
+    for frames that are never persisted.
+    """
+    df = df.drop(columns=[col for col in schema.get('drop', []) if col in df.columns])
+
+    converted = {}
+    for col in schema.get('category', []):
+        if col in df.columns:
+            converted[col] = _as_category(df[col])
+
+    for col in schema.get('flag', []):
+        if col in df.columns and df[col].notna().all():
+            converted[col] = df[col].astype(np.int8)
+
+    for col, dtype in schema.get('integer', {}).items():
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col].dtype) and df[col].notna().all():
+            if (df[col] % 1 == 0).all():
+                converted[col] = df[col].astype(dtype)
+
+    floats = schema.get('float32', [])
+    if floats is True:
+        floats = [col for col in df.columns if pd.api.types.is_float_dtype(df[col].dtype)]
+    for col in floats:
+        if col in df.columns and col not in converted and pd.api.types.is_float_dtype(df[col].dtype):
+            converted[col] = df[col].astype(np.float32)
+
+    if auto_category_ratio is not None:
+        named = set(converted) | set(schema.get('category', []))
+        for col in df.columns:
+            if col in named or not (pd.api.types.is_object_dtype(df[col].dtype) or pd.api.types.is_string_dtype(df[col].dtype)):
+                continue
+            if len(df) and df[col].nunique() <= auto_category_ratio * len(df):
+                converted[col] = df[col].astype('category')
+
+    return df.assign(**converted) if converted else df
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
@@ -0,0 +1,115 @@
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+
+def _align_categories(existing, df):
+    """Give categorical columns the union of both frames' categories.
+
+    A batch only carries the categories of its own rows, so casting the
+    stored rows to the batch's categories would turn every other stored
+    value into NaN.
+    """
+    aligned_existing, aligned_df = {}, {}
+    for col in df.columns.intersection(existing.columns):
+        if not (isinstance(df[col].dtype, pd.CategoricalDtype)
+                or isinstance(existing[col].dtype, pd.CategoricalDtype)):
+            continue
+        old, new = existing[col].astype('category'), df[col].astype('category')
+        # Index.append rather than union_categoricals: a batch whose values are all
+        # missing has float categories, which union_categoricals rejects
+        categories = old.cat.categories.append(new.cat.categories).unique()
+        aligned_existing[col] = old.cat.set_categories(categories)
+        aligned_df[col] = new.cat.set_categories(categories)
+    return existing.assign(**aligned_existing), df.assign(**aligned_df)
+
+
+class ColumnarStore:
+    """Typed Parquet datasets shared by the pipeline stages.
+
+    Each dataset lives in its own directory under `root`, optionally
+    hive-partitioned (e.g. `clean_games/season=2015/...`). Reads are
+    memory-mapped and support column projection and partition filters, so
+    a consumer only pays for the columns and seasons it asks for.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.filesystem = pafs.LocalFileSystem(use_mmap=True)
+
+    def path(self, name):
+        return self.root / name
+
+    def exists(self, name):
+        path = self.path(name)
+        return path.is_dir() and any(path.rglob("*.parquet"))
+
+    def stale(self, name, source):
+        """True when the dataset is missing or older than `source`, the CSV it mirrors"""
+        if not self.exists(name):
+            return True
+        source = Path(source)
+        if not source.exists():
+            return False
+        newest = max(path.stat().st_mtime_ns for path in self.path(name).rglob("*.parquet"))
+        return source.stat().st_mtime_ns > newest
+
+    def _dataset(self, name):
+        return ds.dataset(str(self.path(name)), format="parquet", partitioning="hive",
+                          filesystem=self.filesystem)
+
+    def columns(self, name):
+        """Column names of a stored dataset, read from the Parquet footers only"""
+        return self._dataset(name).schema.names
+
+    def write(self, name, df, partition_cols=None):
+        """Replace a dataset with the contents of `df`"""
+        path = self.path(name)
+        if path.exists():
+            shutil.rmtree(path)
+        self._write_partitions(path, df, partition_cols)
+
+    def upsert(self, name, df, key, partition_cols=None):
+        """Insert or replace rows by `key`, rewriting only the partitions `df` touches"""
+        if not self.exists(name):
+            self.write(name, df, partition_cols)
+            return
+
+        if partition_cols:
+            touched = df[partition_cols].drop_duplicates()
+            filters = [[(col, "=", value) for col, value in zip(partition_cols, row)]
+                       for row in touched.itertuples(index=False)]
+            existing = self.read(name, filters=filters)
+        else:
+            existing = self.read(name)
+
+        existing = existing[~existing[key].isin(df[key])]
+        existing, df = _align_categories(existing, df)
+        merged = pd.concat([existing, df], ignore_index=True)
+        merged = merged.astype({col: dtype for col, dtype in df.dtypes.items()
+                                if not isinstance(dtype, pd.CategoricalDtype)})
+
+        if partition_cols:
+            self._write_partitions(self.path(name), merged, partition_cols)
+        else:
+            self.write(name, merged)
+
+    def read(self, name, columns=None, filters=None):
+        """Read a dataset, optionally projecting `columns` and filtering with
+        pyarrow-style `filters` (e.g. [("season", ">=", 2015)])"""
+        expression = pq.filters_to_expression(filters) if filters else None
+        table = self._dataset(name).to_table(columns=columns, filter=expression)
+        return table.to_pandas()
+
+    def _write_partitions(self, path, df, partition_cols):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_to_dataset(
+            table, str(path),
+            partition_cols=list(partition_cols) if partition_cols else None,
+            existing_data_behavior="delete_matching",
+        )
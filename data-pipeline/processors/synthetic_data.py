@@ -0,0 +1,517 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# (abbreviation, city, nickname, state, year_founded) in team id order from 1610612737
+TEAMS = [
+    ('ATL', 'Atlanta', 'Hawks', 'Georgia', 1949),
+    ('BOS', 'Boston', 'Celtics', 'Massachusetts', 1946),
+    ('CLE', 'Cleveland', 'Cavaliers', 'Ohio', 1970),
+    ('NOP', 'New Orleans', 'Pelicans', 'Louisiana', 2002),
+    ('CHI', 'Chicago', 'Bulls', 'Illinois', 1966),
+    ('DAL', 'Dallas', 'Mavericks', 'Texas', 1980),
+    ('DEN', 'Denver', 'Nuggets', 'Colorado', 1976),
+    ('GSW', 'Golden State', 'Warriors', 'California', 1946),
+    ('HOU', 'Houston', 'Rockets', 'Texas', 1967),
+    ('LAC', 'Los Angeles', 'Clippers', 'California', 1970),
+    ('LAL', 'Los Angeles', 'Lakers', 'California', 1948),
+    ('MIA', 'Miami', 'Heat', 'Florida', 1988),
+    ('MIL', 'Milwaukee', 'Bucks', 'Wisconsin', 1968),
+    ('MIN', 'Minnesota', 'Timberwolves', 'Minnesota', 1989),
+    ('BKN', 'Brooklyn', 'Nets', 'New York', 1976),
+    ('NYK', 'New York', 'Knicks', 'New York', 1946),
+    ('ORL', 'Orlando', 'Magic', 'Florida', 1989),
+    ('IND', 'Indiana', 'Pacers', 'Indiana', 1976),
+    ('PHI', 'Philadelphia', '76ers', 'Pennsylvania', 1949),
+    ('PHX', 'Phoenix', 'Suns', 'Arizona', 1968),
+    ('POR', 'Portland', 'Trail Blazers', 'Oregon', 1970),
+    ('SAC', 'Sacramento', 'Kings', 'California', 1948),
+    ('SAS', 'San Antonio', 'Spurs', 'Texas', 1976),
+    ('OKC', 'Oklahoma City', 'Thunder', 'Oklahoma', 1967),
+    ('TOR', 'Toronto', 'Raptors', 'Ontario', 1995),
+    ('UTA', 'Utah', 'Jazz', 'Utah', 1974),
+    ('MEM', 'Memphis', 'Grizzlies', 'Tennessee', 1995),
+    ('WAS', 'Washington', 'Wizards', 'District of Columbia', 1961),
+    ('DET', 'Detroit', 'Pistons', 'Michigan', 1948),
+    ('CHA', 'Charlotte', 'Hornets', 'North Carolina', 1988),
+]
+FIRST_TEAM_ID = 1610612737
+
+FIRST_NAMES = np.array(['James', 'Chris', 'Kevin', 'Anthony', 'Marcus', 'Jalen', 'Tyler', 'Derrick',
+                        'Josh', 'Kyle', 'Devin', 'Brandon', 'Jaylen', 'Andre', 'Luka', 'Nikola'], dtype=object)
+LAST_NAMES = np.array(['Johnson', 'Williams', 'Brown', 'Davis', 'Miller', 'Wilson', 'Moore', 'Taylor',
+                       'Thomas', 'Jackson', 'White', 'Harris', 'Martin', 'Thompson', 'Young', 'Allen',
+                       'Walker', 'Green', 'Hill', 'Adams', 'Baker', 'Nelson', 'Carter'], dtype=object)
+
+# Play-by-play event kinds generated for each side of a game:
+# (eventmsgtype, eventmsgactiontype, points, prefix, description)
+EVENT_KINDS = [
+    (1, 1, 3, '', ' 3PT Jump Shot'),
+    (1, 5, 2, '', ' Driving Layup'),
+    (3, 11, 1, '', ' Free Throw 1 of 2'),
+    (2, 1, 0, 'MISS ', ' Jump Shot'),
+    (3, 11, 0, 'MISS ', ' Free Throw 1 of 2'),
+    (4, 0, 0, '', ' REBOUND'),
+    (5, 1, 0, '', ' Bad Pass Turnover'),
+    (6, 1, 0, '', ' P.FOUL'),
+    (8, 0, 0, 'SUB: ', ' ENTERS'),
+    (9, 1, 0, '', ' Timeout: Regular'),
+]
+MADE_THREE, MADE_TWO, MADE_FT, MISS, MISS_FT, REBOUND, TURNOVER, FOUL, SUB, TIMEOUT = range(len(EVENT_KINDS))
+PERIOD_START, PERIOD_END = 12, 13
+
+PLAY_BY_PLAY_COLUMNS = [
+    'game_id', 'eventnum', 'eventmsgtype', 'eventmsgactiontype', 'period', 'wctimestring', 'pctimestring',
+    'homedescription', 'neutraldescription', 'visitordescription', 'score', 'scoremargin',
+] + [f'{prefix}{i}{suffix}' for i in (1, 2, 3) for prefix, suffix in [
+    ('person', 'type'), ('player', '_id'), ('player', '_name'), ('player', '_team_id'),
+    ('player', '_team_city'), ('player', '_team_nickname'), ('player', '_team_abbreviation'),
+]] + ['video_available_flag']
+
+
+# Numbers are formatted through lookup tables: converting millions of
+# event rows one by one is slower than generating them
+_NUMBER_OFFSET = 1000
+_NUMBERS = np.array([str(i) for i in range(-_NUMBER_OFFSET, 10_000)], dtype=object)
+_TWO_DIGITS = np.array([f"{i:02d}" for i in range(60)], dtype=object)
+
+
+def _as_text(values):
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) and (values.min() < -_NUMBER_OFFSET or values.max() >= len(_NUMBERS) - _NUMBER_OFFSET):
+        return pd.Series(values).astype(str).to_numpy(dtype=object)
+    return _NUMBERS[values + _NUMBER_OFFSET]
+
+
+def _clock_string(minutes, seconds):
+    return _as_text(minutes) + ':' + _TWO_DIGITS[np.asarray(seconds, dtype=np.int64)]
+
+
+class SyntheticNBAGenerator:
+    """Writes game_info, game_summary, team, line_score and play_by_play CSVs
+    with the columns of the Kaggle NBA dump, at any multiple of its size.
+
+    Every season plays `scale` times a full 1,230-game regular season plus a
+    playoff block. Scores come from team strengths that drift between
+    seasons plus home advantage, so the trained models have signal to find.
+    Play-by-play events add up exactly to each game's final score. All
+    tables are generated with array operations; play-by-play is produced
+    and written in fixed-size batches of games, so its memory does not grow
+    with the scale.
+    """
+
+    REGULAR_SEASON_GAMES = 1230
+    PLAYOFF_GAMES = 82
+    ROSTER_SIZE = 15
+    HOME_ADVANTAGE = 2.5
+    # ~430 events per game; a batch of 500 games is about 250 MB of event rows
+    PLAY_BY_PLAY_BATCH = 500
+
+    def __init__(self, scale=1.0, seed=0, first_season=2010, last_season=2022):
+        self.scale = scale
+        self.seed = seed
+        self.seasons = np.arange(first_season, last_season + 1)
+        self.rng = np.random.default_rng(seed)
+
+        self.abbrs = np.array([team[0] for team in TEAMS], dtype=object)
+        self.cities = np.array([team[1] for team in TEAMS], dtype=object)
+        self.nicknames = np.array([team[2] for team in TEAMS], dtype=object)
+        self.team_ids = FIRST_TEAM_ID + np.arange(len(TEAMS))
+
+        player_ids = 1_630_000 + np.arange(len(TEAMS) * self.ROSTER_SIZE)
+        self.player_ids = player_ids.reshape(len(TEAMS), self.ROSTER_SIZE)
+        self.player_names = (FIRST_NAMES[player_ids % len(FIRST_NAMES)] + ' ' +
+                             LAST_NAMES[(player_ids // 7) % len(LAST_NAMES)]).reshape(self.player_ids.shape)
+
+    def teams(self):
+        return pd.DataFrame({
+            'id': self.team_ids,
+            'full_name': self.cities + ' ' + self.nicknames,
+            'abbreviation': self.abbrs,
+            'nickname': self.nicknames,
+            'city': self.cities,
+            'state': [team[3] for team in TEAMS],
+            'year_founded': [team[4] for team in TEAMS],
+        })
+
+    def _strengths(self):
+        # Point-margin strength per (season, team): a mean-reverting walk across seasons
+        strengths = np.empty((len(self.seasons), len(TEAMS)))
+        strengths[0] = self.rng.normal(0, 4, len(TEAMS))
+        for i in range(1, len(self.seasons)):
+            strengths[i] = 0.7 * strengths[i - 1] + self.rng.normal(0, 2.5, len(TEAMS))
+        return strengths
+
+    def _season_games(self, season, strengths):
+        n_regular = int(round(self.REGULAR_SEASON_GAMES * self.scale))
+        n_playoff = int(round(self.PLAYOFF_GAMES * self.scale))
+        n_teams = len(TEAMS)
+
+        home = self.rng.integers(0, n_teams, n_regular)
+        away = (home + self.rng.integers(1, n_teams, n_regular)) % n_teams
+        regular_days = self.rng.integers(0, 177, n_regular)
+
+        # Playoffs: the 16 strongest teams, higher seed at home more often
+        seeds = np.argsort(-strengths)[:16]
+        first, second = self.rng.choice(16, (2, n_playoff))
+        second = np.where(first == second, (second + 1) % 16, second)
+        top, bottom = np.minimum(first, second), np.maximum(first, second)
+        top_home = self.rng.random(n_playoff) < 0.6
+        playoff_home = np.where(top_home, seeds[top], seeds[bottom])
+        playoff_away = np.where(top_home, seeds[bottom], seeds[top])
+        playoff_days = 180 + self.rng.integers(0, 58, n_playoff)
+
+        days = np.concatenate([regular_days, playoff_days])
+        order = np.argsort(days, kind='stable')
+        kind = np.concatenate([np.full(n_regular, 2), np.full(n_playoff, 4)])[order]
+        games = pd.DataFrame({
+            'game_date': pd.Timestamp(f"{season}-10-20") + pd.to_timedelta(days[order], unit='D'),
+            'season': season,
+            'kind': kind,
+            'home': np.concatenate([home, playoff_home])[order],
+            'away': np.concatenate([away, playoff_away])[order],
+        })
+
+        # game_id follows the NBA layout 00 + kind + yy + sequence, widened past 99,999 games
+        width = max(5, len(str(max(n_regular, n_playoff))))
+        sequence = games.groupby('kind').cumcount().to_numpy() + 1
+        games['game_id'] = kind * 10 ** (width + 2) + (season % 100) * 10 ** width + sequence
+        return games
+
+    def _score(self, games, strengths, season_index):
+        n = len(games)
+        # League scoring rose through the 2010s; mean total points follows the season
+        total_mean = 198 + 2.0 * season_index
+        margin = (self.HOME_ADVANTAGE + strengths[season_index, games['home'].to_numpy()]
+                  - strengths[season_index, games['away'].to_numpy()] + self.rng.normal(0, 12, n))
+        total = self.rng.normal(total_mean, 18, n)
+        pts_home = np.maximum(np.round((total + margin) / 2), 60).astype(np.int64)
+        pts_away = np.maximum(np.round((total - margin) / 2), 60).astype(np.int64)
+
+        quarters_home = self.rng.multinomial(pts_home, [0.25] * 4)
+        quarters_away = self.rng.multinomial(pts_away, [0.25] * 4)
+
+        # Tied games go to overtime, five-minute periods until someone leads
+        ot_home = np.zeros((n, 10), dtype=np.int64)
+        ot_away = np.zeros((n, 10), dtype=np.int64)
+        tied = pts_home == pts_away
+        for period in range(10):
+            if not tied.any():
+                break
+            ot_home[tied, period] = self.rng.poisson(10, tied.sum())
+            ot_away[tied, period] = self.rng.poisson(10, tied.sum())
+            if period == 9:
+                ot_home[tied, period] += ot_home[tied, period] == ot_away[tied, period]
+            pts_home = pts_home + ot_home[:, period]
+            pts_away = pts_away + ot_away[:, period]
+            tied = pts_home == pts_away
+
+        games['pts_home'] = pts_home
+        games['pts_away'] = pts_away
+        games['overtimes'] = (ot_home + ot_away > 0).sum(axis=1)
+        return games, quarters_home, quarters_away, ot_home, ot_away
+
+    def schedule(self):
+        """Every game with its teams and final score, plus per-period points for line_score"""
+        strengths = self._strengths()
+        seasons, periods = [], []
+        for i, season in enumerate(self.seasons):
+            games, *season_periods = self._score(self._season_games(season, strengths[i]), strengths, i)
+            seasons.append(games)
+            periods.append(season_periods)
+
+        games = pd.concat(seasons, ignore_index=True)
+        games['game_sequence'] = games.groupby('game_date').cumcount() + 1
+        games['start_minute'] = 19 * 60 + self.rng.integers(0, 31, len(games))
+        periods = [np.concatenate(parts) for parts in zip(*periods)]
+        return games, periods
+
+    def game_info(self, games):
+        n = len(games)
+        attendance = np.clip(self.rng.normal(17_500, 2_000, n), 8_000, 21_000).round()
+        attendance[self.rng.random(n) < 0.01] = np.nan
+        duration = 125 + 10 * games['overtimes'].to_numpy() + self.rng.integers(0, 30, n)
+        game_time = _clock_string(duration // 60, duration % 60)
+        game_time[self.rng.random(n) < 0.01] = None
+        return pd.DataFrame({
+            'game_id': games['game_id'],
+            'game_date': games['game_date'],
+            'attendance': attendance,
+            'game_time': game_time,
+        })
+
+    def game_summary(self, games, duplicate_rate=0.002):
+        n = len(games)
+        broadcaster = self.rng.choice(np.array(['ESPN', 'TNT', 'ABC', 'NBA TV', None], dtype=object), n,
+                                      p=[0.08, 0.08, 0.03, 0.06, 0.75])
+        live_period = 4 + games['overtimes'].to_numpy()
+        summary = pd.DataFrame({
+            'game_date_est': games['game_date'],
+            'game_sequence': games['game_sequence'],
+            'game_id': games['game_id'],
+            'game_status_id': 3,
+            'game_status_text': 'Final',
+            'gamecode': games['game_date'].dt.strftime('%Y%m%d').to_numpy(dtype=object) + '/' +
+                        self.abbrs[games['away']] + self.abbrs[games['home']],
+            'home_team_id': self.team_ids[games['home']],
+            'visitor_team_id': self.team_ids[games['away']],
+            'season': games['season'],
+            'live_period': live_period,
+            'live_pc_time': None,
+            'natl_tv_broadcaster_abbreviation': broadcaster,
+            'live_period_time_bcast': 'Q' + _as_text(live_period) + ' - ' +
+                                      np.where(pd.isna(broadcaster), '', broadcaster),
+            'wh_status': 1,
+        })
+        # The real dump repeats some game_summary rows; the cleaner deduplicates them
+        duplicates = summary[self.rng.random(n) < duplicate_rate]
+        return pd.concat([summary, duplicates]).sort_values(['game_date_est', 'game_sequence'], kind='stable') \
+            .reset_index(drop=True)
+
+    def line_score(self, games, periods):
+        quarters_home, quarters_away, ot_home, ot_away = periods
+        home, away = games['home'].to_numpy(), games['away'].to_numpy()
+        home_win = games['pts_home'].to_numpy() > games['pts_away'].to_numpy()
+
+        # Season-to-date record after each game, from one cumulative sum per (season, team);
+        # home and away rows are interleaved so the sums run in game order
+        results = pd.DataFrame({
+            'season': np.repeat(games['season'].to_numpy(), 2),
+            'team': np.column_stack([home, away]).ravel(),
+            'win': np.column_stack([home_win, ~home_win]).ravel().astype(np.int64),
+        })
+        wins = results.groupby(['season', 'team'])['win'].cumsum().to_numpy()
+        played = results.groupby(['season', 'team']).cumcount().to_numpy() + 1
+        record = (_as_text(wins) + '-' + _as_text(played - wins)).reshape(-1, 2)
+
+        line_score = {'game_date_est': games['game_date'], 'game_sequence': games['game_sequence'],
+                      'game_id': games['game_id']}
+        for side, teams, quarters, overtime, side_record in [
+            ('home', home, quarters_home, ot_home, record[:, 0]),
+            ('away', away, quarters_away, ot_away, record[:, 1]),
+        ]:
+            line_score[f'team_id_{side}'] = self.team_ids[teams]
+            line_score[f'team_abbreviation_{side}'] = self.abbrs[teams]
+            line_score[f'team_city_name_{side}'] = self.cities[teams]
+            line_score[f'team_nickname_{side}'] = self.nicknames[teams]
+            line_score[f'team_wins_losses_{side}'] = side_record
+            for q in range(4):
+                line_score[f'pts_qtr{q + 1}_{side}'] = quarters[:, q].astype(float)
+            for ot in range(10):
+                line_score[f'pts_ot{ot + 1}_{side}'] = overtime[:, ot].astype(float)
+            line_score[f'pts_{side}'] = games[f'pts_{side}'].astype(float)
+        return pd.DataFrame(line_score)
+
+    def _event_counts(self, points):
+        """Per-game counts of each EVENT_KINDS entry for one side; made shots add up to `points`"""
+        n = len(points)
+        threes = np.minimum(self.rng.poisson(0.11 * points), points // 3)
+        remaining = points - 3 * threes
+        free_throws = np.minimum(self.rng.poisson(0.17 * points), remaining)
+        free_throws += (remaining - free_throws) % 2
+        twos = (remaining - free_throws) // 2
+        misses = self.rng.poisson(46, n)
+        return np.column_stack([
+            threes, twos, free_throws, misses, self.rng.poisson(5, n), self.rng.binomial(misses, 0.9),
+            self.rng.poisson(14, n), self.rng.poisson(20, n), self.rng.poisson(22, n), self.rng.poisson(6, n),
+        ])
+
+    def play_by_play(self, games):
+        """One frame of events for `games`, in game order, ending on each game's final score"""
+        n_games, n_kinds = len(games), len(EVENT_KINDS)
+        counts = np.hstack([self._event_counts(games['pts_home'].to_numpy()),
+                            self._event_counts(games['pts_away'].to_numpy())])
+
+        # Regular events: every (game, side, kind) count expanded to rows with a random game-clock time
+        game = np.repeat(np.repeat(np.arange(n_games), 2 * n_kinds), counts.ravel())
+        code = np.repeat(np.tile(np.arange(2 * n_kinds), n_games), counts.ravel())
+        side, kind = code // n_kinds, code % n_kinds
+        game_minutes = 48 + 5 * games['overtimes'].to_numpy()
+        minute = self.rng.random(len(game)) * game_minutes[game]
+
+        # Period markers: a start and an end event for each period of each game
+        n_periods = 4 + games['overtimes'].to_numpy()
+        marker_game = np.repeat(np.arange(n_games), 2 * n_periods)
+        marker_rank = np.arange(len(marker_game)) - np.repeat(np.cumsum(2 * n_periods) - 2 * n_periods, 2 * n_periods)
+        marker_period = marker_rank // 2 + 1
+        is_end = marker_rank % 2 == 1
+        period_start = np.where(marker_period <= 4, 12 * (marker_period - 1), 48 + 5 * (marker_period - 5))
+        period_length = np.where(marker_period <= 4, 12, 5)
+        marker_minute = period_start + is_end * period_length
+
+        period = np.where(minute < 48, minute // 12 + 1, 5 + (minute - 48) // 5).astype(np.int64)
+
+        game = np.concatenate([game, marker_game])
+        minute = np.concatenate([minute, marker_minute])
+        period = np.concatenate([period, marker_period])
+        side = np.concatenate([side, np.full(len(marker_game), -1)])
+        kind = np.concatenate([kind, np.where(is_end, -2, -1)])
+        # At a period boundary the end marker sorts before the next start marker
+        order = np.lexsort((kind != -2, minute, game))
+        game, minute, period, side, kind = game[order], minute[order], period[order], side[order], kind[order]
+
+        marker = kind < 0
+        period_end = np.where(period <= 4, 12 * period, 48 + 5 * (period - 4))
+        remaining = np.round((period_end - minute) * 60).astype(np.int64)
+
+        sizes = np.bincount(game, minlength=n_games)
+        starts = np.cumsum(sizes) - sizes
+        eventnum = np.arange(len(game)) - np.repeat(starts, sizes)
+
+        kinds = np.array(EVENT_KINDS, dtype=object)
+        safe_kind = np.where(marker, 0, kind)
+        points = np.where(marker, 0, kinds[safe_kind, 2].astype(np.int64))
+
+        # Running score: cumulative sum per side, restarted at each game
+        scores = {}
+        for s, name in [(0, 'home'), (1, 'away')]:
+            side_points = np.where(side == s, points, 0)
+            running = np.cumsum(side_points)
+            scores[name] = running - np.repeat(running[starts] - side_points[starts], sizes)
+        scored = points > 0
+        score = np.full(len(game), None, dtype=object)
+        score[scored] = _as_text(scores['away'][scored]) + ' - ' + _as_text(scores['home'][scored])
+        margin = scores['home'] - scores['away']
+        scoremargin = np.full(len(game), None, dtype=object)
+        scoremargin[scored] = np.where(margin[scored] == 0, 'TIE', _as_text(margin[scored]))
+
+        # Acting team and player; team timeouts carry the team id as player1_id like the real feed
+        team = np.where(side == 0, games['home'].to_numpy()[game], games['away'].to_numpy()[game])
+        slot = self.rng.integers(0, self.ROSTER_SIZE, len(game))
+        team_event = kind == TIMEOUT
+        player_event = ~marker & ~team_event
+        player_id = np.where(team_event, self.team_ids[team], self.player_ids[team, slot])
+        player_name = self.player_names[team, slot]
+
+        description = kinds[safe_kind, 3] + np.where(team_event, self.nicknames[team], player_name) + \
+            kinds[safe_kind, 4]
+        neutral = np.full(len(game), None, dtype=object)
+        neutral[marker] = np.where(kind[marker] == -1, 'Start of Period ', 'End of Period ').astype(object) + \
+            _as_text(period[marker])
+
+        # Assisted field goals name a teammate as player2
+        assisted = ((kind == MADE_THREE) | (kind == MADE_TWO)) & (self.rng.random(len(game)) < 0.58)
+        teammate = (slot + 1 + self.rng.integers(0, self.ROSTER_SIZE - 1, len(game))) % self.ROSTER_SIZE
+
+        wall_minute = games['start_minute'].to_numpy()[game] + np.round(minute * 2.6).astype(np.int64)
+        hour = (wall_minute // 60) % 24
+        wctimestring = _clock_string((hour - 1) % 12 + 1, wall_minute % 60) + \
+            np.where(hour >= 12, ' PM', ' AM').astype(object)
+
+        events = {
+            'game_id': games['game_id'].to_numpy()[game],
+            'eventnum': eventnum,
+            'eventmsgtype': np.where(marker, np.where(kind == -1, PERIOD_START, PERIOD_END),
+                                     kinds[safe_kind, 0].astype(np.int64)),
+            'eventmsgactiontype': np.where(marker, 0, kinds[safe_kind, 1].astype(np.int64)),
+            'period': period,
+            'wctimestring': wctimestring,
+            'pctimestring': _clock_string(remaining // 60, remaining % 60),
+            'homedescription': np.where(side == 0, description, None),
+            'neutraldescription': neutral,
+            'visitordescription': np.where(side == 1, description, None),
+            'score': score,
+            'scoremargin': scoremargin,
+        }
+        people = [
+            (np.where(marker, 0, np.where(team_event, 2 + side, 4 + side)), ~marker, player_id, player_name),
+            (np.where(assisted, 4 + side, 0), assisted, self.player_ids[team, teammate],
+             self.player_names[team, teammate]),
+            (np.zeros(len(game), dtype=np.int64), np.zeros(len(game), dtype=bool), None, None),
+        ]
+        for i, (person_type, present, ids, names) in enumerate(people, start=1):
+            events[f'person{i}type'] = person_type
+            if ids is None:
+                for column in ['_id', '_name', '_team_id', '_team_city', '_team_nickname', '_team_abbreviation']:
+                    events[f'player{i}{column}'] = None
+                continue
+            named = present & player_event if i == 1 else present
+            events[f'player{i}_id'] = pd.array(np.where(present, ids, 0), dtype='Int64')
+            events[f'player{i}_id'][~present] = pd.NA
+            events[f'player{i}_name'] = np.where(named, names, None)
+            events[f'player{i}_team_id'] = pd.array(self.team_ids[team], dtype='Int64')
+            events[f'player{i}_team_id'][~present] = pd.NA
+            events[f'player{i}_team_city'] = np.where(present, self.cities[team], None)
+            events[f'player{i}_team_nickname'] = np.where(present, self.nicknames[team], None)
+            events[f'player{i}_team_abbreviation'] = np.where(present, self.abbrs[team], None)
+        events['video_available_flag'] = np.where(player_event, 1, 0)
+
+        return pd.DataFrame(events, columns=PLAY_BY_PLAY_COLUMNS)
+
+    def write_play_by_play(self, games, path):
+        """Stream play-by-play to CSV, PLAY_BY_PLAY_BATCH games at a time"""
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        writer, schema = None, None
+        rows = 0
+        try:
+            for start in range(0, len(games), self.PLAY_BY_PLAY_BATCH):
+                events = self.play_by_play(games.iloc[start:start + self.PLAY_BY_PLAY_BATCH].reset_index(drop=True))
+                # pandas' to_csv is the bottleneck at this row count; Arrow's writer is ~8x faster
+                table = pa.Table.from_pandas(events, preserve_index=False, schema=schema)
+                if writer is None:
+                    schema = table.schema
+                    writer = pacsv.CSVWriter(str(path), schema,
+                                             write_options=pacsv.WriteOptions(quoting_style='needed'))
+                writer.write_table(table)
+                rows += len(events)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def write(self, output_dir, play_by_play=True):
+        """Write every table as <name>.csv under output_dir; returns {name: rows}"""
+        try:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            games, periods = self.schedule()
+
+            tables = {
+                'team': self.teams(),
+                'game_info': self.game_info(games),
+                'game_summary': self.game_summary(games),
+                'line_score': self.line_score(games, periods),
+            }
+            rows = {}
+            for name, df in tables.items():
+                df.to_csv(output_dir / f"{name}.csv", index=False)
+                rows[name] = len(df)
+                print(f"Wrote {name}: {len(df)} rows")
+
+            if play_by_play:
+                rows['play_by_play'] = self.write_play_by_play(games, output_dir / "play_by_play.csv")
+                print(f"Wrote play_by_play: {rows['play_by_play']} rows")
+
+            return rows
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate NBA-shaped CSVs for scale testing the pipeline")
+    parser.add_argument("--output", type=Path, required=True, help="Directory for the generated CSVs")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiple of a full NBA schedule per season (1 = 1,230 regular season games)")
+    parser.add_argument("--seed", type=int, default=0)
+    # 2010-11 on: GameDataCleaner drops games dated before 2010
+    parser.add_argument("--first-season", type=int, default=2010)
+    parser.add_argument("--last-season", type=int, default=2022)
+    parser.add_argument("--skip-play-by-play", action="store_true", help="Write only the game-level tables")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generator = SyntheticNBAGenerator(scale=args.scale, seed=args.seed,
+                                      first_season=args.first_season, last_season=args.last_season)
+    generator.write(args.output, play_by_play=not args.skip_play_by_play)
+    print(f"Generated in {time.perf_counter() - start:.1f}s")
@@ -1,3 +1,3 @@
 #!/bin/bash
-cd /Users/hansenfan/Desktop/Projects/nba-predictor/data-pipeline
-python explore_dataset.py
+cd "$(dirname "$0")"
+python explore_dataset_fast.py "$@"
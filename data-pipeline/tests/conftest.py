@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from processors.synthetic_data import SyntheticNBAGenerator
+
+
+@pytest.fixture(scope="session")
+def synthetic_csv(tmp_path_factory):
+    """Two seasons of synthetic source CSVs (no play-by-play)"""
+    csv_path = tmp_path_factory.mktemp("synthetic") / "csv"
+    SyntheticNBAGenerator(scale=0.1, seed=0, first_season=2014, last_season=2015).write(csv_path, play_by_play=False)
+    return csv_path
+
+
+@pytest.fixture(scope="session")
+def clean_games(synthetic_csv):
+    from processors.clean_game_data import GameDataCleaner
+
+    cleaner = GameDataCleaner()
+    cleaner.csv_path = synthetic_csv
+    return cleaner.clean_game_data(*cleaner.load_game_data())
+
+
+@pytest.fixture(scope="session")
+def enhanced_features(clean_games):
+    """(enhanced_features frame, TeamFeatureStore holding every game)"""
+    from processors.build_features import FeatureBuilder
+
+    return FeatureBuilder().build_features(clean_games)
+
+
+@pytest.fixture(scope="session")
+def training_data(enhanced_features):
+    from models.train_model import NBAPredictor
+
+    return NBAPredictor().prepare_features(enhanced_features[0])
+
+
+@pytest.fixture(scope="session")
+def logistic_model(training_data):
+    from sklearn.linear_model import LogisticRegression
+
+    X, y, _ = training_data
+    return LogisticRegression(max_iter=1000).fit(X, y)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+
+from models.artifact import CompactModel, export_artifact, load_model
+
+
+@pytest.fixture(scope="module")
+def data_with_nan(training_data):
+    """Training matrix with 10% of each feature knocked out"""
+    X, y, _ = training_data
+    rng = np.random.default_rng(0)
+    values = np.where(rng.random(X.shape) < 0.1, np.nan, X.to_numpy())
+    return pd.DataFrame(values.astype(np.float32), columns=X.columns), y
+
+
+def _lightgbm():
+    lightgbm = pytest.importorskip("lightgbm")
+    return lightgbm.LGBMClassifier(n_estimators=50, verbose=-1, random_state=0)
+
+
+def _xgboost():
+    xgboost = pytest.importorskip("xgboost")
+    return xgboost.XGBClassifier(n_estimators=50, max_depth=4, tree_method='hist', random_state=0)
+
+
+@pytest.mark.parametrize("build", [
+    lambda: RandomForestClassifier(n_estimators=20, random_state=0),
+    lambda: HistGradientBoostingClassifier(max_iter=50, early_stopping=False, random_state=0),
+    _lightgbm,
+    _xgboost,
+], ids=['random_forest', 'hist_gradient_boosting', 'lightgbm', 'xgboost'])
+def test_artifact_matches_model_on_missing_values(data_with_nan, tmp_path, build):
+    X, y = data_with_nan
+    model = build().fit(X, y)
+    export_artifact(model, X.columns, tmp_path)
+
+    compact = load_model(tmp_path)
+    assert isinstance(compact, CompactModel)
+    # XGBoost sums leaves in float32
+    np.testing.assert_allclose(compact.predict_proba(X), model.predict_proba(X), atol=1e-6)
+    np.testing.assert_array_equal(compact.predict(X), model.predict(X))
+
+
+def test_gradient_boosting_and_linear_artifacts_match(training_data, logistic_model, tmp_path):
+    X, y, _ = training_data
+    boosting = GradientBoostingClassifier(n_estimators=20, random_state=0).fit(X, y)
+    for name, model in [('boosting', boosting), ('linear', logistic_model)]:
+        export_artifact(model, X.columns, tmp_path / name)
+        np.testing.assert_allclose(load_model(tmp_path / name).predict_proba(X), model.predict_proba(X),
+                                   atol=1e-6)
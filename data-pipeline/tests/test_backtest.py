@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from models.backtest import WalkForwardBacktester, season_windows
+
+
+@pytest.fixture(scope="module")
+def seasons_data():
+    rng = np.random.default_rng(0)
+    seasons = np.repeat(np.arange(2010, 2019), 200)
+    X = pd.DataFrame(rng.normal(size=(len(seasons), 4)), columns=['a', 'b', 'c', 'd'])
+    y = pd.Series((X['a'] + 0.5 * X['b'] + rng.normal(size=len(seasons)) > 0).astype(int))
+    return X, y, seasons
+
+
+def test_windows_never_train_on_the_test_season_or_later(seasons_data):
+    _, _, seasons = seasons_data
+    for test_season, train_idx, test_idx in season_windows(seasons):
+        assert seasons[train_idx].max() < test_season
+        assert (seasons[test_idx] == test_season).all()
+
+
+@pytest.mark.parametrize("n_jobs", [1, 8, 64])
+def test_warm_start_chains_do_not_depend_on_core_count(seasons_data, n_jobs):
+    X, y, seasons = seasons_data
+    backtester = WalkForwardBacktester({'lr': LogisticRegression(max_iter=1000)}, n_jobs=n_jobs, chain_length=4)
+    windows = season_windows(seasons)
+    tasks = backtester.tasks(X.to_numpy(), y.to_numpy(), list(X.columns), windows)
+    assert len(tasks) == -(-len(windows) // 4)
+
+
+def test_warm_started_fits_match_cold_fits(seasons_data):
+    X, y, seasons = seasons_data
+    models = {'lr': LogisticRegression(max_iter=1000), 'rf': RandomForestClassifier(n_estimators=10, random_state=0)}
+    warm = WalkForwardBacktester(models, n_jobs=1, chain_length=4).run(X, y, seasons)
+    cold = WalkForwardBacktester(models, n_jobs=1, chain_length=1).run(X, y, seasons)
+
+    lr = warm[warm['model'] == 'lr']
+    assert lr['warm_start'].tolist() == [False, True, True, True] * 2
+    assert not warm.loc[warm['model'] == 'rf', 'warm_start'].any()
+    assert not cold['warm_start'].any()
+    np.testing.assert_allclose(lr['log_loss'], cold.loc[cold['model'] == 'lr', 'log_loss'], rtol=1e-3)
+
+
+def test_threaded_models_get_the_requested_cores():
+    from models.train_model import NBAPredictor
+
+    predictor = NBAPredictor(n_jobs=4, backends=['random_forest', 'logistic_regression'])
+    assert predictor.build_models()['Random Forest'].n_jobs == 4
+    assert predictor.build_models(n_jobs=1)['Random Forest'].n_jobs == 1
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from processors.build_features import FeatureBuilder
+from processors.feature_store import STATE_FEATURES, TeamFeatureStore
+
+
+def _team_games(earlier, team):
+    """(date, season, points, won) for a team's earlier games, oldest first"""
+    home = earlier[earlier['home_team_abbr'] == team]
+    away = earlier[earlier['away_team_abbr'] == team]
+    return pd.concat([
+        pd.DataFrame({'game_date': home['game_date'], 'game_id': home['game_id'], 'season': home['season'],
+                      'points': home['pts_home'], 'won': home['pts_home'] > home['pts_away']}),
+        pd.DataFrame({'game_date': away['game_date'], 'game_id': away['game_id'], 'season': away['season'],
+                      'points': away['pts_away'], 'won': away['pts_away'] > away['pts_home']}),
+    ]).sort_values(['game_date', 'game_id'])
+
+
+def _expected(game, home, away):
+    """State features for `game` recomputed from each team's earlier games"""
+    def ppg(team):
+        return team['points'].tail(10).mean() if len(team) else np.nan
+
+    def win_rate(team):
+        return team['won'].tail(10).mean() if len(team) else 0.5
+
+    def season_win_rate(team):
+        season = team[team['season'] == game['season']]
+        return season['won'].mean() if len(season) else 0.5
+
+    def rest(team):
+        return min((game['game_date'] - team['game_date'].iloc[-1]).days, 10) if len(team) else 10
+
+    return {
+        'rolling_ppg': ppg(home) - ppg(away),
+        'rolling_win_rate': win_rate(home) - win_rate(away),
+        'season_win_rate_diff': season_win_rate(home) - season_win_rate(away),
+        'home_days_rest': rest(home),
+        'away_days_rest': rest(away),
+    }
+
+
+def test_each_row_only_sees_earlier_games(clean_games, enhanced_features):
+    features = enhanced_features[0].set_index('game_id')
+    games = clean_games.sort_values(['game_date', 'game_id']).reset_index(drop=True)
+
+    for i in np.random.default_rng(0).choice(len(games), 40, replace=False):
+        game = games.iloc[i]
+        earlier = games.iloc[:i]
+        home = _team_games(earlier, game['home_team_abbr'])
+        away = _team_games(earlier, game['away_team_abbr'])
+        row = features.loc[game['game_id']]
+        pair = earlier[((earlier['home_team_abbr'] == game['home_team_abbr']) &
+                        (earlier['away_team_abbr'] == game['away_team_abbr'])) |
+                       ((earlier['home_team_abbr'] == game['away_team_abbr']) &
+                        (earlier['away_team_abbr'] == game['home_team_abbr']))]
+
+        # Stored features are float32
+        for name, value in _expected(game, home, away).items():
+            np.testing.assert_allclose(row[name], value, atol=1e-4, err_msg=name)
+        assert row['h2h_games_played'] == len(pair)
+
+
+def test_later_results_do_not_change_earlier_rows(clean_games):
+    games = clean_games.sort_values(['game_date', 'game_id']).reset_index(drop=True)
+    cutoff = len(games) // 2
+    altered = games.copy()
+    altered.loc[cutoff:, ['pts_home', 'pts_away']] = altered.loc[cutoff:, ['pts_away', 'pts_home']].to_numpy()
+
+    original, _ = FeatureBuilder().build_features(games)
+    changed, _ = FeatureBuilder().build_features(altered)
+    pd.testing.assert_frame_equal(original.loc[:cutoff, STATE_FEATURES], changed.loc[:cutoff, STATE_FEATURES])
+    assert not original.loc[cutoff + 1:, STATE_FEATURES].equals(changed.loc[cutoff + 1:, STATE_FEATURES])
+
+
+def test_store_after_a_prefix_answers_the_next_game_like_the_batch_build(clean_games, enhanced_features):
+    features = enhanced_features[0].set_index('game_id')
+    games = clean_games.sort_values(['game_date', 'game_id']).reset_index(drop=True)
+    i = len(games) * 3 // 4
+    store = TeamFeatureStore.build(games.iloc[:i])
+    game = games.iloc[i]
+
+    served = store.matchup_features(game['home_team_abbr'], game['away_team_abbr'], game['game_date'], game['season'])
+    expected = features.loc[game['game_id'], STATE_FEATURES]
+    np.testing.assert_allclose([served[name] for name in STATE_FEATURES], expected.to_numpy(dtype=float), atol=1e-4)
@@ -0,0 +1,32 @@
+from benchmarks.bench_clean_game_data import DROPPED_COLUMNS, legacy_clean_game_data
+from processors.clean_game_data import GameDataCleaner
+from processors.storage import ColumnarStore
+
+
+def _cleaner(csv_path, output_path):
+    cleaner = GameDataCleaner()
+    cleaner.csv_path = csv_path
+    cleaner.output_path = output_path
+    cleaner.store = ColumnarStore(output_path)
+    cleaner.database = None
+    return cleaner
+
+
+def test_clean_games_csv_matches_legacy_output(synthetic_csv, tmp_path):
+    cleaner = _cleaner(synthetic_csv, tmp_path)
+    game_info, game_summary, teams, line_score = cleaner.load_game_data()
+
+    legacy = legacy_clean_game_data(cleaner, game_info, game_summary, teams, line_score)
+    games = cleaner.clean_game_data(game_info, game_summary, teams, line_score)
+
+    # Only the id_x/id_y copies may go; every written value keeps its format
+    assert sorted(DROPPED_COLUMNS) == ['id_x', 'id_y']
+    assert games.to_csv(index=False) == legacy.drop(columns=DROPPED_COLUMNS).to_csv(index=False)
+
+
+def test_default_synthetic_seasons_survive_cleaning(tmp_path):
+    from processors.synthetic_data import SyntheticNBAGenerator
+
+    rows = SyntheticNBAGenerator(scale=0.02).write(tmp_path / "csv", play_by_play=False)
+    cleaner = _cleaner(tmp_path / "csv", tmp_path)
+    assert len(cleaner.clean_game_data(*cleaner.load_game_data())) == rows['game_info']
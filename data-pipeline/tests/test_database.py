@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from processors.database import GameDatabase, copy_buffer
+
+COLUMN_TYPES = {
+    'game_id': 'bigint', 'pts_home': 'bigint', 'home_team_abbr': 'text',
+    'fg_pct_home': 'double precision', 'is_weekend': 'boolean',
+}
+
+
+def test_copy_buffer_writes_integers_for_integer_columns():
+    batch = pd.DataFrame({
+        'game_id': pd.Series([21500001, 21500002], dtype='int64'),
+        # NaN in the batch turned the scores into floats
+        'pts_home': [112.0, np.nan],
+        'home_team_abbr': pd.Categorical(['BOS', 'LAL']),
+        'fg_pct_home': pd.Categorical([0.5, 0.25]),
+        'is_weekend': [1, 0],
+    })
+    rows = copy_buffer(batch, COLUMN_TYPES).read().splitlines()
+    assert rows == ['21500001,112,BOS,0.5,True', '21500002,,LAL,0.25,False']
+
+
+def test_copy_buffer_refuses_fractional_values_for_integer_columns():
+    with pytest.raises(TypeError):
+        copy_buffer(pd.DataFrame({'pts_home': [112.5]}), COLUMN_TYPES)
+
+
+def test_upsert_reload_is_idempotent_and_applies_corrections(tmp_path):
+    database = GameDatabase(f"sqlite:///{tmp_path / 'games.db'}")
+    games = pd.DataFrame({
+        'game_id': [1, 2, 3],
+        'game_date': pd.to_datetime(['2015-01-01', '2015-01-02', '2015-01-03']),
+        'season': [2015, 2015, 2015],
+        'pts_home': [100, 101, 102],
+    })
+    database.upsert('clean_games', games)
+    database.upsert('clean_games', games)
+    database.upsert('clean_games', games.iloc[[1]].assign(pts_home=99))
+
+    stored = database.query("SELECT game_id, pts_home FROM clean_games ORDER BY game_id")
+    assert stored['pts_home'].tolist() == [100, 99, 102]
+    assert len(database.games_between('2015-01-02', '2015-01-04')) == 2
@@ -0,0 +1,42 @@
+import sqlite3
+
+from explore_dataset_fast import NBADatasetExplorer
+
+
+def _database(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE game (game_id TEXT, game_date TEXT, team_id TEXT)")
+    conn.execute("CREATE TABLE play_by_play (game_id TEXT, player1_id TEXT, eventnum INTEGER)")
+    conn.execute("CREATE TABLE team (team_id TEXT, city TEXT)")
+    conn.executemany("INSERT INTO game VALUES (?, ?, ?)",
+                     [(f"g{i}", f"2015-01-{i + 1:02d}", f"t{i % 2}") for i in range(5)])
+    conn.executemany("INSERT INTO play_by_play VALUES (?, ?, ?)", [(f"g{i % 6}", "p1", i) for i in range(50)])
+    conn.executemany("INSERT INTO team VALUES (?, ?)", [("t0", "Boston"), ("t1", "Denver")])
+    conn.commit()
+    conn.close()
+
+
+def _indexes(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {tuple(row) for row in conn.execute("SELECT tbl_name, name FROM sqlite_master WHERE type = 'index'")}
+    finally:
+        conn.close()
+
+
+def test_sqlite_report_leaves_the_database_alone_by_default(tmp_path):
+    _database(tmp_path / "nba.sqlite")
+    explorer = NBADatasetExplorer(data_path=tmp_path)
+    overview = explorer.generate_sqlite_report()
+    assert set(overview['Dataset']) == {'game', 'play_by_play', 'team'}
+    assert _indexes(tmp_path / "nba.sqlite") == set()
+
+
+def test_sqlite_indexes_cover_only_what_the_queries_use(tmp_path):
+    _database(tmp_path / "nba.sqlite")
+    NBADatasetExplorer(data_path=tmp_path).generate_sqlite_report(create_indexes=True)
+    assert _indexes(tmp_path / "nba.sqlite") == {
+        ('game', 'idx_game_game_date'),
+        ('game', 'idx_game_game_id'),
+        ('team', 'idx_team_team_id'),
+    }
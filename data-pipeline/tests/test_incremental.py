@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+
+from processors.clean_game_data import GameDataCleaner
+from processors.feature_store import TeamFeatureStore
+from processors.storage import ColumnarStore
+from processors.synthetic_data import SyntheticNBAGenerator
+
+SOURCES = ["game_info", "game_summary", "line_score"]
+
+
+@pytest.fixture(scope="module")
+def source(tmp_path_factory):
+    """Synthetic 2022-23 and 2023-24 seasons, so games run into 2024"""
+    csv_path = tmp_path_factory.mktemp("source") / "csv"
+    SyntheticNBAGenerator(scale=0.1, seed=1, first_season=2022, last_season=2023).write(csv_path, play_by_play=False)
+    return {name: pd.read_csv(csv_path / f"{name}.csv") for name in SOURCES + ["team"]}
+
+
+def _cleaner(tmp_path):
+    cleaner = GameDataCleaner()
+    cleaner.csv_path = tmp_path / "csv"
+    cleaner.output_path = tmp_path / "processed"
+    cleaner.output_path.mkdir()
+    cleaner.store = ColumnarStore(cleaner.output_path)
+    cleaner.database = None
+    return cleaner
+
+
+def _append(csv_path, source, game_ids):
+    """Append the rows of `game_ids` to the source CSVs, creating them on first use"""
+    csv_path.mkdir(exist_ok=True)
+    source['team'].to_csv(csv_path / "team.csv", index=False)
+    for name in SOURCES:
+        rows = source[name][source[name]['game_id'].isin(game_ids)]
+        path = csv_path / f"{name}.csv"
+        rows.to_csv(path, mode='a', index=False, header=not path.exists())
+
+
+def _split(source, fraction):
+    game_ids = source['game_info'].sort_values('game_date')['game_id'].to_numpy()
+    cut = int(len(game_ids) * fraction)
+    return game_ids[:cut], game_ids[cut:]
+
+
+def _snapshot(feature_store):
+    teams = {
+        team: (list(state.recent_points), list(state.recent_wins), state.last_game_date, state.season,
+               state.season_games, state.season_wins, state.season_points)
+        for team, state in feature_store.teams.items()
+    }
+    return teams, dict(feature_store.head_to_head), feature_store.last_applied
+
+
+def test_incremental_runs_match_a_full_clean(source, tmp_path):
+    first, rest = _split(source, 0.8)
+    cleaner = _cleaner(tmp_path)
+    _append(cleaner.csv_path, source, first)
+    cleaner.run_incremental(lookback_days=3)
+
+    _append(cleaner.csv_path, source, rest)
+    batch, summary = cleaner.run_incremental(lookback_days=3)
+    assert not summary['full_rebuild']
+    assert len(batch) < len(rest) + 50
+
+    full = cleaner.clean_game_data(*cleaner.load_game_data(), last_year=None)
+    stored = cleaner.store.read("clean_games").sort_values('game_id').reset_index(drop=True)
+    assert stored['game_id'].tolist() == sorted(full['game_id'])
+    assert stored['game_date'].max().year == 2024
+
+    csv = pd.read_csv(cleaner.output_path / "clean_games.csv")
+    assert sorted(csv['game_id']) == sorted(full['game_id'])
+    assert _snapshot(TeamFeatureStore.load(cleaner.store)) == _snapshot(TeamFeatureStore.build(full))
+
+
+def test_incremental_run_parses_only_the_tail(source, tmp_path):
+    first, rest = _split(source, 0.8)
+    cleaner = _cleaner(tmp_path)
+    _append(cleaner.csv_path, source, first)
+    _, summary = cleaner.run_incremental(lookback_days=3)
+
+    offsets = summary['watermark']['source_offsets']
+    for name in SOURCES:
+        assert 0 < offsets[name]['offset'] < (cleaner.csv_path / f"{name}.csv").stat().st_size
+
+    _append(cleaner.csv_path, source, rest)
+    game_info, _, _, _, positions = cleaner.load_game_data_since(offsets=offsets)
+    # Only the lookback window's rows and the appended rows are parsed
+    window = game_info[~game_info['game_id'].isin(rest)]
+    assert len(positions['game_info']['rows']) == len(rest) + len(window)
+    assert pd.to_datetime(window['game_date']).min() >= pd.Timestamp(summary['watermark']['rewrite_from'])
+
+
+def test_corrected_scores_reach_the_feature_store(source, tmp_path):
+    cleaner = _cleaner(tmp_path)
+    _append(cleaner.csv_path, source, source['game_info']['game_id'])
+    _, summary = cleaner.run_incremental(lookback_days=3)
+
+    # Flip the result of an already-applied game inside the lookback window
+    line_score = pd.read_csv(cleaner.csv_path / "line_score.csv")
+    corrected = line_score['game_date_est'] >= summary['watermark']['rewrite_from']
+    game_id = line_score.loc[corrected, 'game_id'].iloc[0]
+    row = line_score['game_id'] == game_id
+    line_score.loc[row, ['pts_home', 'pts_away']] = line_score.loc[row, ['pts_away', 'pts_home']].to_numpy() + [0, 1]
+    line_score.to_csv(cleaner.csv_path / "line_score.csv", index=False)
+
+    cleaner.run_incremental(lookback_days=3)
+
+    full = cleaner.clean_game_data(*cleaner.load_game_data(), last_year=None)
+    stored = cleaner.store.read("clean_games").set_index('game_id')
+    assert stored.loc[game_id, 'pts_away'] == full.set_index('game_id').loc[game_id, 'pts_away']
+    assert _snapshot(TeamFeatureStore.load(cleaner.store)) == _snapshot(TeamFeatureStore.build(full))
@@ -0,0 +1,51 @@
+import sys
+
+import pytest
+
+import pipeline
+from pipeline import PIPELINE_ROOT, STAGES, PipelineRunner, Stage, local_sources
+
+
+def test_stage_code_covers_transitive_imports():
+    code = {stage.name: {str(path.relative_to(PIPELINE_ROOT)) for path in stage.code} for stage in STAGES}
+    assert {"processors/schema.py", "processors/database.py", "processors/storage.py"} <= code["clean"]
+    assert {"processors/storage.py", "processors/database.py", "processors/feature_store.py"} <= code["features"]
+    assert {"models/registry.py", "processors/schema.py", "processors/storage.py"} <= code["train"]
+
+
+def test_editing_an_indirect_import_invalidates_the_stage(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "PIPELINE_ROOT", tmp_path)
+    (tmp_path / "helpers").mkdir()
+    (tmp_path / "entry.py").write_text("def run():\n    from helpers.inner import value\n    return value\n")
+    (tmp_path / "helpers" / "inner.py").write_text("from helpers.leaf import VALUE as value\n")
+    (tmp_path / "helpers" / "leaf.py").write_text("VALUE = 1\n")
+    assert [path.name for path in local_sources(["entry.py"])] == ["entry.py", "inner.py", "leaf.py"]
+
+    stage = Stage("entry", None, inputs=[], outputs=[], code=["entry.py"])
+    runner = PipelineRunner(stages=[stage], state_file=tmp_path / "state.json")
+    before = runner.stage_key(stage)
+    (tmp_path / "helpers" / "leaf.py").write_text("VALUE = 22\n")
+    assert runner.stage_key(stage) != before
+
+
+def test_stages_declare_the_stores_they_read():
+    stages = {stage.name: stage for stage in STAGES}
+    assert stages["features"].depends_on(stages["clean"])
+    assert stages["train"].depends_on(stages["features"])
+    assert all(path.suffix != ".csv" for path in stages["train"].inputs)
+
+
+def test_worker_memory_is_sampled_while_the_stage_runs():
+    import subprocess
+
+    from pipeline import run_sampling_workers
+
+    def stage():
+        # A child holding ~100 MB for a second
+        subprocess.run([sys.executable, "-c", "import time; block = bytearray(100 * 2 ** 20); time.sleep(1)"],
+                       check=True)
+
+    peak = run_sampling_workers(stage, interval=0.05)
+    if peak is None:
+        pytest.skip("no /proc on this platform")
+    assert peak > 90 * 2 ** 20
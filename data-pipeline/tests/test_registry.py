@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from models.registry import ModelRegistry
+from models.serve import ServingModels
+
+
+@pytest.fixture
+def registry(tmp_path, training_data, logistic_model):
+    X, y, feature_names = training_data
+    registry = ModelRegistry(tmp_path)
+    weak = LogisticRegression(C=1e-4, max_iter=1000).fit(X, y)
+    first = registry.register(logistic_model, feature_names, 'Logistic Regression', {'accuracy': 0.6})
+    second = registry.register(weak, feature_names, 'Logistic Regression', {'accuracy': 0.5})
+    return registry, first, second
+
+
+def test_versions_load_back_as_the_registered_models(registry, training_data, logistic_model):
+    registry, first, second = registry
+    X = training_data[0]
+    assert [entry['version'] for entry in registry.list_versions()] == [first, second]
+    np.testing.assert_allclose(registry.load(first).predict_proba(X), logistic_model.predict_proba(X), atol=1e-6)
+    assert registry.current_version() is None
+
+
+def test_rollback_returns_to_the_previous_promotion(registry):
+    registry, first, second = registry
+    with pytest.raises(ValueError):
+        registry.rollback()
+
+    registry.promote(first)
+    registry.promote(second)
+    assert registry.current_version() == second
+    assert registry.rollback() == first
+    assert registry.current_version() == first
+    with pytest.raises(ValueError):
+        registry.rollback()
+    with pytest.raises(ValueError):
+        registry.promote("missing")
+
+
+def test_serving_models_follow_the_registry_pointers(registry):
+    registry, first, second = registry
+    registry.promote(first)
+
+    class LoadedVersion(str):
+        # Stand-in for PredictionServer: the loaded version is all that matters here
+        def reload_feature_store(self):
+            return None
+
+    class RegistryModels(ServingModels):
+        def _load(self, version):
+            return LoadedVersion(version)
+
+    models = RegistryModels(registry=registry)
+    assert models.active == first and models.shadow is None
+
+    registry.promote(second)
+    registry.set_shadow(first)
+    models.refresh()
+    assert (models.active, models.shadow) == (second, first)
+
+    registry.rollback()
+    registry.set_shadow(None)
+    models.refresh()
+    assert (models.active, models.shadow) == (first, None)
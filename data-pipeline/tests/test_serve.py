@@ -0,0 +1,122 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from models.registry import ModelRegistry
+from models.serve import PredictionServer, create_app
+from processors.feature_store import TeamFeatureStore
+from processors.storage import ColumnarStore
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory, training_data, logistic_model):
+    registry = ModelRegistry(tmp_path_factory.mktemp("registry"))
+    version = registry.register(logistic_model, training_data[2], 'Logistic Regression', {'accuracy': 0.6})
+    return registry.model_path(version)
+
+
+@pytest.fixture(scope="module")
+def server(model_path, enhanced_features):
+    features, feature_store = enhanced_features
+    return PredictionServer(model_path=model_path, features=features, feature_store=feature_store)
+
+
+def _home_win(result):
+    return result['confidence'] if result['predictedWinner'] == result['homeTeam'] else 1 - result['confidence']
+
+
+def test_game_date_reaches_the_feature_store(server):
+    home, away = server.index.teams[:2]
+    last_date = server.feature_store.last_applied[0]
+
+    default = server.predict(home, away)
+    same_day = server.predict(home, away, f"{server.scored_date:%Y-%m-%d}")
+    assert _home_win(same_day) == pytest.approx(_home_win(default))
+
+    # Months later: different calendar and rest features than the default date
+    later = last_date + pd.Timedelta(days=200)
+    dated = server.predict(home, away, f"{later:%Y-%m-%d}")
+    assert dated['error'] is None
+    assert _home_win(dated) != pytest.approx(_home_win(default))
+
+    batch = server.predict_batch([(home, away), (home, away, f"{later:%Y-%m-%d}")])
+    assert _home_win(batch[0]) == pytest.approx(_home_win(default))
+    assert _home_win(batch[1]) == pytest.approx(_home_win(dated))
+
+
+def test_dates_the_feature_store_has_already_seen_are_rejected(server):
+    home, away = server.index.teams[:2]
+    last_date = server.feature_store.last_applied[0]
+    assert server.predict(home, away, f"{last_date:%Y-%m-%d}")['error'] is not None
+    assert server.predict(home, away, "not a date")['error'] is not None
+    assert server.predict(home, away, f"{last_date:%Y-%m-%d}T00:00:00Z")['error'] is not None
+    zoned = server.predict(home, away, f"{server.scored_date:%Y-%m-%d}T12:00:00+00:00")
+    assert _home_win(zoned) == pytest.approx(_home_win(server.predict(home, away)))
+
+    with TestClient(create_app(server=server)) as client:
+        response = client.post('/predict', json={'homeTeam': home, 'awayTeam': away,
+                                                 'gameDate': f"{last_date - pd.Timedelta(days=30):%Y-%m-%d}"})
+        assert response.status_code == 400
+        response = client.post('/predict', json={'homeTeam': home, 'awayTeam': away,
+                                                 'gameDate': f"{last_date:%Y-%m-%d}T00:00:00Z"})
+        assert response.status_code == 400
+        response = client.post('/predict/batch', json={'games': [
+            {'homeTeam': home, 'awayTeam': away},
+            {'homeTeam': home, 'awayTeam': away, 'gameDate': f"{last_date:%Y-%m-%d}"},
+        ]})
+        predictions = response.json()['predictions']
+        assert predictions[0]['error'] is None and predictions[1]['error'] is not None
+
+
+def test_simulate_checks_its_request(server):
+    home, away = server.index.teams[:2]
+    with TestClient(create_app(server=server)) as client:
+        response = client.post('/simulate', json={'iterations': 200, 'standings': {home: {'wins': 10, 'losses': 5}}})
+        assert response.status_code == 400
+
+        response = client.post('/simulate', json={
+            'iterations': 200,
+            'games': [{'homeTeam': home, 'awayTeam': away}],
+            'standings': {home: {'wins': 10, 'losses': 5}},
+        })
+        assert response.status_code == 200
+        projection = next(row for row in response.json()['projections'] if row['team'] == home)
+        assert projection['projected_wins'] + projection['projected_losses'] == pytest.approx(16)
+
+
+def test_a_newly_saved_feature_store_reaches_the_running_server(model_path, enhanced_features, clean_games, tmp_path):
+    features, _ = enhanced_features
+    games = clean_games.sort_values(['game_date', 'game_id']).reset_index(drop=True)
+    processed = ColumnarStore(tmp_path)
+    store = TeamFeatureStore.build(games.iloc[:len(games) // 2])
+    store.save(processed)
+
+    server = PredictionServer(model_path=model_path, features=features, feature_store_path=tmp_path)
+    app = create_app(server=server, reload_interval=0)
+    home, away = server.index.teams[:2]
+    with TestClient(app) as client:
+        before = client.get('/health').json()['modelVersion']
+        predicted = client.post('/predict', json={'homeTeam': home, 'awayTeam': away}).json()
+
+        app.state.models.refresh()
+        assert client.get('/health').json()['modelVersion'] == before
+
+        store.update_many(games.iloc[len(games) // 2:])
+        store.save(processed)
+        app.state.models.refresh()
+
+        assert client.get('/health').json()['modelVersion'] != before
+        updated = client.post('/predict', json={'homeTeam': home, 'awayTeam': away}).json()
+        assert updated['modelVersion'] != predicted['modelVersion']
+        assert _home_win(updated) != pytest.approx(_home_win(predicted))
+
+
+def test_corrections_change_the_version_without_moving_the_last_game(clean_games):
+    store = TeamFeatureStore.build(clean_games)
+    corrected = clean_games.copy()
+    first = corrected['game_date'].idxmin()
+    corrected.loc[first, ['pts_home', 'pts_away']] = corrected.loc[first, ['pts_away', 'pts_home']].to_numpy()
+
+    fingerprint = store.fingerprint()
+    store.rebuild_teams(corrected.loc[[first], ['home_team_abbr', 'away_team_abbr']].to_numpy().ravel(), corrected)
+    assert store.fingerprint() != fingerprint
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from models.simulate import CONFERENCES, ROUNDS, SeasonSimulator, conference_index, full_season_schedule
+
+TEAMS = sorted(CONFERENCES['East'] + CONFERENCES['West'])
+ROUND_TEAMS = {'playoffs': 16, 'second_round': 8, 'conference_finals': 4, 'finals': 2, 'champion': 1}
+
+
+@pytest.fixture(scope="module")
+def probabilities():
+    rng = np.random.default_rng(0)
+    strength = rng.normal(size=len(TEAMS))
+    return 1 / (1 + np.exp(-(strength[:, None] - strength[None, :] + 0.2)))
+
+
+def test_full_season_gives_every_team_82_games_and_41_at_home():
+    home, away = full_season_schedule(conference_index(TEAMS))
+    assert (np.bincount(home, minlength=30) == 41).all()
+    assert (np.bincount(away, minlength=30) == 41).all()
+
+
+def test_records_and_round_odds_add_up(probabilities):
+    simulator = SeasonSimulator(TEAMS, probabilities, n_jobs=1, chunk_size=500)
+    projections = simulator.simulate(iterations=1_000)
+
+    assert np.allclose(projections['projected_wins'] + projections['projected_losses'], 82)
+    assert projections['projected_wins'].sum() == pytest.approx(41 * 30)
+    for name in ROUNDS:
+        assert projections[f'{name}_odds'].sum() == pytest.approx(ROUND_TEAMS[name])
+        assert (projections[f'{name}_odds'] <= 1).all()
+
+
+def test_standings_carry_into_remaining_games(probabilities):
+    simulator = SeasonSimulator(TEAMS, probabilities, n_jobs=1, chunk_size=500)
+    standings = {team: (40, 40) for team in TEAMS}
+    projections = simulator.simulate([('BOS', 'LAL'), ('LAL', 'BOS')], iterations=500, standings=standings)
+
+    assert np.allclose(projections['projected_wins'] + projections['projected_losses'],
+                       [82 if team in ('BOS', 'LAL') else 80 for team in projections['team']])
+    assert projections['projected_wins'].sum() == pytest.approx(40 * 30 + 2)
+
+
+def test_results_do_not_depend_on_n_jobs(probabilities):
+    serial = SeasonSimulator(TEAMS, probabilities, n_jobs=1, chunk_size=250).simulate(iterations=1_000)
+    parallel = SeasonSimulator(TEAMS, probabilities, n_jobs=2, chunk_size=250).simulate(iterations=1_000)
+    assert serial.equals(parallel)
+
+
+def test_standings_without_games_are_rejected(probabilities):
+    simulator = SeasonSimulator(TEAMS, probabilities, n_jobs=1)
+    with pytest.raises(ValueError):
+        simulator.simulate(iterations=10, standings={'BOS': (10, 5)})
+
+
+@pytest.mark.parametrize("teams", [
+    TEAMS[:-1] + ['XYZ'],
+    CONFERENCES['East'][:9] + CONFERENCES['West'],
+])
+def test_leagues_that_cannot_be_seeded_are_rejected(teams):
+    with pytest.raises(ValueError):
+        SeasonSimulator(teams, np.full((len(teams), len(teams)), 0.5))
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from processors.schema import CLEAN_GAMES_SCHEMA, optimize_dtypes
+from processors.storage import ColumnarStore
+
+
+def _games(game_ids, teams, season=2015):
+    return optimize_dtypes(pd.DataFrame({
+        'game_id': game_ids,
+        'season': season,
+        'home_team_abbr': teams,
+        'game_time': [f"2:{i:02d}" for i in game_ids],
+        'pts_home': [100.0 + i for i in game_ids],
+    }), CLEAN_GAMES_SCHEMA)
+
+
+def test_upsert_keeps_categories_missing_from_batch(tmp_path):
+    store = ColumnarStore(tmp_path)
+    store.write("games", _games([1, 2, 3, 4], ['BOS', 'LAL', 'NYK', 'CHI']), partition_cols=["season"])
+
+    # The batch only knows the BOS category and one new value
+    store.upsert("games", _games([1, 5], ['BOS', 'MIA']), key="game_id", partition_cols=["season"])
+
+    games = store.read("games").sort_values('game_id').reset_index(drop=True)
+    assert games['game_id'].tolist() == [1, 2, 3, 4, 5]
+    assert games['home_team_abbr'].astype(str).tolist() == ['BOS', 'LAL', 'NYK', 'CHI', 'MIA']
+    assert games['game_time'].notna().all()
+
+
+def test_upsert_replaces_rows_by_key_and_leaves_other_partitions(tmp_path):
+    store = ColumnarStore(tmp_path)
+    store.write("games", pd.concat([_games([1, 2], ['BOS', 'LAL'], season=2014),
+                                    _games([3], ['NYK'], season=2015)]), partition_cols=["season"])
+
+    corrected = _games([3], ['NYK'], season=2015).assign(pts_home=99.0)
+    store.upsert("games", corrected, key="game_id", partition_cols=["season"])
+
+    games = store.read("games").set_index('game_id').sort_index()
+    assert len(games) == 3
+    assert games.loc[3, 'pts_home'] == 99.0
+    assert games.loc[[1, 2], 'pts_home'].tolist() == [101.0, 102.0]
+
+
+def test_schema_types_do_not_depend_on_batch():
+    small = _games([1], ['BOS'])
+    large = _games(list(range(1, 300)), ['BOS', 'LAL', 'NYK'] * 99 + ['CHI', 'MIA'])
+    assert small.dtypes.astype(str).to_dict() == large.dtypes.astype(str).to_dict()
+
+
+def test_trainer_rereads_a_csv_regenerated_after_the_store(tmp_path):
+    import os
+
+    from models.train_model import NBAPredictor
+
+    predictor = NBAPredictor()
+    predictor.features_path = tmp_path
+    predictor.store = ColumnarStore(tmp_path)
+    csv_file = tmp_path / "enhanced_features.csv"
+    pd.DataFrame({'game_date': ['2015-01-02'], 'season': [2015], 'home_win': [1], 'rolling_ppg': [1.0]}).to_csv(csv_file, index=False)
+    assert predictor.load_enhanced_data()['rolling_ppg'].tolist() == [1.0]
+
+    pd.DataFrame({'game_date': ['2015-01-03'], 'season': [2015], 'home_win': [0], 'rolling_ppg': [2.0]}).to_csv(csv_file, index=False)
+    future = csv_file.stat().st_mtime_ns + 10 ** 9
+    os.utime(csv_file, ns=(future, future))
+    assert predictor.load_enhanced_data()['rolling_ppg'].tolist() == [2.0]
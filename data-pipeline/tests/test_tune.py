@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from threadpoolctl import threadpool_info
+
+import models.tune as tune
+from models.tune import HyperparameterTuner
+
+pytest.importorskip("optuna")
+
+
+@pytest.fixture(scope="module")
+def seasons_data():
+    rng = np.random.default_rng(0)
+    seasons = np.repeat(np.arange(2010, 2015), 150)
+    X = pd.DataFrame(rng.normal(size=(len(seasons), 4)), columns=['a', 'b', 'c', 'd'])
+    y = pd.Series((X['a'] + rng.normal(size=len(seasons)) > 0).astype(int))
+    return X, y, seasons
+
+
+def test_trials_fit_on_one_thread_each(seasons_data, monkeypatch):
+    fits = []
+    fit_estimator = tune.fit_estimator
+
+    def recording_fit(family, params, X, y, n_jobs=None):
+        fits.append((n_jobs, {pool['num_threads'] for pool in threadpool_info()}))
+        return fit_estimator(family, params, X, y, n_jobs=n_jobs)
+
+    monkeypatch.setattr(tune, "fit_estimator", recording_fit)
+    tuner = HyperparameterTuner(families=['hist_gradient_boosting'], n_trials=4, n_jobs=2, registry=object())
+    tuner.prepare(*seasons_data)
+    result = tuner.tune_family('hist_gradient_boosting')
+
+    assert result['trials'] == 4
+    assert fits and all(n_jobs == 1 and threads == {1} for n_jobs, threads in fits)